@@ -0,0 +1,426 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Performance benchmarks for the Qt data view.
+
+This script drives the Qt DataViewItemModel directly, using the offscreen
+Qt platform by default, for an ArrayDataModel and for a column-oriented
+model at a range of sizes.  It measures:
+
+- ``data_calls_per_second``: the rate of DisplayRole ``data()`` calls
+  while painting a viewport at random scroll positions;
+- ``index_us`` and ``parent_us``: the cost of the ``index()`` and
+  ``parent()`` methods for hierarchical (3D and 4D) data;
+- ``index_manager_bytes``: the memory allocated by the index manager while
+  visiting many rows of hierarchical data, for each index manager;
+- ``first_paint_ms``: the time from creating a view to the end of its first
+  paint.
+
+Results are printed as a table and, if requested, written as JSON so that
+they can be compared between versions::
+
+    python benchmarks/data_view_benchmark.py --output results.json
+    python benchmarks/data_view_benchmark.py --sizes 1000 100000 --quick
+
+Note that the largest default size allocates a few hundred megabytes.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("ETS_TOOLKIT", "qt4")
+
+import numpy as np  # noqa: E402
+from traits.api import Dict, Instance, Str  # noqa: E402
+
+import pyface  # noqa: E402
+from pyface.data_view.abstract_data_model import AbstractDataModel  # noqa
+from pyface.data_view.abstract_value_type import AbstractValueType  # noqa
+from pyface.data_view.data_models.api import ArrayDataModel  # noqa: E402
+from pyface.data_view.index_manager import (  # noqa: E402
+    IntIndexManager, ShapeIndexManager, TupleIndexManager
+)
+from pyface.data_view.value_types.api import FloatValue, TextValue  # noqa
+from pyface.gui import GUI  # noqa: E402
+from pyface.qt import QtCore, QtGui, qt_api  # noqa: E402
+from pyface.ui.qt4.data_view.data_view_item_model import (  # noqa: E402
+    DataViewItemModel
+)
+
+
+#: The default numbers of rows to benchmark.
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+
+#: The number of data columns in the benchmark models.
+COLUMNS = 4
+
+#: The numbers of dimensions of the hierarchical benchmark models.
+HIERARCHICAL_DIMENSIONS = [3, 4]
+
+#: The number of rows and columns of the viewport used for painting.
+VIEWPORT_ROWS = 40
+VIEWPORT_COLUMNS = COLUMNS + 1
+
+
+class ColumnArrayDataModel(AbstractDataModel):
+    """ A flat data model of named columns, each held in a 1D array.
+
+    This mimics column-oriented stores, such as data frames, where each
+    column is stored and typed separately.
+    """
+
+    #: The columns of data.
+    columns = Dict(Str, Instance(np.ndarray))
+
+    #: The value type of the column titles.
+    header_type = Instance(AbstractValueType, factory=TextValue)
+
+    #: The value type of the values.
+    value_type = Instance(AbstractValueType, factory=FloatValue)
+
+    index_manager = Instance(IntIndexManager, ())
+
+    def get_column_count(self):
+        return len(self.columns)
+
+    def can_have_children(self, row):
+        return len(row) == 0
+
+    def get_row_count(self, row):
+        if len(row) == 0 and self.columns:
+            return len(next(iter(self.columns.values())))
+        return 0
+
+    def get_value(self, row, column):
+        names = list(self.columns)
+        if len(row) == 0:
+            if len(column) == 0:
+                return ""
+            return names[column[0]]
+        elif len(column) == 0:
+            return row[0]
+        return self.columns[names[column[0]]][row[0]]
+
+    def get_values(self, parent, rows, columns):
+        if len(parent) != 0:
+            return super().get_values(parent, rows, columns)
+        names = list(self.columns)
+        rows = np.asarray(rows, dtype=int)
+        return np.column_stack(
+            [self.columns[names[column]][rows] for column in columns]
+        )
+
+    def get_texts(self, parent, rows, columns):
+        if len(parent) != 0:
+            return super().get_texts(parent, rows, columns)
+        return self.value_type.get_texts(self, parent, rows, columns)
+
+    def get_value_type(self, row, column):
+        if len(row) == 0:
+            return self.header_type
+        return self.value_type
+
+
+def create_array_model(rows, index_manager=None):
+    """ Create an ArrayDataModel with the given number of rows. """
+    data = np.random.default_rng(0).random((rows, COLUMNS))
+    if index_manager is None:
+        return ArrayDataModel(data=data, value_type=FloatValue())
+    return ArrayDataModel(
+        data=data,
+        value_type=FloatValue(),
+        index_manager=index_manager,
+    )
+
+
+def create_column_model(rows):
+    """ Create a ColumnArrayDataModel with the given number of rows. """
+    rng = np.random.default_rng(0)
+    return ColumnArrayDataModel(columns={
+        "column {}".format(i): rng.random(rows) for i in range(COLUMNS)
+    })
+
+
+def create_hierarchical_model(rows, index_manager, dimensions=3):
+    """ Create an ArrayDataModel with about the given number of leaf rows.
+
+    The leaf rows are spread over ``dimensions - 1`` levels of rows.
+    """
+    levels = dimensions - 1
+    outer = max(1, int(round(rows ** (1.0 / levels))))
+    inner = max(1, rows // outer ** (levels - 1))
+    shape = (outer,) * (levels - 1) + (inner, COLUMNS)
+    data = np.random.default_rng(0).random(shape)
+    return ArrayDataModel(
+        data=data,
+        value_type=FloatValue(),
+        index_manager=index_manager,
+    )
+
+
+def random_parent(item_model, model, rng):
+    """ Get the index of a random parent of leaf rows of hierarchical data.
+    """
+    parent = QtCore.QModelIndex()
+    for size in model.data.shape[:-2]:
+        parent = item_model.index(rng.randrange(size), 0, parent)
+    return parent
+
+
+def paint_viewport(item_model, first_row):
+    """ Request the data for a viewport of a flat model, as a paint would.
+    """
+    root = QtCore.QModelIndex()
+    calls = 0
+    for row in range(first_row, first_row + VIEWPORT_ROWS):
+        for column in range(VIEWPORT_COLUMNS):
+            index = item_model.index(row, column, root)
+            item_model.data(index, QtCore.Qt.DisplayRole)
+            calls += 1
+    return calls
+
+
+def bench_data_calls(item_model, rows, duration):
+    """ Measure DisplayRole data() calls per second at random positions.
+
+    The event loop is run between "frames" so that any per-frame caches
+    behave as they would in an application.
+    """
+    gui = GUI()
+    rng = random.Random(0)
+    last_row = max(0, rows - VIEWPORT_ROWS)
+    calls = 0
+    elapsed = 0.0
+    while elapsed < duration:
+        first_row = rng.randint(0, last_row)
+        start = time.perf_counter()
+        # a paint typically asks for each cell's data more than once
+        for _ in range(3):
+            calls += paint_viewport(item_model, first_row)
+        elapsed += time.perf_counter() - start
+        gui.process_events()
+    return calls / elapsed
+
+
+def bench_index_parent(item_model, model, count):
+    """ Measure the cost of index() and parent() for hierarchical data.
+
+    Returns the mean cost of each for leaf rows, in microseconds.
+    """
+    rng = random.Random(0)
+    parents = [
+        random_parent(item_model, model, rng) for _ in range(count)
+    ]
+    inner = item_model.rowCount(parents[0])
+    rows = [rng.randrange(inner) for _ in range(count)]
+
+    start = time.perf_counter()
+    children = [
+        item_model.index(row, 1, parent)
+        for row, parent in zip(rows, parents)
+    ]
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for child in children:
+        item_model.parent(child)
+    parent_time = time.perf_counter() - start
+
+    return index_time / count * 1e6, parent_time / count * 1e6
+
+
+def bench_index_manager_memory(model, count):
+    """ Measure memory allocated while visiting rows of hierarchical data.
+
+    Returns the number of bytes still allocated after visiting ``count``
+    rows at random.
+    """
+    item_model = DataViewItemModel(model)
+    rng = random.Random(0)
+    inner = model.data.shape[-2]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        parent = random_parent(item_model, model, rng)
+        index = item_model.index(rng.randrange(inner), 1, parent)
+        item_model.parent(index)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    item_model.model = None
+    return after - before
+
+
+def bench_first_paint(model):
+    """ Measure the time from creating a view to the end of its first paint.
+
+    Returns the time in milliseconds.
+    """
+    start = time.perf_counter()
+    item_model = DataViewItemModel(model)
+    view = QtGui.QTreeView()
+    view.setUniformRowHeights(True)
+    view.resize(800, 600)
+    view.setModel(item_model)
+    view.show()
+    # grab() renders the widget synchronously, including the viewport
+    view.grab()
+    elapsed = time.perf_counter() - start
+
+    view.setModel(None)
+    view.close()
+    view.deleteLater()
+    item_model.model = None
+    GUI().process_events()
+    return elapsed * 1000
+
+
+def run(sizes, duration, count):
+    """ Run all the benchmarks, yielding result dictionaries. """
+    flat_models = [
+        ("array", create_array_model),
+        ("column", create_column_model),
+    ]
+    for rows in sizes:
+        for name, factory in flat_models:
+            model = factory(rows)
+            item_model = DataViewItemModel(model)
+            yield {
+                "benchmark": "data_calls_per_second",
+                "model": name,
+                "rows": rows,
+                "value": bench_data_calls(item_model, rows, duration),
+                "unit": "calls/s",
+            }
+            item_model.model = None
+            yield {
+                "benchmark": "first_paint_ms",
+                "model": name,
+                "rows": rows,
+                "value": bench_first_paint(model),
+                "unit": "ms",
+            }
+            del model, item_model
+            gc.collect()
+
+        index_managers = [
+            ("shape", ShapeIndexManager),
+            ("tuple", TupleIndexManager),
+        ]
+        for dimensions in HIERARCHICAL_DIMENSIONS:
+            for manager_name, manager_factory in index_managers:
+                model = create_hierarchical_model(
+                    rows, manager_factory(), dimensions
+                )
+                if manager_factory is ShapeIndexManager:
+                    model.index_manager.shape = model.data.shape[:-1]
+                item_model = DataViewItemModel(model)
+                index_us, parent_us = bench_index_parent(
+                    item_model, model, count
+                )
+                item_model.model = None
+                name = "array_{}d_{}".format(dimensions, manager_name)
+                yield {
+                    "benchmark": "index_us",
+                    "model": name,
+                    "rows": rows,
+                    "value": index_us,
+                    "unit": "us",
+                }
+                yield {
+                    "benchmark": "parent_us",
+                    "model": name,
+                    "rows": rows,
+                    "value": parent_us,
+                    "unit": "us",
+                }
+                model.index_manager.reset()
+                yield {
+                    "benchmark": "index_manager_bytes",
+                    "model": name,
+                    "rows": rows,
+                    "value": bench_index_manager_memory(model, count),
+                    "unit": "bytes",
+                }
+                del model, item_model
+                gc.collect()
+
+
+def metadata():
+    """ Information about the environment the benchmarks were run in. """
+    return {
+        "pyface_version": pyface.__version__,
+        "python_version": platform.python_version(),
+        "numpy_version": np.__version__,
+        "qt_api": qt_api,
+        "qt_version": QtCore.qVersion(),
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM", ""),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(
+            datetime.timezone.utc
+        ).isoformat(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Qt data view."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="the numbers of rows to benchmark",
+    )
+    parser.add_argument(
+        "--output",
+        help="a file to write the results to as JSON",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="take fewer samples, for checking that the benchmarks run",
+    )
+    args = parser.parse_args(argv)
+
+    duration = 0.1 if args.quick else 1.0
+    count = 1000 if args.quick else 20000
+
+    GUI()
+    results = []
+    for result in run(args.sizes, duration, count):
+        print(
+            "{benchmark:<24} {model:<16} {rows:>10} {value:>14.2f} {unit}"
+            .format(**result)
+        )
+        sys.stdout.flush()
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"metadata": metadata(), "results": results}, f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+# THIS FILE IS GENERATED FROM PYFACE SETUP.PY
+version = '7.1.0'
+full_version = '7.1.0.dev0'
+git_revision = 'Unknown'
+is_released = False
+
+if not is_released:
+    version = full_version
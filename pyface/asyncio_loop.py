@@ -0,0 +1,565 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Support for running asyncio code on the Pyface GUI event loop.
+
+The toolkit event loop and an asyncio event loop both want to own the main
+thread.  This module lets the GUI event loop own it, and runs a
+``GUIEventLoop`` from it.  The loop tells its ``EventLoopPump`` when it has
+work to do: when a callback is scheduled with ``call_soon``, when the next
+``call_at`` deadline is due, and, through toolkit notifiers for the file
+descriptors registered with its selector, when a socket or pipe is ready.
+The pump then runs one iteration of the loop, so an idle loop doesn't wake
+the GUI thread at all.  Coroutines run on the GUI thread and can update
+widgets directly, while awaiting sockets, subprocess pipes and other
+asynchronous I/O.
+
+Toolkits which can't watch file descriptors fall back to polling the loop
+for I/O every ``FALLBACK_POLL_INTERVAL`` seconds.  Polling can also be
+requested with the ``poll_interval`` of the pump.
+
+The simplest way to use this is to install the ``GUIEventLoopPolicy`` before
+creating any event loop, schedule coroutines on the event loop and then
+start the GUI event loop as usual::
+
+    asyncio.set_event_loop_policy(GUIEventLoopPolicy())
+    loop = asyncio.get_event_loop_policy().get_event_loop()
+    loop.create_task(monitor_socket(widget))
+    gui.start_event_loop()
+
+Note that ``asyncio.run`` and ``loop.run_until_complete`` block until the
+coroutine completes, and so should not be used with the GUI event loop.
+
+This module also provides awaitable forms of ``GUI.invoke_later`` and
+``GUI.invoke_after``, which can be used from asyncio loops running on any
+thread, and ``TimerTicks``, an asynchronous iterator over the ticks of a
+Pyface timer.
+"""
+import asyncio
+import heapq
+import selectors
+import threading
+
+from traits.api import Bool, Dict, Either, HasStrictTraits, Instance, Int
+from traits.api import Range
+
+from pyface.gui import GUI
+from pyface.timer.i_timer import perf_counter
+from pyface.timer.timer import CallbackTimer
+from pyface.toolkit import toolkit_object
+
+IOWatcher = toolkit_object("io_watcher:IOWatcher")
+
+#: The interval in seconds at which loops are polled for I/O when the
+#: toolkit can't watch file descriptors.
+FALLBACK_POLL_INTERVAL = 0.01
+
+
+class GUIEventLoop(asyncio.SelectorEventLoop):
+    """ An asyncio event loop which can be run by an ``EventLoopPump``.
+
+    The loop keeps track of the deadlines of its scheduled callbacks and of
+    the file descriptors registered with its selector, and wakes its pump
+    when they change or when a callback is scheduled to run soon.
+
+    Parameters
+    ----------
+    selector : selectors.BaseSelector or None
+        The selector to use, or None to use the default selector.
+    """
+
+    def __init__(self, selector=None):
+        if selector is None:
+            selector = selectors.DefaultSelector()
+
+        # the events watched for on each file descriptor of the selector
+        self._io_events = {}
+
+        # whether the file descriptors have changed since the pump saw them
+        self._io_changed = True
+
+        # the handles of the callbacks scheduled by call_at, as a heap
+        self._deadlines = []
+
+        # the size of the heap of deadlines at which cancelled handles are
+        # next removed
+        self._deadlines_limit = 64
+
+        # whether callbacks may have been scheduled by call_soon since the
+        # pump last ran the loop
+        self._has_ready = False
+
+        # the callable which wakes the pump, or None
+        self._wakeup = None
+
+        super().__init__(_WatchedSelector(selector, self._watch))
+
+    def call_soon(self, callback, *args, **kwargs):
+        handle = super().call_soon(callback, *args, **kwargs)
+        self._has_ready = True
+        self._wake()
+        return handle
+
+    def call_at(self, when, callback, *args, **kwargs):
+        handle = super().call_at(when, callback, *args, **kwargs)
+        deadlines = self._deadlines
+        heapq.heappush(deadlines, handle)
+        if len(deadlines) > self._deadlines_limit:
+            # forget cancelled handles, like the loop's own heap does
+            deadlines[:] = [item for item in deadlines if not item.cancelled()]
+            heapq.heapify(deadlines)
+            self._deadlines_limit = max(64, 2 * len(deadlines))
+        if deadlines[0] is handle:
+            self._wake()
+        return handle
+
+    def close(self):
+        super().close()
+        # let the pump stop
+        self._wake()
+
+    # Private methods --------------------------------------------------------
+
+    def _get_next_delay(self):
+        """ The delay until the loop has work to do, or None if it is idle.
+        """
+        if self._has_ready:
+            return 0.0
+        deadlines = self._deadlines
+        while deadlines and deadlines[0].cancelled():
+            heapq.heappop(deadlines)
+        if deadlines:
+            return max(deadlines[0].when() - self.time(), 0.0)
+        return None
+
+    def _forget_deadlines(self, until):
+        """ Forget the deadlines up to a time, whose callbacks have run. """
+        deadlines = self._deadlines
+        while deadlines and (
+            deadlines[0].cancelled() or deadlines[0].when() <= until
+        ):
+            heapq.heappop(deadlines)
+
+    def _watch(self, fd, events):
+        """ Record the events watched for on a file descriptor. """
+        if events:
+            self._io_events[fd] = events
+        else:
+            self._io_events.pop(fd, None)
+        self._io_changed = True
+        self._wake()
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup()
+
+
+class EventLoopPump(HasStrictTraits):
+    """ Runs a ``GUIEventLoop`` from the Pyface GUI event loop.
+
+    The event loop is run for one iteration at a time, when a file
+    descriptor registered with it is ready, when a callback has been
+    scheduled to run soon, or from a Pyface timer when the next scheduled
+    callback is due.
+    """
+
+    #: The asyncio event loop to run.
+    loop = Instance(GUIEventLoop)
+
+    #: The longest time in seconds between iterations of the asyncio loop,
+    #: or None to only run the loop when it has work to do.  Polling is
+    #: only needed for toolkits which can't watch file descriptors, which
+    #: poll every ``FALLBACK_POLL_INTERVAL`` seconds if this is None.
+    poll_interval = Either(None, Range(low=0.0))
+
+    #: Whether the asyncio loop is being run.
+    active = Bool()
+
+    #: The number of iterations of the asyncio loop which have been run.
+    iterations = Int()
+
+    # Private traits ---------------------------------------------------------
+
+    #: The timer which runs the asyncio loop when a deadline is due.
+    _timer = Instance(CallbackTimer)
+
+    #: The toolkit watchers of the file descriptors of the loop.
+    _watchers = Dict()
+
+    #: Whether an iteration of the loop is being run.
+    _iterating = Bool()
+
+    def start(self):
+        """ Start running the asyncio loop from the GUI event loop. """
+        if not self.active:
+            if self._timer is None:
+                self._timer = CallbackTimer(callback=self._pump, interval=0.0)
+            self.active = True
+            self.loop._wakeup = self._wake
+            self.loop._io_changed = True
+            self._wake()
+
+    def stop(self):
+        """ Stop running the asyncio loop from the GUI event loop. """
+        if self.active:
+            self._timer.stop()
+            self.loop._wakeup = None
+            for watcher in self._watchers.values():
+                watcher.close()
+            self._watchers = {}
+            self.active = False
+
+    # Private methods --------------------------------------------------------
+
+    def _pump(self):
+        """ Run one iteration of the asyncio loop, and wait for more work. """
+        if not self.active:
+            return
+        loop = self.loop
+        if loop.is_closed():
+            self.stop()
+            return
+
+        self._timer.stop()
+        if self._iterating or loop.is_running() or _is_loop_running():
+            # a callback is running a nested GUI event loop: don't wake up
+            # for I/O until the iteration has finished
+            for watcher in self._watchers.values():
+                watcher.set_enabled(False)
+            if not self._iterating:
+                # the loop is being run elsewhere, so check back later
+                self._set_timer(FALLBACK_POLL_INTERVAL)
+            return
+
+        # stopping before running makes run_forever do one iteration,
+        # polling for I/O without blocking
+        start = loop.time()
+        loop._has_ready = False
+        self._iterating = True
+        try:
+            loop.stop()
+            loop.run_forever()
+        finally:
+            self._iterating = False
+        self.iterations += 1
+        loop._forget_deadlines(start)
+
+        if self.active and not loop.is_closed():
+            for watcher in self._watchers.values():
+                watcher.set_enabled(True)
+            self._wake()
+
+    def _wake(self):
+        """ Update the I/O watchers and the timer for the loop's work. """
+        if self._iterating:
+            # this is done when the iteration finishes
+            return
+        if self.loop.is_closed():
+            self.stop()
+            return
+        if self.loop._io_changed:
+            self._update_watchers()
+        delay = self.loop._get_next_delay()
+        poll_interval = self.poll_interval
+        if poll_interval is None and not _can_watch_io():
+            poll_interval = FALLBACK_POLL_INTERVAL
+        if poll_interval is not None:
+            delay = poll_interval if delay is None else min(
+                delay, poll_interval
+            )
+        if delay == 0.0 and self._timer.active and self._timer.interval == 0:
+            # the loop will already be run as soon as possible
+            return
+        self._timer.stop()
+        if delay is not None:
+            self._set_timer(delay)
+
+    def _set_timer(self, delay):
+        """ Run the loop from the timer after a delay in seconds. """
+        self._timer.interval = delay
+        self._timer.start()
+
+    def _update_watchers(self):
+        """ Watch the file descriptors registered with the loop. """
+        self.loop._io_changed = False
+        if not _can_watch_io():
+            return
+        io_events = self.loop._io_events
+        for fd in list(self._watchers):
+            if fd not in io_events:
+                self._watchers.pop(fd).close()
+        for fd, events in io_events.items():
+            watcher = self._watchers.get(fd)
+            if watcher is None:
+                watcher = self._watchers[fd] = IOWatcher(fd, self._pump)
+            watcher.watch(
+                read=bool(events & selectors.EVENT_READ),
+                write=bool(events & selectors.EVENT_WRITE),
+            )
+
+
+class GUIEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """ An event loop policy which runs loops on the Pyface GUI event loop.
+
+    Event loops created on the main thread by this policy are
+    ``GUIEventLoop`` instances, run from the GUI event loop by an
+    ``EventLoopPump``.  Event loops created on other threads are the
+    default event loops, and must be run as usual.
+
+    Parameters
+    ----------
+    poll_interval : float or None
+        The longest time in seconds between iterations of the asyncio
+        event loops, or None to only run them when they have work to do.
+    """
+
+    def __init__(self, poll_interval=None):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self._pumps = {}
+
+    def new_event_loop(self):
+        if threading.current_thread() is not threading.main_thread():
+            return super().new_event_loop()
+
+        # discard the pumps of loops which have been closed
+        self._pumps = {
+            old_loop: pump
+            for old_loop, pump in self._pumps.items()
+            if not old_loop.is_closed()
+        }
+        loop = GUIEventLoop()
+        pump = EventLoopPump(loop=loop, poll_interval=self.poll_interval)
+        pump.start()
+        self._pumps[loop] = pump
+        return loop
+
+    def get_pump(self, loop):
+        """ Get the pump which runs an event loop, or None. """
+        return self._pumps.get(loop)
+
+
+def invoke_later_async(callable, *args, **kwargs):
+    """ Call a callable on the GUI thread, and await its result.
+
+    This must be called from a coroutine or callback running on an asyncio
+    event loop, which may be on any thread.
+
+    Parameters
+    ----------
+    callable : callable
+        The callable to call on the GUI thread.
+    *args, **kwargs :
+        Arguments to be passed through to the callable.
+
+    Returns
+    -------
+    future : asyncio.Future
+        A future which is resolved with the result of the call, or the
+        exception it raised.  If the future is cancelled before the call
+        is made, the call is not made.
+    """
+    return invoke_after_async(0, callable, *args, **kwargs)
+
+
+def invoke_after_async(millisecs, callable, *args, **kwargs):
+    """ Call a callable on the GUI thread after a delay, and await its result.
+
+    This must be called from a coroutine or callback running on an asyncio
+    event loop, which may be on any thread.
+
+    Parameters
+    ----------
+    millisecs : float
+        The delay in milliseconds.
+    callable : callable
+        The callable to call on the GUI thread.
+    *args, **kwargs :
+        Arguments to be passed through to the callable.
+
+    Returns
+    -------
+    future : asyncio.Future
+        A future which is resolved with the result of the call, or the
+        exception it raised.  If the future is cancelled before the call
+        is made, the call is not made.
+    """
+    loop = _get_running_loop()
+    future = loop.create_future()
+
+    def call():
+        if future.cancelled():
+            return
+        try:
+            result = callable(*args, **kwargs)
+        except BaseException as exc:
+            loop.call_soon_threadsafe(_resolve, future, None, exc)
+        else:
+            loop.call_soon_threadsafe(_resolve, future, result, None)
+
+    if millisecs > 0:
+        GUI.invoke_after(millisecs, call)
+    else:
+        GUI.invoke_later(call)
+    return future
+
+
+class TimerTicks(object):
+    """ An asynchronous iterator over the ticks of a Pyface timer.
+
+    This must be used from an asyncio event loop running on the GUI thread,
+    such as one created by the ``GUIEventLoopPolicy``.  The timer is started
+    when iteration starts and is stopped when the iteration finishes, when
+    the ``aclose`` method is called or when it is used as an asynchronous
+    context manager and the context exits::
+
+        async with TimerTicks(0.5, expire=10.0) as ticks:
+            async for tick in ticks:
+                label.text = "{:.1f}s".format(tick - start)
+
+    The values yielded are the values of ``time.perf_counter`` when the
+    timer ticked.
+
+    Parameters
+    ----------
+    interval : float
+        The interval between ticks in seconds.
+    repeat : int or None
+        The number of ticks, or None if there is no limit.
+    expire : float or None
+        The maximum length of time to tick for in seconds, or None if there
+        is no limit.
+    """
+
+    def __init__(self, interval, repeat=None, expire=None):
+        self.timer = CallbackTimer(
+            callback=self._tick, interval=interval, repeat=repeat,
+            expire=expire,
+        )
+        self._loop = None
+        self._queue = None
+        self._stopped = False
+
+    async def aclose(self):
+        """ Stop the timer. """
+        self._stop()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._queue is None:
+            self._loop = _get_running_loop()
+            self._queue = asyncio.Queue()
+            self.timer.observe(self._finished, "active")
+            self.timer.start()
+        value = await self._queue.get()
+        if value is None:
+            self._stop()
+            raise StopAsyncIteration()
+        return value
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._stop()
+
+    def _tick(self):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, perf_counter())
+
+    def _finished(self, event):
+        if not event.new:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def _stop(self):
+        if self._queue is not None and not self._stopped:
+            self._stopped = True
+            self.timer.observe(self._finished, "active", remove=True)
+            self.timer.stop()
+            # any further iteration finishes immediately
+            self._queue.put_nowait(None)
+
+
+# Private functions ----------------------------------------------------------
+
+def _resolve(future, result, exception):
+    """ Resolve a future, unless it has been cancelled. """
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+def _get_running_loop():
+    """ Get the asyncio loop running in the current thread.
+
+    This is ``asyncio.get_running_loop``, which is not available before
+    Python 3.7.
+    """
+    loop = asyncio._get_running_loop()
+    if loop is None:
+        raise RuntimeError("no running event loop")
+    return loop
+
+
+def _is_loop_running():
+    """ Whether any asyncio loop is running in the current thread. """
+    return asyncio._get_running_loop() is not None
+
+
+def _can_watch_io():
+    """ Whether the toolkit can watch file descriptors for I/O. """
+    return IOWatcher.__name__ != "Unimplemented"
+
+
+class _WatchedSelector(selectors.BaseSelector):
+    """ A selector which reports the events watched for on each file.
+
+    Parameters
+    ----------
+    selector : selectors.BaseSelector
+        The selector which does the work.
+    watch : callable
+        A callable which is called with a file descriptor and the events
+        watched for on it whenever they change.
+    """
+
+    def __init__(self, selector, watch):
+        self._selector = selector
+        self._watch = watch
+
+    def register(self, fileobj, events, data=None):
+        key = self._selector.register(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def unregister(self, fileobj):
+        key = self._selector.unregister(fileobj)
+        self._watch(key.fd, 0)
+        return key
+
+    def modify(self, fileobj, events, data=None):
+        key = self._selector.modify(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def select(self, timeout=None):
+        return self._selector.select(timeout)
+
+    def close(self):
+        self._selector.close()
+
+    def get_key(self, fileobj):
+        return self._selector.get_key(fileobj)
+
+    def get_map(self):
+        return self._selector.get_map()
@@ -0,0 +1,382 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Run work in the background, with results delivered on the GUI thread.
+
+The ``BackgroundExecutor`` runs callables on a pool of worker threads or
+processes from ``concurrent.futures``, and returns ``BackgroundFuture``
+objects whose done and progress callbacks are always called on the GUI
+thread, so they can safely update widgets::
+
+    executor = BackgroundExecutor(max_workers=2)
+
+    def show_result(future):
+        if not future.cancelled():
+            label.text = str(future.result())
+
+    future = executor.submit_for(panel, load_data, filename)
+    future.add_done_callback(show_result)
+
+Work submitted with ``submit_for`` is cancelled when its owner, a widget or
+a task, is destroyed, or if it is already running, its callbacks are
+dropped.  The ``queue_length``, ``active_count`` and
+``utilisation`` traits of the executor are updated on the GUI thread and
+are suitable for display in a status bar.
+"""
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
+import functools
+import threading
+
+from traits.api import Any, Enum, HasStrictTraits, Instance, Int, Range
+
+from pyface.gui import GUI
+
+
+class BackgroundFuture(Future):
+    """ A future whose callbacks are called on the GUI thread.
+
+    As with other futures, the future is running while its work runs, and
+    only work which has not started can be cancelled.  Done callbacks are
+    called with the future, and progress callbacks with the reported value,
+    via ``GUI.invoke_later``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._progress_callbacks = []
+        self._pool_future = None
+        # whether the callbacks are dropped, as no one wants the result
+        self._abandoned = False
+
+    def add_done_callback(self, fn):
+        """ Attach a callable to be called on the GUI thread when done.
+
+        Parameters
+        ----------
+        fn : callable
+            A callable which takes the future as its only argument.
+        """
+        super().add_done_callback(
+            functools.partial(GUI.invoke_later, self._call_done_callback, fn)
+        )
+
+    def add_progress_callback(self, fn):
+        """ Attach a callable to be called on the GUI thread with progress.
+
+        Progress values reported faster than the GUI can handle them are
+        coalesced, so that only the most recent value is delivered.
+
+        Parameters
+        ----------
+        fn : callable
+            A callable which takes the reported value as its only argument.
+        """
+        self._progress_callbacks.append(fn)
+
+    def running(self):
+        """ Whether the work is running.
+
+        Returns
+        -------
+        running : bool
+            True if the work is running, False otherwise.
+        """
+        if super().running():
+            return True
+        # work in worker processes can't report that it has started, but
+        # the pool knows
+        pool_future = self._pool_future
+        return (
+            pool_future is not None
+            and pool_future.running()
+            and not self.done()
+        )
+
+    def cancel(self):
+        """ Cancel the future, if its work has not started.
+
+        Returns
+        -------
+        cancelled : bool
+            False if the work is running or has completed, True otherwise.
+        """
+        pool_future = self._pool_future
+        if pool_future is not None and not pool_future.cancel():
+            # the work has started, so it can't be cancelled
+            return False
+        return super().cancel()
+
+    # Private methods --------------------------------------------------------
+
+    def _report_progress(self, value):
+        """ Report progress from a worker thread.
+
+        Returns False if the callbacks have been dropped, True otherwise.
+        """
+        if self._abandoned:
+            return False
+        GUI.invoke_later_coalesced(
+            (id(self), "progress"), self._deliver_progress, value
+        )
+        return True
+
+    def _abandon(self):
+        """ Cancel the future, or drop its callbacks if its work is running.
+        """
+        if not self.cancel():
+            self._abandoned = True
+
+    def _call_done_callback(self, fn, future):
+        """ Call a done callback on the GUI thread. """
+        if not self._abandoned:
+            fn(future)
+
+    def _deliver_progress(self, value):
+        """ Call the progress callbacks on the GUI thread. """
+        if not (self.done() or self._abandoned):
+            for fn in self._progress_callbacks:
+                fn(value)
+
+    def _transfer(self, pool_future):
+        """ Complete the future from the pool's future, in any thread. """
+        if pool_future.cancelled():
+            super().cancel()
+            return
+        if not super().running() and not self.set_running_or_notify_cancel():
+            # cancelled before the work started
+            return
+        exception = pool_future.exception()
+        if exception is not None:
+            self.set_exception(exception)
+        else:
+            self.set_result(pool_future.result())
+
+
+class BackgroundExecutor(HasStrictTraits):
+    """ Run callables on a pool of workers, reporting back on the GUI thread.
+
+    The pool is created when work is first submitted, and is shut down by
+    ``shutdown``.  Work is queued first-in, first-out, and the status traits
+    model the pool as running the oldest ``max_workers`` tasks.
+    """
+
+    #: Whether to run work on worker threads or in worker processes.  Work
+    #: run in processes must be picklable and can't report progress.
+    kind = Enum("thread", "process")
+
+    #: The number of workers in the pool.
+    max_workers = Range(low=1, value=4)
+
+    #: The number of tasks waiting for a worker.
+    queue_length = Int()
+
+    #: The number of tasks being run by workers.
+    active_count = Int()
+
+    #: The fraction of the workers which are busy.
+    utilisation = Range(low=0.0, high=1.0)
+
+    # Private traits ---------------------------------------------------------
+
+    #: The pool of workers, created when it is first needed.
+    _pool = Instance(Executor)
+
+    #: The futures of the work in the pool which has not finished, keyed by
+    #: the pool's futures.  Work which was abandoned while it was running
+    #: stays here until it finishes, as it still occupies a worker.
+    _outstanding = Instance(dict, ())
+
+    #: The outstanding futures of each owner, keyed by owner.
+    _owned = Instance(dict, ())
+
+    #: A lock protecting the outstanding futures.
+    _lock = Any()
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._lock = threading.Lock()
+
+    def submit(self, callable, *args, **kwargs):
+        """ Submit a callable to be run in the background.
+
+        Parameters
+        ----------
+        callable : callable
+            The callable to run.
+        *args, **kwargs :
+            Arguments to be passed through to the callable.
+
+        Returns
+        -------
+        future : BackgroundFuture
+            A future for the result of the call.
+        """
+        return self._submit(callable, args, kwargs, False)
+
+    def submit_with_progress(self, callable, *args, **kwargs):
+        """ Submit a callable which reports its progress.
+
+        The callable is passed a ``progress`` keyword argument, a function
+        that it may call from its worker thread with any value, as often as
+        it likes.  The function returns False once no one wants the result,
+        because ``cancel_all`` or ``shutdown`` has been called, so that the
+        work can stop early.  This is only supported by thread pools.
+
+        Parameters
+        ----------
+        callable : callable
+            The callable to run.
+        *args, **kwargs :
+            Arguments to be passed through to the callable.
+
+        Returns
+        -------
+        future : BackgroundFuture
+            A future for the result of the call.
+        """
+        if self.kind != "thread":
+            raise ValueError("Progress can only be reported from threads.")
+        return self._submit(callable, args, kwargs, True)
+
+    def submit_for(self, owner, callable, *args, **kwargs):
+        """ Submit a callable to be cancelled when its owner is destroyed.
+
+        Parameters
+        ----------
+        owner : IWidget or Task
+            The owner of the work.  The work is cancelled when the owner's
+            ``control`` (for widgets) or ``window`` (for tasks) is set to
+            None, or if it is running, its done and progress callbacks are
+            dropped.  This must be called from the GUI thread.
+        callable : callable
+            The callable to run.
+        *args, **kwargs :
+            Arguments to be passed through to the callable.
+
+        Returns
+        -------
+        future : BackgroundFuture
+            A future for the result of the call.
+        """
+        future = self.submit(callable, *args, **kwargs)
+        futures = self._owned.get(owner)
+        if futures is None:
+            futures = self._owned[owner] = set()
+            owner.observe(self._owner_destroyed, _owner_trait(owner))
+        futures.add(future)
+        future.add_done_callback(
+            functools.partial(self._release, owner)
+        )
+        return future
+
+    def cancel_all(self):
+        """ Cancel all the work which has not started.
+
+        The done and progress callbacks of work which is running are
+        dropped.
+        """
+        with self._lock:
+            outstanding = list(self._outstanding.values())
+        for future in outstanding:
+            future._abandon()
+
+    def shutdown(self, wait=True):
+        """ Cancel all outstanding work and shut down the pool.
+
+        Parameters
+        ----------
+        wait : bool
+            Whether to wait for running work to finish.
+        """
+        self.cancel_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    # Private methods --------------------------------------------------------
+
+    def _submit(self, callable, args, kwargs, progress):
+        """ Submit work to the pool, creating the pool if needed. """
+        if self._pool is None:
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        future = BackgroundFuture()
+        if progress:
+            kwargs = dict(kwargs, progress=future._report_progress)
+        if self.kind == "thread":
+            pool_future = self._pool.submit(
+                _run_future, future, callable, args, kwargs
+            )
+        else:
+            # the future can't be used by worker processes
+            pool_future = self._pool.submit(callable, *args, **kwargs)
+        future._pool_future = pool_future
+        with self._lock:
+            self._outstanding[pool_future] = future
+        pool_future.add_done_callback(future._transfer)
+        pool_future.add_done_callback(self._work_done)
+        self._update_status()
+        return future
+
+    def _work_done(self, pool_future):
+        """ Forget finished or cancelled work, in any thread. """
+        with self._lock:
+            self._outstanding.pop(pool_future, None)
+        self._update_status()
+
+    def _update_status(self):
+        """ Request an update of the status traits on the GUI thread. """
+        GUI.invoke_later_coalesced((id(self), "status"), self._set_status)
+
+    def _set_status(self):
+        """ Update the status traits on the GUI thread. """
+        with self._lock:
+            outstanding = len(self._outstanding)
+        active = min(outstanding, self.max_workers)
+        self.active_count = active
+        self.queue_length = outstanding - active
+        self.utilisation = active / self.max_workers
+
+    def _release(self, owner, future):
+        """ Forget a completed future of an owner, on the GUI thread. """
+        futures = self._owned.get(owner)
+        if futures is None:
+            return
+        futures.discard(future)
+        if not futures:
+            del self._owned[owner]
+            owner.observe(
+                self._owner_destroyed, _owner_trait(owner), remove=True
+            )
+
+    def _owner_destroyed(self, event):
+        """ Cancel the work of an owner whose control or window has gone. """
+        if event.new is None:
+            owner = event.object
+            for future in list(self._owned.get(owner, ())):
+                future._abandon()
+                # the done callbacks of abandoned work are never called
+                self._release(owner, future)
+
+
+def _run_future(future, callable, args, kwargs):
+    """ Run the work of a future on a worker thread, if not cancelled. """
+    if not future.set_running_or_notify_cancel():
+        return None
+    return callable(*args, **kwargs)
+
+
+def _owner_trait(owner):
+    """ The trait which is set to None when an owner is destroyed. """
+    return "window" if owner.trait("control") is None else "control"
@@ -0,0 +1,417 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Provides an AbstractAsyncDataModel ABC for slow data stores.
+
+Toolkits request the values of data models on the GUI thread while
+painting, and so a data model whose values come from a slow store, such as
+chunks of a HDF5 file or a database query, can block the GUI for every
+value that it has to load.  This module provides an abstract data model
+which instead loads values in blocks on a pool of worker threads and
+displays a placeholder until they arrive.
+"""
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+import logging
+from threading import Lock
+
+from traits.api import Any, Bool, Event, Instance, Int, observe
+
+from .abstract_data_model import AbstractDataModel
+from .abstract_value_type import AbstractValueType
+from .value_types.constant_value import ConstantValue
+
+
+logger = logging.getLogger(__name__)
+
+
+class AbstractAsyncDataModel(AbstractDataModel):
+    """ Abstract base class for data models with slow-to-load values.
+
+    The values of data cells are loaded a block of rows and columns at a
+    time by the ``fetch_values`` method, which is called on a worker
+    thread.  Until the block containing a cell has been loaded,
+    ``get_value`` returns the ``placeholder`` value and ``get_value_type``
+    returns the ``placeholder_type``, so views display placeholder text
+    without waiting.  When blocks arrive, the values are stored in a
+    bounded cache and ``values_changed`` is fired on the GUI thread so that
+    the cells are repainted; blocks which arrive together are reported with
+    a single event for each parent row.
+
+    Views request the values of the cells that they are displaying, so
+    the most recently requested blocks are the ones in view.  At most
+    ``max_pending`` blocks are queued for loading: when the view scrolls
+    past more blocks than this, the fetches of the least recently requested
+    blocks are cancelled if they have not yet started.
+
+    Subclasses need to implement the structural methods of
+    ``AbstractDataModel`` as usual, together with ``fetch_values`` and
+    ``get_loaded_value_type``, which supplies the value types of cells
+    whose values are available.  The values of row and column headers are
+    assumed to be cheap and are provided synchronously by
+    ``get_header_value``.  Subclasses which change the structure of the
+    data should fire ``structure_changed`` or the row events as usual: this
+    discards any loaded or pending blocks.  If values change without a
+    change in structure, ``invalidate`` should be called before firing
+    ``values_changed``.
+    """
+
+    #: The number of rows of values fetched at once.
+    block_rows = Int(256)
+
+    #: The number of columns of values fetched at once.
+    block_columns = Int(16)
+
+    #: The maximum number of loaded blocks to keep.  The least recently
+    #: used blocks are discarded when this is exceeded.
+    max_blocks = Int(256)
+
+    #: The maximum number of blocks waiting to be fetched.
+    max_pending = Int(32)
+
+    #: The number of worker threads used by the default executor.
+    max_workers = Int(4)
+
+    #: The executor that fetches blocks.  By default this is a thread pool
+    #: created when it is first needed, which is shut down by ``dispose``.
+    executor = Instance(Executor)
+
+    #: The value of data cells whose values have not yet been loaded.
+    placeholder = Any()
+
+    #: The value type of data cells whose values have not yet been loaded.
+    placeholder_type = Instance(AbstractValueType)
+
+    #: The number of block fetches which have been submitted.
+    fetches_submitted = Int()
+
+    #: The number of block fetches which were cancelled before they ran.
+    fetches_cancelled = Int()
+
+    #: The loaded blocks of values, keyed by (parent, row_start,
+    #: column_start), in order from least to most recently used.
+    _blocks = Instance(OrderedDict, ())
+
+    #: The futures of blocks which are being fetched, keyed as for
+    #: ``_blocks``, in order from least to most recently requested.
+    _pending = Instance(OrderedDict, ())
+
+    #: Completed fetches which have not yet been handled on the GUI thread.
+    _completed = Any()
+
+    #: A lock protecting the completed fetches.
+    _completed_lock = Any()
+
+    #: Event fired from worker threads when the completed fetches need to
+    #: be handled.
+    _fetches_completed = Event()
+
+    #: Whether the default executor was created by this model.
+    _owns_executor = Bool(False)
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._completed = []
+        self._completed_lock = Lock()
+
+    # Data value methods
+
+    def get_value(self, row, column):
+        """ Return the Python value for the row and column.
+
+        Header values are obtained from ``get_header_value``.  For data
+        cells, the ``placeholder`` value is returned and the block
+        containing the cell is fetched if its values are not yet loaded.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        value : any
+            The value represented by the given row and column.
+        """
+        if len(row) == 0 or len(column) == 0:
+            return self.get_header_value(row, column)
+        key, row_offset, column_offset = self._get_key(row, column)
+        block = self._get_block(key)
+        if block is None:
+            return self.placeholder
+        return block[row_offset][column_offset]
+
+    def get_value_type(self, row, column):
+        """ Return the value type of the given row and column.
+
+        This returns the ``placeholder_type`` for data cells whose values
+        have not yet been loaded, and otherwise the value type given by
+        ``get_loaded_value_type``.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        value_type : AbstractValueType or None
+            The value type of the given row and column, or None if no value
+            should be displayed.
+        """
+        if len(row) != 0 and len(column) != 0:
+            key = self._get_key(row, column)[0]
+            if self._get_block(key) is None:
+                return self.placeholder_type
+        return self.get_loaded_value_type(row, column)
+
+    def get_header_value(self, row, column):
+        """ Return the value of a row or column header.
+
+        The default implementation returns the position of the row or
+        column.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+            At least one of row and column is empty.
+
+        Returns
+        -------
+        value : any
+            The value of the header.
+        """
+        if len(row) == 0:
+            if len(column) == 0:
+                return None
+            return column[0]
+        return row[-1]
+
+    @abstractmethod
+    def get_loaded_value_type(self, row, column):
+        """ Return the value type of a cell whose value is available.
+
+        This is called for row and column headers, and for data cells
+        once their values have been loaded.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        value_type : AbstractValueType or None
+            The value type of the given row and column, or None if no value
+            should be displayed.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def fetch_values(self, parent, rows, columns):
+        """ Load the values of a block of child rows and columns.
+
+        This is called on a worker thread, and so must not touch the GUI
+        or fire trait events.  Exceptions are logged and the block is
+        fetched again when it is next requested.
+
+        Parameters
+        ----------
+        parent : tuple of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : range
+            The positions of the rows in the parent's children.
+        columns : range
+            The column numbers.
+
+        Returns
+        -------
+        values : sequence of sequences
+            The values of the cells, indexed first by row and then by
+            column.
+        """
+        raise NotImplementedError()
+
+    # Cache management methods
+
+    def is_loaded(self, row, column):
+        """ Whether the value of a data cell is available.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 1.
+
+        Returns
+        -------
+        is_loaded : bool
+            Whether the block containing the cell has been loaded.
+        """
+        key = self._get_key(row, column)[0]
+        return key in self._blocks
+
+    def invalidate(self):
+        """ Discard all loaded values and cancel all pending fetches.
+
+        Fetches which have already started run to completion, but their
+        results are discarded.
+        """
+        self._blocks.clear()
+        for future in self._pending.values():
+            if future.cancel():
+                self.fetches_cancelled += 1
+        self._pending.clear()
+
+    def dispose(self):
+        """ Discard all values and shut down the default executor. """
+        self.invalidate()
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self._owns_executor = False
+
+    # Private methods -------------------------------------------------------
+
+    def _get_key(self, row, column):
+        """ Get the key of a cell's block and the cell's offset in it. """
+        parent = tuple(row[:-1])
+        row_offset = row[-1] % self.block_rows
+        column_offset = column[0] % self.block_columns
+        key = (parent, row[-1] - row_offset, column[0] - column_offset)
+        return key, row_offset, column_offset
+
+    def _get_block(self, key):
+        """ Get a loaded block, or request it if it is not loaded. """
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+
+        pending = self._pending
+        if key in pending:
+            pending.move_to_end(key)
+        else:
+            self._submit(key)
+        return None
+
+    def _submit(self, key):
+        """ Submit a block to be fetched, cancelling stale fetches. """
+        parent, row_start, column_start = key
+        rows = range(
+            row_start,
+            min(row_start + self.block_rows, self.get_row_count(parent)),
+        )
+        columns = range(
+            column_start,
+            min(column_start + self.block_columns, self.get_column_count()),
+        )
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._owns_executor = True
+
+        future = self.executor.submit(self.fetch_values, parent, rows, columns)
+        self._pending[key] = future
+        self.fetches_submitted += 1
+        future.add_done_callback(
+            lambda future: self._fetch_done(key, future)
+        )
+
+        # cancel the least recently requested fetches that haven't started
+        queued = [
+            stale_key
+            for stale_key, stale_future in self._pending.items()
+            if not (stale_future.running() or stale_future.done())
+        ]
+        for stale_key in queued[:max(len(queued) - self.max_pending, 0)]:
+            if self._pending[stale_key].cancel():
+                del self._pending[stale_key]
+                self.fetches_cancelled += 1
+
+    def _fetch_done(self, key, future):
+        """ Record a completed fetch, possibly on a worker thread. """
+        if future.cancelled():
+            return
+        with self._completed_lock:
+            self._completed.append((key, future))
+            notify = len(self._completed) == 1
+        if notify:
+            self._fetches_completed = True
+
+    # Trait defaults --------------------------------------------------------
+
+    def _placeholder_type_default(self):
+        return ConstantValue(text="...")
+
+    # Trait change handlers --------------------------------------------------
+
+    @observe('_fetches_completed', dispatch='ui')
+    def _store_completed_fetches(self, event):
+        """ Store fetched blocks and report their changes on the GUI thread.
+        """
+        with self._completed_lock:
+            completed = self._completed
+            self._completed = []
+
+        regions = {}
+        for key, future in completed:
+            if self._pending.get(key) is not future:
+                # the block was invalidated while it was being fetched
+                continue
+            del self._pending[key]
+            try:
+                block = future.result()
+            except Exception:
+                logger.exception("Error fetching data model values")
+                continue
+
+            self._blocks[key] = block
+            parent, row_start, column_start = key
+            row_end = row_start + len(block) - 1
+            column_end = column_start + self.block_columns - 1
+            if parent in regions:
+                top, left, bottom, right = regions[parent]
+                regions[parent] = (
+                    min(top, row_start),
+                    min(left, column_start),
+                    max(bottom, row_end),
+                    max(right, column_end),
+                )
+            else:
+                regions[parent] = (row_start, column_start, row_end,
+                                   column_end)
+
+        while len(self._blocks) > max(self.max_blocks, 1):
+            self._blocks.popitem(last=False)
+
+        column_count = self.get_column_count()
+        for parent, (top, left, bottom, right) in regions.items():
+            right = min(right, column_count - 1)
+            if bottom < top or right < left:
+                continue
+            self.values_changed = (
+                parent + (top,), (left,), parent + (bottom,), (right,)
+            )
+
+    @observe('structure_changed,rows_inserted,rows_removed,rows_moved')
+    def _structure_updated(self, event):
+        """ Discard loaded and pending blocks when the structure changes. """
+        self.invalidate()
@@ -17,6 +17,7 @@ to be toolkit-independent, and be able to adapt any approximately tabular or
 nested data structure to what the data view system expects.
 """
 from abc import abstractmethod
+from contextlib import contextmanager
 
 from traits.api import ABCHasStrictTraits, Event, Instance
 
@@ -44,7 +45,19 @@ class AbstractDataModel(ABCHasStrictTraits):
     of columns in a particular row, as well as the hierarchical structure of
     the rows.  Appropriate observers should be set up on the underlaying data
     so that the ``structure_changed`` event is fired when the values returned
-    by these methods would change.
+    by these methods would change.  Where the change is simply the insertion,
+    removal or movement of some child rows, the ``rows_inserted``,
+    ``rows_removed`` or ``rows_moved`` events can be fired instead, which
+    allows views to preserve state such as the selection and scroll
+    position.  These events, like ``structure_changed``, should be fired
+    after the underlying data has changed.  Where possible, insertions and
+    removals should also be announced before the data changes, by making
+    them within the ``inserting_rows`` or ``removing_rows`` context
+    managers, since some toolkits need to look at the rows which are about
+    to be removed, and must not see inserted rows before they are told
+    about them.  Models of very large or
+    streaming data can load child rows incrementally by overriding the
+    ``can_fetch_more`` and ``fetch_more`` methods.
 
     Subclasses also have to implement the ``get_value`` and ``get_value_type``
     methods.  These expect a row and column index, with root values treated
@@ -66,6 +79,11 @@ class AbstractDataModel(ABCHasStrictTraits):
     ``set_value`` should also fire the ``values_changed`` event with
     appropriate values.
 
+    Toolkit models may request values and text for whole blocks of cells
+    at once via the ``get_values`` and ``get_texts`` methods.  These have
+    default implementations which work cell-by-cell, but subclasses which
+    can efficiently extract blocks of data should override them.
+
     In the cases where the underlying data structure cannot be observed by
     the usual traits mechanisms, the end-user of the code may be responsible
     for ensuring that the ``structure_changed`` and ``values_changed`` events
@@ -87,6 +105,39 @@ class AbstractDataModel(ABCHasStrictTraits):
     #: slicing notation.
     values_changed = Event()
 
+    #: Event fired when child rows have been inserted.  This should be set
+    #: to a 3-tuple of (parent_row_index, start, count), where the new rows
+    #: are the children of the parent with positions from start up to (but
+    #: not including) start + count.
+    rows_inserted = Event()
+
+    #: Event fired when child rows have been removed.  This should be set
+    #: to a 3-tuple of (parent_row_index, start, count), where the removed
+    #: rows were the children of the parent with positions from start up to
+    #: (but not including) start + count.
+    rows_removed = Event()
+
+    #: Event fired when child rows are about to be inserted, before the
+    #: underlying data changes.  This is a 3-tuple like ``rows_inserted``,
+    #: and must be followed by a ``rows_inserted`` event with the same value
+    #: once the rows have been inserted.
+    rows_about_to_be_inserted = Event()
+
+    #: Event fired when child rows are about to be removed, before the
+    #: underlying data changes.  This is a 3-tuple like ``rows_removed``,
+    #: and must be followed by a ``rows_removed`` event with the same value
+    #: once the rows have been removed.
+    rows_about_to_be_removed = Event()
+
+    #: Event fired when child rows have been moved.  This should be set to
+    #: a 5-tuple of (parent_row_index, start, count,
+    #: destination_parent_row_index, destination_row), where the moved rows
+    #: were the children of the parent with positions from start up to (but
+    #: not including) start + count.  The destination parent and row are
+    #: expressed in terms of the rows before the move, so the moved rows are
+    #: placed before the row which was at the destination row.
+    rows_moved = Event()
+
     # Data structure methods
 
     @abstractmethod
@@ -135,6 +186,60 @@ class AbstractDataModel(ABCHasStrictTraits):
         """
         raise NotImplementedError()
 
+    def can_fetch_more(self, row):
+        """ Whether the row has more child rows which can be loaded.
+
+        Models of very large or streaming data can report only the child
+        rows which have been loaded so far from ``get_row_count``, and
+        return True from this method while more child rows are available.
+        Toolkits which support incremental loading will then call
+        ``fetch_more`` when the view needs more rows, eg. when the user
+        scrolls to the end of the rows loaded so far.
+
+        The default implementation assumes that all rows are available and
+        returns False.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+
+        Returns
+        -------
+        can_fetch_more : bool
+            Whether or not more child rows can be loaded.
+        """
+        return False
+
+    def fetch_more(self, row):
+        """ Load another page of child rows for the row.
+
+        Implementations should load some more child rows, append them to
+        the existing child rows so that they are included in the value
+        returned by ``get_row_count``, and return the number of rows which
+        were added.  The number of rows loaded in each call is up to the
+        model, but should usually be a modest page of rows so that the view
+        stays responsive.  The rows should be appended within the
+        ``inserting_rows`` context manager, so that the view is told about
+        them before they appear; if no ``rows_inserted`` event is fired,
+        the toolkit tells the view about the new rows once they have been
+        added.  The ``structure_changed`` event should not be fired for the
+        new rows.
+
+        The default implementation loads nothing and returns 0.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+
+        Returns
+        -------
+        count : non-negative int
+            The number of child rows which were added.
+        """
+        return 0
+
     # Data value methods
 
     @abstractmethod
@@ -232,6 +337,139 @@ class AbstractDataModel(ABCHasStrictTraits):
         """
         raise NotImplementedError()
 
+    # Block data methods
+
+    def get_values(self, parent, rows, columns):
+        """ Return the Python values for a block of child rows and columns.
+
+        This is a bulk version of ``get_value`` which allows a toolkit to
+        request all of the values in a region of the view with a single
+        call.  The default implementation calls ``get_value`` for each cell,
+        but subclasses that can extract blocks of data efficiently (eg. by
+        slicing an array) should override this method.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children, usually a
+            range.
+        columns : sequence of int
+            The column numbers, usually a range.  These are positions of
+            data columns, and so the row header column is not included.
+
+        Returns
+        -------
+        values : sequence of sequences
+            The values of the cells, indexed first by row and then by
+            column.
+        """
+        parent = tuple(parent)
+        return [
+            [self.get_value(parent + (row,), (column,)) for column in columns]
+            for row in rows
+        ]
+
+    def get_texts(self, parent, rows, columns):
+        """ Return the text for a block of child rows and columns.
+
+        This is a bulk equivalent of calling ``has_text`` and ``get_text``
+        on the value type of each cell.  The default implementation does
+        exactly that, but subclasses where a block of cells share a value
+        type should override this method and delegate to the value type's
+        ``get_texts`` method.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children, usually a
+            range.
+        columns : sequence of int
+            The column numbers, usually a range.  These are positions of
+            data columns, and so the row header column is not included.
+
+        Returns
+        -------
+        texts : sequence of sequences of str or None
+            The text of the cells, indexed first by row and then by column.
+            Cells without a textual representation have a value of None.
+        """
+        parent = tuple(parent)
+        texts = []
+        for row in rows:
+            row_index = parent + (row,)
+            row_texts = []
+            for column in columns:
+                column_index = (column,)
+                value_type = self.get_value_type(row_index, column_index)
+                if value_type and value_type.has_text(
+                        self, row_index, column_index):
+                    text = value_type.get_text(self, row_index, column_index)
+                else:
+                    text = None
+                row_texts.append(text)
+            texts.append(row_texts)
+        return texts
+
+    # Structure change methods
+
+    @contextmanager
+    def inserting_rows(self, parent, start, count):
+        """ A context manager within which child rows are inserted.
+
+        This fires ``rows_about_to_be_inserted`` on entry and
+        ``rows_inserted`` on exit.  If the insertion fails with an
+        exception, ``structure_changed`` is fired instead.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The index of the parent row of the new rows.
+        start : int
+            The position of the first new row among the children.
+        count : int
+            The number of rows which are inserted.
+        """
+        change = (tuple(parent), start, count)
+        self.rows_about_to_be_inserted = change
+        try:
+            yield
+        except BaseException:
+            # the rows which were changed are unknown
+            self.structure_changed = True
+            raise
+        self.rows_inserted = change
+
+    @contextmanager
+    def removing_rows(self, parent, start, count):
+        """ A context manager within which child rows are removed.
+
+        This fires ``rows_about_to_be_removed`` on entry and
+        ``rows_removed`` on exit.  If the removal fails with an exception,
+        ``structure_changed`` is fired instead.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The index of the parent row of the removed rows.
+        start : int
+            The position of the first removed row among the children.
+        count : int
+            The number of rows which are removed.
+        """
+        change = (tuple(parent), start, count)
+        self.rows_about_to_be_removed = change
+        try:
+            yield
+        except BaseException:
+            # the rows which were changed are unknown
+            self.structure_changed = True
+            raise
+        self.rows_removed = change
+
     # Convenience iterator methods
 
     def iter_rows(self, start_row=()):
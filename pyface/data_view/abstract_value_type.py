@@ -138,7 +138,8 @@ class AbstractValueType(ABCHasStrictTraits):
     def get_text(self, model, row, column):
         """ The textual representation of the underlying value.
 
-        The default implementation calls str() on the underlying value.
+        The default implementation formats the underlying value with
+        ``format_value``.
 
         Parameters
         ----------
@@ -154,7 +155,54 @@ class AbstractValueType(ABCHasStrictTraits):
         text : str
             The textual representation of the underlying value.
         """
-        return str(model.get_value(row, column))
+        return self.format_value(model.get_value(row, column))
+
+    def format_value(self, value):
+        """ The textual representation of an underlying value.
+
+        The default implementation calls str() on the value.
+
+        Parameters
+        ----------
+        value : any
+            The underlying value.
+
+        Returns
+        -------
+        text : str
+            The textual representation of the value.
+        """
+        return str(value)
+
+    def get_texts(self, model, parent, rows, columns):
+        """ The textual representations of a block of values.
+
+        This is used by data models to efficiently provide text for a block
+        of cells which all share this value type.  The default
+        implementation fetches the values with a single call to the model's
+        ``get_values`` method and formats each of them with
+        ``format_value``.  Subclasses which override ``get_text`` or
+        ``has_text`` so that the text is not simply the formatted value
+        must also override this method.
+
+        Parameters
+        ----------
+        model : AbstractDataModel
+            The data model holding the data.
+        parent : sequence of int
+            The parent row of the rows being queried.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers being queried.
+
+        Returns
+        -------
+        texts : list of lists of str or None
+            The textual representations of the values, indexed first by row
+            and then by column, or None if a value has no text.
+        """
+        return self._format_values(model.get_values(parent, rows, columns))
 
     def set_text(self, model, row, column, text):
         """ Set the text of the underlying value.
@@ -186,3 +234,13 @@ class AbstractValueType(ABCHasStrictTraits):
     def update_value_type(self, event=None):
         """ Fire update event when marked traits change. """
         self.updated = True
+
+    # Private methods --------------------------------------------------------
+
+    def _format_values(self, values):
+        """ Format a block of values with ``format_value``. """
+        format_value = self.format_value
+        return [
+            [format_value(value) or None for value in row_values]
+            for row_values in values
+        ]
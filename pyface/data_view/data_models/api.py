@@ -9,3 +9,4 @@
 # Thanks for using Enthought open source!
 
 from .array_data_model import ArrayDataModel  # noqa: F401
+from .sort_filter_data_model import SortFilterDataModel  # noqa: F401
@@ -21,7 +21,21 @@ from pyface.data_view.abstract_value_type import AbstractValueType
 from pyface.data_view.value_types.api import (
     ConstantValue, FloatValue, IntValue, TextValue, no_value
 )
-from pyface.data_view.index_manager import TupleIndexManager
+from pyface.data_view.index_manager import (
+    AbstractIndexManager, ShapeIndexManager
+)
+
+
+def _to_array(indices):
+    """ Convert a sequence of indices to an array of indices.
+
+    Ranges are converted directly, as NumPy converts them element by
+    element.
+    """
+    from numpy import arange, asarray
+    if isinstance(indices, range):
+        return arange(indices.start, indices.stop, indices.step)
+    return asarray(indices, dtype=int)
 
 
 class _AtLeastTwoDArray(Array):
@@ -59,8 +73,9 @@ class ArrayDataModel(AbstractDataModel, HasRequiredTraits):
     data = _AtLeastTwoDArray()
 
     #: The index manager that helps convert toolkit indices to data view
-    #: indices.
-    index_manager = Instance(TupleIndexManager, args=())
+    #: indices.  By default this is a ShapeIndexManager which is kept in
+    #: sync with the shape of the array.
+    index_manager = Instance(AbstractIndexManager)
 
     #: The value type of the row index column header.
     label_header_type = Instance(
@@ -216,6 +231,59 @@ class ArrayDataModel(AbstractDataModel, HasRequiredTraits):
         else:
             raise DataViewSetError()
 
+    def get_values(self, parent, rows, columns):
+        """ Return the Python values for a block of child rows and columns.
+
+        When the rows are leaf rows, the values are extracted from the
+        array with a single indexing operation.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers.
+
+        Returns
+        -------
+        values : sequence of sequences
+            The values of the cells, indexed first by row and then by
+            column.
+        """
+        parent = tuple(parent)
+        if len(parent) != self.data.ndim - 2:
+            return super().get_values(parent, rows, columns)
+
+        from numpy import ix_
+        return self.data[parent][ix_(_to_array(rows), _to_array(columns))]
+
+    def get_texts(self, parent, rows, columns):
+        """ Return the text for a block of child rows and columns.
+
+        All leaf rows share the same value type, so for leaf rows the work
+        is delegated to the ``get_texts`` method of ``value_type``.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers.
+
+        Returns
+        -------
+        texts : sequence of sequences of str or None
+            The text of the cells, indexed first by row and then by column.
+        """
+        parent = tuple(parent)
+        if len(parent) != self.data.ndim - 2:
+            return super().get_texts(parent, rows, columns)
+        return self.value_type.get_texts(self, parent, rows, columns)
+
     def get_value_type(self, row, column):
         """ Return the value type of the given row and column.
 
@@ -253,12 +321,34 @@ class ArrayDataModel(AbstractDataModel, HasRequiredTraits):
     @observe('data')
     def data_updated(self, event):
         """ Handle the array being replaced with a new array. """
-        if event.new.shape == event.old.shape:
+        old_shape = event.old.shape
+        new_shape = event.new.shape
+        if new_shape == old_shape:
             self.values_changed = (
                     (0,), (0,),
                     (event.old.shape[0] - 1,), (event.old.shape[-1] - 1,)
             )
+        elif len(new_shape) == len(old_shape) == 2 and (
+                new_shape[1] == old_shape[1]):
+            # only the number of rows of a table has changed
+            if isinstance(self.index_manager, ShapeIndexManager):
+                self.index_manager.shape = new_shape[:-1]
+            if new_shape[0] > old_shape[0]:
+                self.rows_inserted = (
+                    (), old_shape[0], new_shape[0] - old_shape[0]
+                )
+            else:
+                self.rows_removed = (
+                    (), new_shape[0], old_shape[0] - new_shape[0]
+                )
+            rows = min(old_shape[0], new_shape[0])
+            if rows > 0 and new_shape[1] > 0:
+                self.values_changed = (
+                    (0,), (0,), (rows - 1,), (new_shape[1] - 1,)
+                )
         else:
+            if isinstance(self.index_manager, ShapeIndexManager):
+                self.index_manager.shape = event.new.shape[:-1]
             self.structure_changed = True
 
     @observe('value_type.updated')
@@ -288,3 +378,8 @@ class ArrayDataModel(AbstractDataModel, HasRequiredTraits):
     def _data_default(self):
         from numpy import zeros
         return zeros(shape=(0, 0))
+
+    # default index manager
+
+    def _index_manager_default(self):
+        return ShapeIndexManager(shape=self.data.shape[:-1])
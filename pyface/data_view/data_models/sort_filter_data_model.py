@@ -0,0 +1,541 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Provides a data model which sorts and filters another data model.
+
+This module provides a proxy data model which presents the top-level rows
+of another data model in sorted order, optionally hiding rows which do not
+satisfy a filter.  The sorting and filtering are performed using NumPy,
+and by default in a background thread, so that large data models do not
+block the GUI.
+"""
+import functools
+import logging
+
+from traits.api import (
+    Any, Bool, Callable, Instance, Int, List, Tuple, observe
+)
+
+from pyface.data_view.abstract_data_model import AbstractDataModel
+from pyface.data_view.index_manager import (
+    AbstractIndexManager, IntIndexManager, TupleIndexManager
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def compute_row_index(model, sort_columns, filter, filter_columns):
+    """ Compute the source rows to display for a sort and filter.
+
+    Parameters
+    ----------
+    model : AbstractDataModel
+        The data model being sorted and filtered.
+    sort_columns : list of (int, bool) tuples
+        The columns to sort by, most significant first, and whether each
+        sort is ascending.
+    filter : callable or None
+        A function which is passed a 2D array of the values of the
+        filter columns for all top-level rows and returns a boolean mask
+        of the rows to display.  If None, all rows are displayed.
+    filter_columns : list of int
+        The columns whose values are passed to the filter.  If empty, the
+        values of all columns are passed.
+
+    Returns
+    -------
+    row_index : array of int or None
+        The source row of each displayed row, in display order, or None if
+        the rows should be displayed unchanged.
+    """
+    if not sort_columns and filter is None:
+        return None
+    keys = _get_keys(model, sort_columns, filter, filter_columns)
+    return _sort_and_filter(filter, *keys)
+
+
+def _get_keys(model, sort_columns, filter, filter_columns):
+    """ Copy the values which the rows are sorted and filtered by.
+
+    Returns
+    -------
+    row_count : int
+        The number of top-level rows.
+    filter_values : array or None
+        The values of the filter columns of all rows, or None if there is no
+        filter.
+    sort_keys : list of (array, bool) tuples
+        The values of each sort column for all rows, and whether the sort is
+        ascending, most significant first.
+    """
+    import numpy as np
+
+    row_count = model.get_row_count(())
+    rows = np.arange(row_count)
+
+    filter_values = None
+    if filter is not None:
+        if not filter_columns:
+            filter_columns = range(model.get_column_count())
+        filter_values = np.array(model.get_values((), rows, filter_columns))
+        filter_values = filter_values.reshape(row_count, len(filter_columns))
+
+    sort_keys = []
+    for column, ascending in sort_columns:
+        values = np.array(model.get_values((), rows, [column]))
+        sort_keys.append((values.reshape(row_count), ascending))
+
+    return row_count, filter_values, sort_keys
+
+
+def _sort_and_filter(filter, row_count, filter_values, sort_keys):
+    """ Compute the row index from copies of the sort and filter values. """
+    import numpy as np
+
+    rows = np.arange(row_count)
+
+    if filter is not None:
+        mask = np.asarray(filter(filter_values), dtype=bool)
+        rows = rows[mask]
+
+    if sort_keys:
+        # lexsort uses the last key as the primary key
+        keys = []
+        for values, ascending in reversed(sort_keys):
+            values = values[rows]
+            if values.dtype.kind not in "if":
+                # sort by rank so that any sortable dtype can be descending
+                values = np.unique(values, return_inverse=True)[1]
+                values = values.reshape(-1)
+            keys.append(values if ascending else -values)
+        rows = rows[np.lexsort(keys)]
+
+    return rows
+
+
+class SortFilterDataModel(AbstractDataModel):
+    """ A data model which sorts and filters the rows of another model.
+
+    The top-level rows of the underlying ``model`` are presented sorted by
+    the values in the ``sort_columns``, and only rows for which the
+    ``filter`` function returns True are shown.  Any child rows are shown
+    unchanged beneath their top-level row.  Other than that, this model
+    presents exactly the same values and value types as the underlying
+    model.
+
+    The order of the rows is computed with NumPy from the values returned
+    by the underlying model's ``get_values`` method, which models backed by
+    arrays can provide efficiently.  The values of the sort and filter
+    columns are copied on the GUI thread, and by default the order is
+    computed from the copies by a single worker thread: the model continues
+    to present the previous order until the new order is ready, at which
+    point it is swapped in and the ``structure_changed`` event is fired.
+    Computations which are superseded before they start are cancelled.
+
+    Changes to the structure of the underlying model are passed on as a
+    structure change, after which the rows are displayed unsorted until
+    they have been sorted again.  Changes to the values of the underlying
+    model cause the rows to be sorted and filtered again.
+    """
+
+    #: The data model being sorted and filtered.
+    model = Instance(AbstractDataModel, allow_none=False)
+
+    #: The index manager that helps convert toolkit indices to data view
+    #: indices.  By default this is an IntIndexManager if the underlying
+    #: model uses one, otherwise a TupleIndexManager.
+    index_manager = Instance(AbstractIndexManager)
+
+    #: The columns to sort by, most significant first, as a list of
+    #: tuples of column number and whether the sort is ascending.
+    sort_columns = List(Tuple(Int, Bool))
+
+    #: A vectorized predicate used to filter the rows.  This is passed a 2D
+    #: array of the values of the ``filter_columns`` of all the top-level
+    #: rows, and should return an array of bools, one for each row,
+    #: indicating which rows should be displayed.
+    filter = Callable(allow_none=True)
+
+    #: The columns whose values are passed to the ``filter``.  If empty,
+    #: the values of all columns are passed.
+    filter_columns = List(Int)
+
+    #: Whether to sort and filter in a worker thread.
+    asynchronous = Bool(True)
+
+    #: Whether a sort or filter is currently being computed.
+    computing = Bool(False)
+
+    #: The source row of each displayed row, or None if the rows are
+    #: displayed in their original order.
+    _row_index = Any()
+
+    #: A counter used to discard the results of superseded computations.
+    _generation = Int()
+
+    #: Whether the row index should be recomputed when the current
+    #: computation finishes.
+    _update_pending = Bool(False)
+
+    #: The executor which computes row indexes in a single worker thread,
+    #: created when it is first needed.
+    _executor = Any()
+
+    #: The future of the most recent computation, or None.
+    _future = Any()
+
+    # Data structure methods
+
+    def get_column_count(self):
+        """ How many columns in the data view model.
+
+        Returns
+        -------
+        column_count : non-negative int
+            The number of columns in the underlying data model.
+        """
+        return self.model.get_column_count()
+
+    def can_have_children(self, row):
+        """ Whether or not a row can have child rows.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+
+        Returns
+        -------
+        can_have_children : bool
+            Whether or not the row can ever have child rows.
+        """
+        return self.model.can_have_children(self.to_source_row(row))
+
+    def get_row_count(self, row):
+        """ How many child rows the row currently has.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+
+        Returns
+        -------
+        row_count : non-negative int
+            The number of child rows that the row has.
+        """
+        if len(row) == 0 and self._row_index is not None:
+            return len(self._row_index)
+        return self.model.get_row_count(self.to_source_row(row))
+
+    # Data value methods
+
+    def get_value(self, row, column):
+        """ Return the Python value for the row and column.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        value : any
+            The value represented by the given row and column.
+        """
+        return self.model.get_value(self.to_source_row(row), column)
+
+    def can_set_value(self, row, column):
+        """ Whether the value in the indicated row and column can be set.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        can_set_value : bool
+            Whether or not the value can be set.
+        """
+        return self.model.can_set_value(self.to_source_row(row), column)
+
+    def set_value(self, row, column, value):
+        """ Set the Python value for the row and column.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+        value : any
+            The new value for the given row and column.
+
+        Raises
+        -------
+        DataViewSetError
+            If the value cannot be set.
+        """
+        self.model.set_value(self.to_source_row(row), column, value)
+
+    def get_value_type(self, row, column):
+        """ Return the value type of the given row and column.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row as a sequence from root to leaf.
+        column : sequence of int
+            The indices of the column as a sequence of length 0 or 1.
+
+        Returns
+        -------
+        value_type : AbstractValueType or None
+            The value type of the given row and column, or None if no value
+            should be displayed.
+        """
+        return self.model.get_value_type(self.to_source_row(row), column)
+
+    def get_values(self, parent, rows, columns):
+        """ Return the Python values for a block of child rows and columns.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers.
+
+        Returns
+        -------
+        values : sequence of sequences
+            The values of the cells, indexed first by row and then by
+            column.
+        """
+        parent, rows = self._to_source_rows(parent, rows)
+        return self.model.get_values(parent, rows, columns)
+
+    def get_texts(self, parent, rows, columns):
+        """ Return the text for a block of child rows and columns.
+
+        Parameters
+        ----------
+        parent : sequence of int
+            The indices of the parent row as a sequence from root to leaf.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers.
+
+        Returns
+        -------
+        texts : sequence of sequences of str or None
+            The text of the cells, indexed first by row and then by column.
+        """
+        parent, rows = self._to_source_rows(parent, rows)
+        return self.model.get_texts(parent, rows, columns)
+
+    # Row mapping methods
+
+    def to_source_row(self, row):
+        """ Convert a row index of this model to one of the underlying model.
+
+        Parameters
+        ----------
+        row : sequence of int
+            The indices of the row in this model as a sequence from root to
+            leaf.
+
+        Returns
+        -------
+        row : tuple of int
+            The indices of the row in the underlying model.
+        """
+        row = tuple(row)
+        if len(row) == 0 or self._row_index is None:
+            return row
+        return (int(self._row_index[row[0]]),) + row[1:]
+
+    def update(self):
+        """ Recompute the sort order and filter.
+
+        This is called automatically when the sort or filter parameters or
+        the values of the underlying model change, but may be called
+        manually if the underlying data changes without the model firing
+        an event.  Any computation which is in progress is superseded.
+        """
+        self._generation += 1
+        self._update_pending = False
+        if self._future is not None:
+            # a superseded computation which hasn't started is dropped
+            self._future.cancel()
+            self._future = None
+        generation = self._generation
+        filter = self.filter
+        self.computing = True
+        if not self.sort_columns and filter is None:
+            self._swap_row_index(generation, None)
+            return
+
+        try:
+            # the values are copied on the GUI thread, so that the worker
+            # doesn't use the underlying model
+            keys = _get_keys(
+                self.model,
+                list(self.sort_columns),
+                filter,
+                list(self.filter_columns),
+            )
+            if not self.asynchronous:
+                row_index = _sort_and_filter(filter, *keys)
+        except Exception:
+            logger.exception("Error sorting and filtering data model")
+            self._swap_row_index(generation, self._row_index)
+            return
+
+        if self.asynchronous:
+            self._future = self._get_executor().submit(
+                _sort_and_filter, filter, *keys
+            )
+            self._future.add_done_callback(
+                functools.partial(self._computed, generation)
+            )
+        else:
+            self._swap_row_index(generation, row_index)
+
+    # Private methods
+
+    def _get_executor(self):
+        """ Get the executor, creating it if needed. """
+        if self._executor is None:
+            from pyface.background_executor import BackgroundExecutor
+            self._executor = BackgroundExecutor(max_workers=1)
+        return self._executor
+
+    def _computed(self, generation, future):
+        """ Swap in a row index computed by a worker, on the GUI thread. """
+        if future.cancelled():
+            return
+        try:
+            row_index = future.result()
+        except Exception:
+            logger.exception("Error sorting and filtering data model")
+            row_index = self._row_index
+        self._swap_row_index(generation, row_index)
+
+    def _schedule_update(self):
+        """ Recompute the row index once any current computation is done.
+
+        This avoids starting a new computation for every change when the
+        values of the underlying model are changing rapidly.
+        """
+        if self.computing:
+            self._update_pending = True
+        else:
+            self.update()
+
+    def _to_source_rows(self, parent, rows):
+        """ Convert a parent and child rows to the underlying model. """
+        parent = tuple(parent)
+        if len(parent) == 0 and self._row_index is not None:
+            return parent, self._row_index[list(rows)].tolist()
+        return self.to_source_row(parent), rows
+
+    def _swap_row_index(self, generation, row_index):
+        """ Swap in a newly computed row index on the GUI thread. """
+        if generation != self._generation:
+            # a more recent computation has been started
+            return
+        self._future = None
+        self.computing = False
+        if row_index is not None or self._row_index is not None:
+            self._row_index = row_index
+            self.structure_changed = True
+        if self._update_pending:
+            self.update()
+
+    # Trait change handlers
+
+    @observe('sort_columns.items,filter,filter_columns.items')
+    def _sort_filter_updated(self, event):
+        """ Recompute the row index when the parameters change. """
+        self.update()
+
+    @observe('model:structure_changed')
+    def _model_structure_changed(self, event):
+        """ Handle the structure of the underlying model changing. """
+        self._row_index = None
+        self.structure_changed = True
+        self.update()
+
+    @observe('model:[rows_inserted,rows_removed,rows_moved]')
+    def _model_rows_changed(self, event):
+        """ Handle rows of the underlying model being changed. """
+        if self._row_index is None and not self.computing:
+            setattr(self, event.name, event.new)
+        else:
+            self._model_structure_changed(event)
+
+    @observe('model:[rows_about_to_be_inserted,rows_about_to_be_removed]')
+    def _model_rows_changing(self, event):
+        """ Handle rows of the underlying model being about to change. """
+        # when rows are sorted or filtered, the structure_changed event that
+        # follows the change is enough
+        if self._row_index is None and not self.computing:
+            setattr(self, event.name, event.new)
+
+    @observe('model:values_changed')
+    def _model_values_changed(self, event):
+        """ Handle values of the underlying model changing. """
+        top, left, bottom, right = event.new
+        within_row = len(top) > 1 and top[0] == bottom[0]
+        if self._row_index is None or len(top) == 0:
+            self.values_changed = event.new
+        elif within_row:
+            # the change is within the children of a single top-level row
+            from numpy import flatnonzero
+            for row in flatnonzero(self._row_index == top[0]):
+                self.values_changed = (
+                    (int(row),) + tuple(top[1:]),
+                    left,
+                    (int(row),) + tuple(bottom[1:]),
+                    right,
+                )
+        elif len(self._row_index) > 0:
+            self.values_changed = (
+                (0,), left, (len(self._row_index) - 1,), right
+            )
+
+        if len(top) > 0 and not within_row and (
+                self.sort_columns or self.filter is not None):
+            # the order or filtering of the rows may have changed
+            self._schedule_update()
+
+    @observe('model')
+    def _model_updated(self, event):
+        """ Handle the underlying model being replaced. """
+        if event.old is not None:
+            self._row_index = None
+            self.structure_changed = True
+        self.update()
+
+    # Trait defaults
+
+    def _index_manager_default(self):
+        if isinstance(self.model.index_manager, IntIndexManager):
+            return IntIndexManager()
+        return TupleIndexManager()
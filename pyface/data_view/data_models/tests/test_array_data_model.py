@@ -19,6 +19,9 @@ from pyface.data_view.value_types.api import (
     FloatValue, IntValue, no_value
 )
 from pyface.data_view.data_models.array_data_model import ArrayDataModel
+from pyface.data_view.index_manager import (
+    ShapeIndexManager, TupleIndexManager
+)
 
 
 @requires_numpy
@@ -81,6 +84,24 @@ class TestArrayDataModel(UnittestTools, TestCase):
         self.assertEqual(self.model.data.ndim, 2)
         self.assertEqual(self.model.data.shape, (30, 1))
 
+    def test_index_manager_default(self):
+        self.assertIsInstance(self.model.index_manager, ShapeIndexManager)
+        self.assertEqual(self.model.index_manager.shape, (5, 2))
+
+    def test_index_manager_shape_updated(self):
+        self.model.data = np.arange(24.0).reshape(4, 3, 2)
+        self.assertEqual(self.model.index_manager.shape, (4, 3))
+
+    def test_index_manager_tuple(self):
+        index_manager = TupleIndexManager()
+        model = ArrayDataModel(
+            data=self.array,
+            value_type=FloatValue(),
+            index_manager=index_manager,
+        )
+        model.data = np.arange(24.0).reshape(4, 3, 2)
+        self.assertIs(model.index_manager, index_manager)
+
     def test_get_column_count(self):
         result = self.model.get_column_count()
         self.assertEqual(result, 3)
@@ -105,6 +126,15 @@ class TestArrayDataModel(UnittestTools, TestCase):
                 else:
                     self.assertEqual(result, 0)
 
+    def test_can_fetch_more(self):
+        for row in self.model.iter_rows():
+            with self.subTest(row=row):
+                self.assertFalse(self.model.can_fetch_more(row))
+
+    def test_fetch_more(self):
+        result = self.model.fetch_more(())
+        self.assertEqual(result, 0)
+
     def test_get_value(self):
         for row, column in self.model.iter_items():
             with self.subTest(row=row, column=column):
@@ -154,6 +184,42 @@ class TestArrayDataModel(UnittestTools, TestCase):
                         (row, column, row, column)
                     )
 
+    def test_get_values(self):
+        result = self.model.get_values((3,), range(0, 2), range(1, 3))
+        self.assertEqual(
+            np.asarray(result).tolist(),
+            self.array[3, 0:2, 1:3].tolist(),
+        )
+
+    def test_get_values_matches_get_value(self):
+        for parent in [(), (0,), (4,)]:
+            with self.subTest(parent=parent):
+                result = self.model.get_values(parent, range(2), range(3))
+                for i, row_values in enumerate(result):
+                    for column, value in enumerate(row_values):
+                        self.assertEqual(
+                            value,
+                            self.model.get_value(parent + (i,), (column,)),
+                        )
+
+    def test_get_values_empty(self):
+        result = self.model.get_values((3,), range(0), range(3))
+        self.assertEqual(len(result), 0)
+
+    def test_get_texts(self):
+        result = self.model.get_texts((3,), range(0, 2), range(1, 3))
+        self.assertEqual(
+            [list(row_texts) for row_texts in result],
+            [
+                ["{:n}".format(value) for value in row_values]
+                for row_values in self.array[3, 0:2, 1:3]
+            ],
+        )
+
+    def test_get_texts_non_leaf(self):
+        result = self.model.get_texts((), range(0, 2), range(0, 3))
+        self.assertEqual(result, [[None] * 3] * 2)
+
     def test_get_value_type(self):
         for row, column in self.model.iter_items():
             with self.subTest(row=row, column=column):
@@ -186,6 +252,48 @@ class TestArrayDataModel(UnittestTools, TestCase):
             self.model.data = 2 * self.array.T
         self.assertTrue(self.structure_changed_event.new)
 
+    def test_data_updated_rows_inserted(self):
+        model = ArrayDataModel(
+            data=np.arange(6.0).reshape(2, 3),
+            value_type=FloatValue(),
+        )
+        with self.assertTraitDoesNotChange(model, "structure_changed"):
+            with self.assertTraitChanges(model, "rows_inserted") as result:
+                with self.assertTraitChanges(model, "values_changed"):
+                    model.data = np.arange(15.0).reshape(5, 3)
+
+        self.assertEqual(result.events[0][-1], ((), 2, 3))
+        self.assertEqual(model.index_manager.shape, (5,))
+
+    def test_data_updated_rows_removed(self):
+        model = ArrayDataModel(
+            data=np.arange(15.0).reshape(5, 3),
+            value_type=FloatValue(),
+        )
+        with self.assertTraitDoesNotChange(model, "structure_changed"):
+            with self.assertTraitChanges(model, "rows_removed") as result:
+                with self.assertTraitChanges(model, "values_changed"):
+                    model.data = np.arange(6.0).reshape(2, 3)
+
+        self.assertEqual(result.events[0][-1], ((), 2, 3))
+        self.assertEqual(model.index_manager.shape, (2,))
+
+    def test_data_updated_all_rows_removed(self):
+        model = ArrayDataModel(
+            data=np.arange(15.0).reshape(5, 3),
+            value_type=FloatValue(),
+        )
+        with self.assertTraitChanges(model, "rows_removed") as result:
+            with self.assertTraitDoesNotChange(model, "values_changed"):
+                model.data = np.zeros((0, 3))
+
+        self.assertEqual(result.events[0][-1], ((), 0, 5))
+
+    def test_data_updated_new_shape_nd(self):
+        with self.assertTraitDoesNotChange(self.model, "rows_inserted"):
+            with self.assertTraitChanges(self.model, "structure_changed"):
+                self.model.data = np.arange(36.0).reshape(6, 2, 3)
+
     def test_type_updated(self):
         with self.assertTraitChanges(self.model, "values_changed"):
             self.model.value_type = IntValue()
@@ -0,0 +1,281 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import threading
+from unittest import TestCase, mock, skipIf
+
+from traits.testing.unittest_tools import UnittestTools
+from traits.testing.optional_dependencies import numpy as np, requires_numpy
+
+from pyface.data_view.data_models.api import (
+    ArrayDataModel, SortFilterDataModel
+)
+from pyface.data_view.index_manager import IntIndexManager, TupleIndexManager
+from pyface.data_view.value_types.api import FloatValue
+from pyface.toolkit import toolkit_object
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+@requires_numpy
+class TestSortFilterDataModel(UnittestTools, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = np.array([
+            [3.0, 1.0, 10.0],
+            [1.0, 2.0, 20.0],
+            [2.0, 1.0, 30.0],
+            [1.0, 1.0, 40.0],
+        ])
+        self.source = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.model = SortFilterDataModel(
+            model=self.source,
+            asynchronous=False,
+        )
+
+    def column(self, column):
+        return [
+            self.model.get_value((row,), (column,))
+            for row in range(self.model.get_row_count(()))
+        ]
+
+    def test_unsorted(self):
+        self.assertEqual(self.model.get_column_count(), 3)
+        self.assertEqual(self.model.get_row_count(()), 4)
+        self.assertEqual(self.column(2), [10.0, 20.0, 30.0, 40.0])
+        self.assertFalse(self.model.computing)
+
+    def test_index_manager_default(self):
+        self.assertIsInstance(self.model.index_manager, TupleIndexManager)
+
+        source = ArrayDataModel(
+            data=self.data,
+            value_type=FloatValue(),
+            index_manager=IntIndexManager(),
+        )
+        model = SortFilterDataModel(model=source)
+
+        self.assertIsInstance(model.index_manager, IntIndexManager)
+
+    def test_sort(self):
+        with self.assertTraitChanges(self.model, 'structure_changed', 1):
+            self.model.sort_columns = [(0, True)]
+
+        self.assertEqual(self.column(2), [20.0, 40.0, 30.0, 10.0])
+        self.assertEqual(self.model.to_source_row((1,)), (3,))
+
+    def test_sort_descending(self):
+        self.model.sort_columns = [(0, False)]
+
+        # the sort is stable
+        self.assertEqual(self.column(2), [10.0, 30.0, 20.0, 40.0])
+
+    def test_sort_multiple_columns(self):
+        self.model.sort_columns = [(1, True), (0, False)]
+
+        self.assertEqual(self.column(2), [10.0, 30.0, 40.0, 20.0])
+
+    def test_sort_updated(self):
+        self.model.sort_columns = [(0, True)]
+
+        with self.assertTraitChanges(self.model, 'structure_changed', 1):
+            self.model.sort_columns[0] = (2, False)
+
+        self.assertEqual(self.column(2), [40.0, 30.0, 20.0, 10.0])
+
+    def test_filter(self):
+        with self.assertTraitChanges(self.model, 'structure_changed', 1):
+            self.model.filter = lambda values: values[:, 1] == 1.0
+
+        self.assertEqual(self.model.get_row_count(()), 3)
+        self.assertEqual(self.column(2), [10.0, 30.0, 40.0])
+
+    def test_filter_columns(self):
+        self.model.filter_columns = [2]
+        self.model.filter = lambda values: values[:, 0] > 25.0
+
+        self.assertEqual(self.column(2), [30.0, 40.0])
+
+    def test_filter_and_sort(self):
+        self.model.filter = lambda values: values[:, 1] == 1.0
+        self.model.sort_columns = [(0, True)]
+
+        self.assertEqual(self.column(2), [40.0, 30.0, 10.0])
+
+    def test_filter_error(self):
+        self.model.sort_columns = [(0, True)]
+
+        with self.assertLogs(
+                "pyface.data_view.data_models.sort_filter_data_model"):
+            self.model.filter = lambda values: 1 / 0
+
+        # the previous order is retained
+        self.assertEqual(self.column(2), [20.0, 40.0, 30.0, 10.0])
+        self.assertFalse(self.model.computing)
+
+    def test_get_values(self):
+        self.model.sort_columns = [(0, True)]
+
+        result = self.model.get_values((), range(1, 3), range(1, 3))
+
+        np.testing.assert_array_equal(result, [[1.0, 40.0], [1.0, 30.0]])
+
+    def test_get_texts(self):
+        self.model.sort_columns = [(0, True)]
+
+        result = self.model.get_texts((), range(1, 3), range(2, 3))
+
+        self.assertEqual(result, [["40"], ["30"]])
+
+    def test_set_value(self):
+        self.model.sort_columns = [(2, True)]
+
+        self.model.set_value((0,), (0,), 5.0)
+
+        self.assertEqual(self.data[0, 0], 5.0)
+
+    def test_get_value_headers(self):
+        self.model.sort_columns = [(0, True)]
+
+        self.assertEqual(self.model.get_value((), (1,)), 1)
+        self.assertEqual(self.model.get_value((1,), ()), 3)
+
+    def test_source_values_changed_resorts(self):
+        self.model.sort_columns = [(2, True)]
+
+        with self.assertTraitChanges(self.model, 'values_changed') as result:
+            with self.assertTraitChanges(self.model, 'structure_changed'):
+                self.source.set_value((0,), (2,), 50.0)
+
+        self.assertEqual(result.events[0][-1], ((0,), (2,), (3,), (2,)))
+        self.assertEqual(self.column(2), [20.0, 30.0, 40.0, 50.0])
+
+    def test_source_values_changed_unsorted(self):
+        with self.assertTraitChanges(self.model, 'values_changed') as result:
+            with self.assertTraitDoesNotChange(
+                    self.model, 'structure_changed'):
+                self.source.set_value((0,), (2,), 50.0)
+
+        self.assertEqual(result.events[0][-1], ((0,), (2,), (0,), (2,)))
+
+    def test_source_structure_changed(self):
+        self.model.sort_columns = [(0, True)]
+
+        self.source.data = self.data[:, :2]
+
+        self.assertEqual(self.model.get_column_count(), 2)
+        self.assertEqual(self.column(1), [2.0, 1.0, 1.0, 1.0])
+
+    def test_source_rows_inserted_unsorted(self):
+        with self.assertTraitChanges(self.model, 'rows_inserted') as result:
+            self.source.data = np.vstack([self.data, self.data])
+
+        self.assertEqual(result.events[0][-1], ((), 4, 4))
+
+    def test_source_rows_inserted_sorted(self):
+        self.model.sort_columns = [(2, False)]
+
+        with self.assertTraitDoesNotChange(self.model, 'rows_inserted'):
+            self.source.data = np.vstack([self.data, self.data + 100])
+
+        self.assertEqual(self.model.get_row_count(()), 8)
+        self.assertEqual(self.column(2)[:2], [140.0, 130.0])
+
+    def test_model_replaced(self):
+        self.model.sort_columns = [(0, True)]
+
+        with self.assertTraitChanges(self.model, 'structure_changed'):
+            self.model.model = ArrayDataModel(
+                data=self.data[:2],
+                value_type=FloatValue(),
+            )
+
+        self.assertEqual(self.column(2), [20.0, 10.0])
+
+
+@requires_numpy
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestSortFilterDataModelAsynchronous(GuiTestAssistant, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.data = np.random.default_rng(0).random((10000, 3))
+        self.source = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.model = SortFilterDataModel(model=self.source)
+
+    def tearDown(self):
+        self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+        GuiTestAssistant.tearDown(self)
+
+    def test_sort(self):
+        with self.assertTraitChanges(self.model, 'structure_changed', 1):
+            self.model.sort_columns = [(1, True)]
+            self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+
+        values = [
+            self.model.get_value((row,), (1,)) for row in range(10000)
+        ]
+        self.assertEqual(values, sorted(self.data[:, 1]))
+
+    def test_superseded(self):
+        with self.assertTraitChanges(self.model, 'structure_changed', 1):
+            self.model.sort_columns = [(1, True)]
+            self.model.sort_columns = [(2, True)]
+            self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+
+        values = [
+            self.model.get_value((row,), (2,)) for row in range(10000)
+        ]
+        self.assertEqual(values, sorted(self.data[:, 2]))
+
+    def test_rapid_values_changed(self):
+        self.model.sort_columns = [(0, True)]
+        for row in range(100):
+            self.source.set_value((row,), (0,), -row)
+
+        self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+
+        self.assertEqual(self.model.get_value((0,), (0,)), -99.0)
+
+    def test_superseded_cancelled(self):
+        # keep the single worker busy so that computations stay queued
+        gate = threading.Event()
+        self.model._get_executor().submit(gate.wait)
+        try:
+            self.model.sort_columns = [(1, True)]
+            future = self.model._future
+            self.model.sort_columns = [(2, True)]
+            self.assertTrue(future.cancelled())
+        finally:
+            gate.set()
+
+        self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+        self.assertEqual(
+            self.model.get_value((0,), (2,)), min(self.data[:, 2])
+        )
+
+    def test_values_copied_on_gui_thread(self):
+        threads = []
+        get_values = ArrayDataModel.get_values
+
+        def record_thread(model, *args):
+            threads.append(threading.current_thread())
+            return get_values(model, *args)
+
+        with mock.patch.object(ArrayDataModel, "get_values", record_thread):
+            self.model.sort_columns = [(1, True)]
+            self.model.filter = lambda values: values[:, 0] > 0.5
+            self.assertEventuallyTrueInGui(lambda: not self.model.computing)
+
+        self.assertTrue(threads)
+        for thread in threads:
+            self.assertIs(thread, threading.main_thread())
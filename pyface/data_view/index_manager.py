@@ -31,8 +31,8 @@ data view infrastructure is a sequence of integers, giving the index at
 each level of the hierarchy.  DataViewModel classes can then use these
 indices to identify objects in the underlying data model.
 
-There are three main classes defined in the module: AbstractIndexManager,
-IntIndexManager, and TupleIndexManager.
+There are four main classes defined in the module: AbstractIndexManager,
+IntIndexManager, ShapeIndexManager and TupleIndexManager.
 
 AbstractIndexManager
     An ABC that defines the API
@@ -41,11 +41,15 @@ IntIndexManager
     An efficient index manager for non-hierarchical data, such as
     lists, tables and 2D arrays.
 
+ShapeIndexManager
+    An efficient index manager for hierarchical data where the number of
+    children at each level is fixed, such as n-dimensional arrays.
+
 TupleIndexManager
     An index manager that handles non-hierarchical data while trying
     to be fast and memory efficient.
 
-The two concrete subclasses should be sufficient for most cases, but advanced
+The concrete subclasses should be sufficient for most cases, but advanced
 users may create their own if for some reason the provided managers do not
 work well for a particular situation.  Developers who implement this API
 need to be mindful of the requirements on the lifetime and identity
@@ -54,8 +58,11 @@ constraints required by the various toolkit APIs.
 """
 
 from abc import abstractmethod
+from bisect import bisect_right
 
-from traits.api import ABCHasStrictTraits, Dict, Int, Tuple
+from traits.api import (
+    ABCHasStrictTraits, Dict, Float, Int, Property, Tuple, observe
+)
 
 
 #: The singular root object for all index managers.
@@ -221,6 +228,43 @@ class AbstractIndexManager(ABCHasStrictTraits):
         resettable_traits = self.trait_names(can_reset=True)
         self.reset_traits(resettable_traits)
 
+    def needs_collect(self):
+        """ Whether the index manager would like to discard cached state.
+
+        Toolkit code should check this periodically and, when it returns
+        True, call ``collect`` at a point where it is safe to do so.
+
+        The default implementation returns False.
+
+        Returns
+        -------
+        needs_collect : bool
+            Whether or not the caches of the index manager have grown
+            beyond their limit.
+        """
+        return False
+
+    def collect(self, keep=()):
+        """ Discard cached state for indices which are no longer needed.
+
+        Unlike ``reset``, this retains the index objects given by ``keep``,
+        along with all of their ancestors.  Toolkit code should pass every
+        index object which the toolkit may still be holding a reference to.
+
+        The default implementation does nothing.
+
+        Parameters
+        ----------
+        keep : iterable of index objects
+            The index objects which must remain valid.
+
+        Returns
+        -------
+        count : int
+            The number of index objects which were discarded.
+        """
+        return 0
+
 
 class IntIndexManager(AbstractIndexManager):
     """ Efficient IndexManager for non-hierarchical indexes.
@@ -329,7 +373,248 @@ class IntIndexManager(AbstractIndexManager):
         return index + 1
 
 
+class ShapeIndexManager(AbstractIndexManager):
+    """ Efficient IndexManager for hierarchical indexes with a fixed shape.
+
+    This is an index manager for hierarchical data structures where every
+    row at a given level of the hierarchy has the same number of child
+    rows, such as the rows of an n-dimensional array.  The index values
+    are either the Root, or simple integers: the rows at each level of the
+    hierarchy are numbered consecutively in row-major order, with each
+    level following on from the previous one.  Converting between index
+    values and row sequences is pure arithmetic, so no caching is needed.
+    """
+
+    #: The number of child rows of every row at each level of the
+    #: hierarchy, starting with the number of children of the root.
+    shape = Tuple()
+
+    #: The first index value of each level of the hierarchy, followed by
+    #: the total number of index values.
+    _offsets = Tuple()
+
+    def create_index(self, parent, row):
+        """ Given a parent index and a row number, create an index.
+
+        Parameters
+        ----------
+        parent : index object
+            The parent index object.
+        row : non-negative int
+            The position of the resulting index in the parent's children.
+
+        Returns
+        -------
+        index : index object
+            The resulting opaque index object.
+
+        Raises
+        ------
+        IndexError
+            Negative row values, or row values larger than the shape
+            allows, raise an IndexError exception.
+        RuntimeError
+            If the parent is at the deepest level of the hierarchy, a
+            RuntimeError will be raised.
+        """
+        if row < 0:
+            raise IndexError("Row must be non-negative.  Got {}".format(row))
+        offsets = self._offsets
+        if parent == Root:
+            level = position = 0
+        else:
+            level = bisect_right(offsets, parent)
+            if parent < 0 or level >= len(offsets):
+                raise IndexError("Invalid index {!r}.".format(parent))
+            position = parent - offsets[level - 1]
+        shape = self.shape
+        if level >= len(shape):
+            raise RuntimeError(
+                "{} cannot create persistent index value for {}.".format(
+                    self.__class__.__name__,
+                    (parent, row)
+                )
+            )
+        if row >= shape[level]:
+            raise IndexError(
+                "Row must be less than {}.  Got {}".format(shape[level], row)
+            )
+        return offsets[level] + position * shape[level] + row
+
+    def get_parent_and_row(self, index):
+        """ Given an index object, return the parent index and row.
+
+        Parameters
+        ----------
+        index : index object
+            The opaque index object.
+
+        Returns
+        -------
+        parent : index object
+            The parent index object.
+        row : int
+            The position of the resuling index in the parent's children.
+
+        Raises
+        ------
+        IndexError
+            If the Root object is passed as the index, this method will
+            raise an IndexError, as it has no parent.
+        """
+        if index == Root:
+            raise IndexError("Root index has no parent.")
+        offsets = self._offsets
+        level = bisect_right(offsets, index)
+        if index < 0 or level >= len(offsets):
+            raise IndexError("Invalid index {!r}.".format(index))
+        if level == 1:
+            return Root, index
+        position = index - offsets[level - 1]
+        parent_position, row = divmod(position, self.shape[level - 1])
+        return offsets[level - 2] + parent_position, row
+
+    def from_sequence(self, indices):
+        """ Given a sequence of indices, return the index object.
+
+        Parameters
+        ----------
+        indices : sequence of int
+            The row location at each level of the hierarchy.
+
+        Returns
+        -------
+        index : index object
+            The persistent index object associated with this sequence.
+
+        Raises
+        ------
+        IndexError
+            If any of the row values are out of range.
+        RuntimeError
+            If the sequence is longer than the depth of the hierarchy.
+        """
+        shape = self.shape
+        if len(indices) > len(shape):
+            raise RuntimeError(
+                "{} cannot create persistent index value for {}.".format(
+                    self.__class__.__name__,
+                    indices,
+                )
+            )
+        position = 0
+        for size, row in zip(shape, indices):
+            if not 0 <= row < size:
+                raise IndexError(
+                    "Row must be in range({}).  Got {}".format(size, row)
+                )
+            position = position * size + row
+        if len(indices) == 0:
+            return Root
+        return self._offsets[len(indices) - 1] + position
+
+    def to_sequence(self, index):
+        """ Given an index, return the corresponding sequence of row values.
+
+        Parameters
+        ----------
+        index : index object
+            The opaque index object.
+
+        Returns
+        -------
+        sequence : tuple of int
+            The row location at each level of the hierarchy.
+        """
+        if index == Root:
+            return ()
+        offsets = self._offsets
+        level = bisect_right(offsets, index)
+        if index < 0 or level >= len(offsets):
+            raise IndexError("Invalid index {!r}.".format(index))
+        if level == 1:
+            return (index,)
+        position = index - offsets[level - 1]
+        shape = self.shape
+        rows = [0] * level
+        for i in range(level - 1, 0, -1):
+            position, rows[i] = divmod(position, shape[i])
+        rows[0] = position
+        return tuple(rows)
+
+    def from_id(self, id):
+        """ Given an integer id, return the corresponding index.
+
+        Parameters
+        ----------
+        id : int
+            An integer object id value.
+
+        Returns
+        -------
+        index : index object
+            The persistent index object associated with this id.
+        """
+        if id == 0:
+            return Root
+        return id - 1
+
+    def id(self, index):
+        """ Given an index, return the corresponding id.
+
+        Parameters
+        ----------
+        index : index object
+            The persistent index object.
+
+        Returns
+        -------
+        id : int
+            The associated integer object id value.
+        """
+        if index == Root:
+            return 0
+        return index + 1
+
+    @observe('shape')
+    def _update_offsets(self, event):
+        """ Compute the starting index value of each level. """
+        offsets = [0]
+        count = 1
+        for size in self.shape:
+            count *= size
+            offsets.append(offsets[-1] + count)
+        self._offsets = tuple(offsets)
+
+
 class TupleIndexManager(AbstractIndexManager):
+    """ IndexManager for hierarchical indexes.
+
+    The index values are nested tuples of the form ``(parent, row)``, with
+    the Root as the innermost parent.  A canonical version of each tuple is
+    cached so that the toolkit always sees the same object for a given
+    index.  These caches only shrink when ``reset`` or ``collect`` is
+    called, so long-running views of deep hierarchies may want to set a
+    ``cache_limit`` so that the toolkit periodically discards indices that
+    it no longer holds.
+    """
+
+    #: A soft limit on the number of cached indices.  When the limit is
+    #: exceeded, the toolkit will discard indices it is not using.  A value
+    #: of 0 means that the caches are never collected.
+    cache_limit = Int(0)
+
+    #: The number of index objects currently cached.
+    cache_size = Property(Int)
+
+    #: The number of index creations satisfied from the cache.
+    cache_hits = Int()
+
+    #: The number of index creations which had to create a new index.
+    cache_misses = Int()
+
+    #: The fraction of index creations satisfied from the cache.
+    hit_rate = Property(Float)
 
     #: A dictionary that maps tuples to the canonical version of the tuple.
     _cache = Dict(Tuple, Tuple, {Root: Root}, can_reset=True)
@@ -361,8 +646,13 @@ class TupleIndexManager(AbstractIndexManager):
             raise IndexError("Row must be non-negative.  Got {}".format(row))
 
         index = (parent, row)
-        canonical_index = self._cache.setdefault(index, index)
-        self._id_cache[self.id(canonical_index)] = canonical_index
+        canonical_index = self._cache.get(index)
+        if canonical_index is None:
+            self.cache_misses += 1
+            canonical_index = self._cache.setdefault(index, index)
+            self._id_cache[id(canonical_index)] = canonical_index
+        else:
+            self.cache_hits += 1
         return canonical_index
 
     def get_parent_and_row(self, index):
@@ -420,5 +710,61 @@ class TupleIndexManager(AbstractIndexManager):
         """
         if index == Root:
             return 0
-        canonical_index = self._cache.setdefault(index, index)
+        canonical_index = self._cache.get(index)
+        if canonical_index is None:
+            canonical_index = self._cache.setdefault(index, index)
+            self._id_cache[id(canonical_index)] = canonical_index
         return id(canonical_index)
+
+    def needs_collect(self):
+        """ Whether the index manager would like to discard cached state.
+
+        Returns
+        -------
+        needs_collect : bool
+            True if there is a cache limit and it has been exceeded.
+        """
+        return 0 < self.cache_limit < len(self._cache)
+
+    def collect(self, keep=()):
+        """ Discard cached indices which are no longer needed.
+
+        Parameters
+        ----------
+        keep : iterable of index objects
+            The index objects which must remain valid.  These and all of
+            their ancestors are retained in the cache.
+
+        Returns
+        -------
+        count : int
+            The number of index objects which were discarded.
+        """
+        cache = self._cache
+        retained = {Root: Root}
+        for index in keep:
+            while index != Root and index not in retained:
+                canonical_index = cache.get(index)
+                if canonical_index is None:
+                    break
+                retained[canonical_index] = canonical_index
+                index = canonical_index[0]
+
+        count = len(cache) - len(retained)
+        if count > 0:
+            self._cache = retained
+            self._id_cache = {
+                self.id(index): index for index in retained.values()
+            }
+        return count
+
+    # Trait property methods -------------------------------------------------
+
+    def _get_cache_size(self):
+        return len(self._cache)
+
+    def _get_hit_rate(self):
+        total = self.cache_hits + self.cache_misses
+        if total == 0:
+            return 0.0
+        return self.cache_hits / total
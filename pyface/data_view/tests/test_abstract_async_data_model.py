@@ -0,0 +1,240 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event as ThreadingEvent
+from unittest import TestCase, skipIf
+
+from traits.api import Any, Instance, Int, List
+from traits.testing.api import UnittestTools
+
+from pyface.data_view.abstract_async_data_model import AbstractAsyncDataModel
+from pyface.data_view.index_manager import IntIndexManager
+from pyface.data_view.value_types.api import IntValue
+from pyface.toolkit import toolkit_object
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+class SlowDataModel(AbstractAsyncDataModel):
+    """ A table whose values are row * 100 + column, fetched slowly. """
+
+    rows = Int(1000)
+
+    columns = Int(5)
+
+    index_manager = Instance(IntIndexManager, ())
+
+    #: A threading event which must be set for fetches to complete.
+    gate = Any()
+
+    #: A threading event which is set when a fetch starts.
+    started = Any()
+
+    #: The blocks which have been fetched.
+    fetched = List()
+
+    def get_column_count(self):
+        return self.columns
+
+    def can_have_children(self, row):
+        return len(row) == 0
+
+    def get_row_count(self, row):
+        return self.rows if len(row) == 0 else 0
+
+    def get_loaded_value_type(self, row, column):
+        return IntValue()
+
+    def fetch_values(self, parent, rows, columns):
+        self.started.set()
+        self.gate.wait(10.0)
+        self.fetched.append((parent, rows, columns))
+        return [[row * 100 + column for column in columns] for row in rows]
+
+    def _gate_default(self):
+        return ThreadingEvent()
+
+    def _started_default(self):
+        return ThreadingEvent()
+
+
+class FailingDataModel(SlowDataModel):
+    """ A data model whose fetches fail. """
+
+    def fetch_values(self, parent, rows, columns):
+        raise ValueError("failed")
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestAbstractAsyncDataModel(GuiTestAssistant, UnittestTools, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.model = SlowDataModel(
+            block_rows=10,
+            block_columns=2,
+            executor=self.executor,
+        )
+
+    def tearDown(self):
+        self.model.gate.set()
+        self.model.dispose()
+        self.executor.shutdown(wait=True)
+        GuiTestAssistant.tearDown(self)
+
+    def wait_for_fetches(self):
+        self.assertEventuallyTrueInGui(lambda: not self.model._pending)
+
+    def test_placeholder(self):
+        self.model.placeholder = -1
+
+        value = self.model.get_value((3,), (1,))
+        value_type = self.model.get_value_type((3,), (1,))
+
+        self.assertEqual(value, -1)
+        self.assertIs(value_type, self.model.placeholder_type)
+        self.assertEqual(
+            value_type.get_text(self.model, (3,), (1,)), "..."
+        )
+        self.assertFalse(self.model.is_loaded((3,), (1,)))
+        self.assertEqual(self.model.fetches_submitted, 1)
+
+    def test_headers(self):
+        self.assertEqual(self.model.get_value((), (3,)), 3)
+        self.assertEqual(self.model.get_value((12,), ()), 12)
+        self.assertIsInstance(self.model.get_value_type((), (3,)), IntValue)
+        self.assertEqual(self.model.fetches_submitted, 0)
+
+    def test_values_arrive(self):
+        self.model.get_value((3,), (1,))
+        self.model.get_value((4,), (0,))
+
+        with self.assertTraitChanges(self.model, 'values_changed') as result:
+            self.model.gate.set()
+            self.wait_for_fetches()
+
+        self.assertEqual(len(result.events), 1)
+        self.assertEqual(result.events[0][-1], ((0,), (0,), (9,), (1,)))
+        self.assertTrue(self.model.is_loaded((3,), (1,)))
+        self.assertEqual(self.model.get_value((3,), (1,)), 301)
+        self.assertIsInstance(self.model.get_value_type((3,), (1,)), IntValue)
+        self.assertEqual(
+            self.model.fetched, [((), range(0, 10), range(0, 2))]
+        )
+
+    def test_partial_block(self):
+        self.model.get_value((995,), (4,))
+        self.model.gate.set()
+
+        with self.assertTraitChanges(self.model, 'values_changed') as result:
+            self.wait_for_fetches()
+
+        self.assertEqual(
+            result.events[0][-1], ((990,), (4,), (999,), (4,))
+        )
+        self.assertEqual(self.model.get_value((999,), (4,)), 99904)
+
+    def test_coalesced_values_changed(self):
+        for row in range(0, 50, 10):
+            self.model.get_value((row,), (0,))
+
+        with self.assertTraitChanges(
+                self.model, 'values_changed') as result:
+            self.model.gate.set()
+            self.wait_for_fetches()
+
+        # every block arrives, but with fewer events than blocks
+        self.assertLess(len(result.events), 5)
+        self.assertEqual(result.events[0][-1][:2], ((0,), (0,)))
+        self.assertEqual(result.events[-1][-1][2:], ((49,), (1,)))
+        for row in range(0, 50, 10):
+            self.assertTrue(self.model.is_loaded((row,), (0,)))
+
+    def test_stale_fetches_cancelled(self):
+        self.model.max_pending = 3
+
+        # the first fetch runs and blocks the only worker
+        self.model.get_value((0,), (0,))
+        self.model.started.wait(10.0)
+        for row in range(10, 100, 10):
+            self.model.get_value((row,), (0,))
+
+        self.assertEqual(self.model.fetches_submitted, 10)
+        self.assertEqual(self.model.fetches_cancelled, 6)
+        self.model.gate.set()
+        self.wait_for_fetches()
+
+        fetched_rows = [rows.start for _, rows, _ in self.model.fetched]
+        self.assertEqual(fetched_rows, [0, 70, 80, 90])
+
+    def test_rerequest_keeps_fetch(self):
+        self.model.max_pending = 3
+        self.model.get_value((0,), (0,))
+        self.model.started.wait(10.0)
+        for row in range(10, 40, 10):
+            self.model.get_value((row,), (0,))
+
+        # requesting a pending block again makes it most recent
+        self.model.get_value((10,), (0,))
+        self.model.get_value((40,), (0,))
+
+        self.model.gate.set()
+        self.wait_for_fetches()
+
+        fetched_rows = [rows.start for _, rows, _ in self.model.fetched]
+        self.assertEqual(fetched_rows, [0, 10, 30, 40])
+
+    def test_max_blocks(self):
+        self.model.max_blocks = 2
+        self.model.gate.set()
+        for row in range(0, 30, 10):
+            self.model.get_value((row,), (0,))
+            self.wait_for_fetches()
+
+        self.assertFalse(self.model.is_loaded((0,), (0,)))
+        self.assertTrue(self.model.is_loaded((10,), (0,)))
+        self.assertTrue(self.model.is_loaded((20,), (0,)))
+
+    def test_structure_changed_discards_fetch(self):
+        self.model.get_value((3,), (1,))
+
+        with self.assertTraitDoesNotChange(self.model, 'values_changed'):
+            self.model.structure_changed = True
+            self.model.gate.set()
+            self.assertEventuallyTrueInGui(lambda: self.model.fetched)
+            self.event_loop_helper.event_loop(5)
+
+        self.assertFalse(self.model.is_loaded((3,), (1,)))
+
+    def test_fetch_error(self):
+        model = FailingDataModel(executor=self.executor)
+
+        with self.assertLogs("pyface.data_view.abstract_async_data_model"):
+            model.get_value((3,), (1,))
+            self.assertEventuallyTrueInGui(lambda: not model._pending)
+
+        self.assertFalse(model.is_loaded((3,), (1,)))
+
+    def test_default_executor(self):
+        model = SlowDataModel(block_rows=10, block_columns=2)
+        model.gate.set()
+        try:
+            model.get_value((3,), (1,))
+            self.assertIsNotNone(model.executor)
+            self.assertEventuallyTrueInGui(
+                lambda: model.is_loaded((3,), (1,))
+            )
+        finally:
+            model.dispose()
+
+        self.assertIsNone(model.executor)
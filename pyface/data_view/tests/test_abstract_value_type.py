@@ -69,6 +69,26 @@ class TestAbstractValueType(UnittestTools, TestCase):
         result = value_type.get_text(self.model, [0], [0])
         self.assertEqual(result, "1.0")
 
+    def test_format_value(self):
+        value_type = ValueType()
+        result = value_type.format_value(1.0)
+        self.assertEqual(result, "1.0")
+
+    def test_get_texts(self):
+        self.model.get_values = Mock(return_value=[[1.0] * 3] * 2)
+        value_type = ValueType()
+        result = value_type.get_texts(self.model, [0], range(2), range(3))
+        self.assertEqual(result, [["1.0"] * 3] * 2)
+        self.model.get_values.assert_called_once_with(
+            [0], range(2), range(3)
+        )
+
+    def test_get_texts_no_text(self):
+        self.model.get_values = Mock(return_value=[[""] * 3] * 2)
+        value_type = ValueType()
+        result = value_type.get_texts(self.model, [0], range(2), range(3))
+        self.assertEqual(result, [[None] * 3] * 2)
+
     def test_set_text(self):
         value_type = ValueType()
         with self.assertRaises(DataViewSetError):
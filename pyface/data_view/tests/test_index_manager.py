@@ -11,7 +11,7 @@
 from unittest import TestCase
 
 from pyface.data_view.index_manager import (
-    IntIndexManager, Root, TupleIndexManager,
+    IntIndexManager, Root, ShapeIndexManager, TupleIndexManager,
 )
 
 
@@ -102,6 +102,101 @@ class TestIntIndexManager(IndexManagerMixin, TestCase):
             self.index_manager.create_index(Root, -5)
 
 
+class TestShapeIndexManager(IndexManagerMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index_manager = ShapeIndexManager(shape=(10, 11, 12, 13))
+
+    def tearDown(self):
+        self.index_manager.reset()
+
+    def test_create_index_root(self):
+        result = self.index_manager.create_index(Root, 5)
+        self.assertEqual(result, 5)
+
+    def test_create_index_leaf(self):
+        index = self.index_manager.from_sequence((1, 2, 3, 4))
+        with self.assertRaises(RuntimeError):
+            self.index_manager.create_index(index, 1)
+
+    def test_create_index_too_large(self):
+        index = self.index_manager.create_index(Root, 5)
+        with self.assertRaises(IndexError):
+            self.index_manager.create_index(index, 11)
+
+    def test_from_sequence_too_large(self):
+        with self.assertRaises(IndexError):
+            self.index_manager.from_sequence((5, 11))
+
+    def test_from_sequence_too_long(self):
+        with self.assertRaises(RuntimeError):
+            self.index_manager.from_sequence((1, 2, 3, 4, 5))
+
+    def test_invalid_index(self):
+        with self.assertRaises(IndexError):
+            self.index_manager.get_parent_and_row(10 + 110 + 1320 + 17160)
+
+    def test_indices_unique(self):
+        sequences = [
+            (i, j, k)
+            for i in range(10)
+            for j in range(11)
+            for k in range(12)
+        ]
+        indices = {
+            self.index_manager.from_sequence(sequence)
+            for sequence in sequences
+        }
+        self.assertEqual(len(indices), len(sequences))
+
+    def test_complex_sequence_round_trip(self):
+        for sequence in [(9,), (9, 10), (9, 10, 11), (9, 10, 11, 12)]:
+            with self.subTest(sequence=sequence):
+                index = self.index_manager.from_sequence(sequence)
+                result = self.index_manager.to_sequence(index)
+                self.assertEqual(result, sequence)
+
+    def test_complex_index_round_trip(self):
+        sequence = (5, 6, 7, 8)
+
+        parent = Root
+        for depth, row in enumerate(sequence):
+            with self.subTest(depth=depth):
+                index = self.index_manager.create_index(parent, row)
+                result = self.index_manager.get_parent_and_row(index)
+                self.assertEqual(result, (parent, row))
+                self.assertEqual(
+                    index,
+                    self.index_manager.from_sequence(sequence[:depth+1])
+                )
+                parent = index
+
+    def test_complex_index_id_round_trip(self):
+        sequence = (5, 6, 7, 8)
+        parent = Root
+        for depth, row in enumerate(sequence):
+            with self.subTest(depth=depth):
+                index = self.index_manager.create_index(parent, row)
+                id = self.index_manager.id(index)
+                self.assertIsInstance(id, int)
+                result = self.index_manager.from_id(id)
+                self.assertEqual(result, index)
+                parent = index
+
+    def test_shape_change(self):
+        self.index_manager.shape = (3, 4)
+        index = self.index_manager.from_sequence((2, 3))
+
+        self.assertEqual(index, 14)
+        self.assertEqual(self.index_manager.to_sequence(index), (2, 3))
+
+    def test_empty_shape(self):
+        index_manager = ShapeIndexManager()
+        with self.assertRaises(RuntimeError):
+            index_manager.create_index(Root, 0)
+
+
 class TestTupleIndexManager(IndexManagerMixin, TestCase):
 
     def setUp(self):
@@ -191,3 +286,64 @@ class TestTupleIndexManager(IndexManagerMixin, TestCase):
                 result = self.index_manager.from_id(id)
                 self.assertIs(result, index)
                 parent = index
+
+    def test_cache_statistics(self):
+        index = self.index_manager.from_sequence((5, 6))
+        self.index_manager.create_index(index, 7)
+        self.index_manager.create_index(index, 7)
+
+        self.assertEqual(self.index_manager.cache_size, 4)
+        self.assertEqual(self.index_manager.cache_misses, 3)
+        self.assertEqual(self.index_manager.cache_hits, 1)
+        self.assertEqual(self.index_manager.hit_rate, 0.25)
+
+    def test_hit_rate_no_lookups(self):
+        self.assertEqual(self.index_manager.hit_rate, 0.0)
+
+    def test_needs_collect_no_limit(self):
+        for row in range(100):
+            self.index_manager.create_index(Root, row)
+
+        self.assertFalse(self.index_manager.needs_collect())
+
+    def test_needs_collect_limit(self):
+        self.index_manager.cache_limit = 10
+        for row in range(10):
+            self.index_manager.create_index(Root, row)
+        self.assertTrue(self.index_manager.needs_collect())
+
+    def test_collect(self):
+        sequence = (5, 6, 7)
+        index = self.index_manager.from_sequence(sequence)
+        parent = self.index_manager.from_sequence(sequence[:-1])
+        for row in range(10):
+            self.index_manager.create_index(Root, row)
+            self.index_manager.create_index(index, row)
+
+        count = self.index_manager.collect([index])
+
+        self.assertEqual(count, 19)
+        self.assertEqual(self.index_manager.cache_size, 4)
+        self.assertIs(self.index_manager.from_sequence(sequence), index)
+        self.assertIs(self.index_manager.from_sequence(sequence[:-1]), parent)
+        result = self.index_manager.from_id(self.index_manager.id(index))
+        self.assertIs(result, index)
+
+    def test_collect_evicted_id(self):
+        index = self.index_manager.from_sequence((5, 6, 7))
+        index_id = self.index_manager.id(index)
+
+        self.index_manager.collect()
+
+        self.assertEqual(self.index_manager.cache_size, 1)
+        with self.assertRaises(KeyError):
+            self.index_manager.from_id(index_id)
+        self.assertIs(self.index_manager.from_id(0), Root)
+
+    def test_collect_nothing_to_discard(self):
+        index = self.index_manager.from_sequence((5, 6, 7))
+
+        count = self.index_manager.collect([index])
+
+        self.assertEqual(count, 0)
+        self.assertEqual(self.index_manager.cache_size, 4)
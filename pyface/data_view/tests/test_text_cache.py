@@ -0,0 +1,145 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from traits.testing.api import UnittestTools
+from traits.testing.optional_dependencies import numpy as np, requires_numpy
+
+from pyface.data_view.data_models.api import ArrayDataModel
+from pyface.data_view.text_cache import TextCache
+from pyface.data_view.value_types.api import FloatValue
+
+
+@requires_numpy
+class TestTextCache(UnittestTools, TestCase):
+
+    def setUp(self):
+        self.data = np.arange(3000.0).reshape(5, 20, 30)
+        self.model = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.cache = TextCache(model=self.model, block_rows=8, block_columns=4)
+
+    def patch_get_texts(self):
+        return patch.object(
+            ArrayDataModel,
+            'get_texts',
+            autospec=True,
+            side_effect=ArrayDataModel.get_texts,
+        )
+
+    def test_get_text(self):
+        result = self.cache.get_text((1, 2), (3,))
+
+        self.assertEqual(result, "{:n}".format(self.data[1, 2, 3]))
+        self.assertEqual(self.cache.size, 32)
+        self.assertEqual(self.cache.cache_misses, 1)
+        self.assertEqual(self.cache.cache_hits, 0)
+
+    def test_get_text_fetches_blocks(self):
+        with self.patch_get_texts() as get_texts:
+            for row in range(8):
+                for column in range(4):
+                    self.cache.get_text((1, row), (column,))
+
+        get_texts.assert_called_once_with(
+            self.model, (1,), range(0, 8), range(0, 4)
+        )
+        self.assertEqual(self.cache.cache_misses, 1)
+        self.assertEqual(self.cache.cache_hits, 31)
+
+    def test_get_text_partial_block(self):
+        result = self.cache.get_text((4, 19), (29,))
+
+        self.assertEqual(result, "{:n}".format(self.data[4, 19, 29]))
+        # the last block only has 4 rows and 2 columns
+        self.assertEqual(self.cache.size, 8)
+
+    def test_max_cells(self):
+        self.cache.max_cells = 64
+        self.cache.get_text((0, 0), (0,))
+        self.cache.get_text((0, 8), (0,))
+
+        self.assertEqual(self.cache.size, 64)
+
+        # the least recently used block is discarded
+        self.cache.get_text((1, 0), (0,))
+
+        self.assertEqual(self.cache.size, 64)
+        with self.patch_get_texts() as get_texts:
+            self.cache.get_text((0, 8), (0,))
+            self.cache.get_text((0, 0), (0,))
+
+        get_texts.assert_called_once_with(
+            self.model, (0,), range(0, 8), range(0, 4)
+        )
+
+    def test_invalidate(self):
+        self.model.data[1, 2, 3] = -1.0
+        self.cache.get_text((1, 2), (3,))
+        self.cache.get_text((1, 2), (4,))
+        self.cache.get_text((1, 10), (3,))
+        self.cache.get_text((2, 2), (3,))
+
+        self.model.data[1, 2, 3] = -2.0
+        self.cache.invalidate((1, 2), (3,), (1, 2), (3,))
+
+        self.assertEqual(self.cache.size, 96)
+        self.assertEqual(
+            self.cache.get_text((1, 2), (3,)), "{:n}".format(-2.0)
+        )
+
+    def test_invalidate_descendants(self):
+        self.cache.get_text((1, 2), (3,))
+        self.cache.get_text((2, 2), (3,))
+        self.cache.get_text((4, 2), (3,))
+
+        self.cache.invalidate((0,), (0,), (2,), (29,))
+
+        self.assertEqual(self.cache.size, 32)
+        with self.patch_get_texts() as get_texts:
+            self.cache.get_text((4, 2), (3,))
+
+        get_texts.assert_not_called()
+
+    def test_invalidate_value_type_updated(self):
+        self.cache.get_text((1, 2), (3,))
+        self.cache.get_text((4, 12), (28,))
+
+        with self.assertTraitChanges(self.model, 'values_changed') as result:
+            self.model.value_type.updated = True
+
+        self.cache.invalidate(*result.events[0][-1])
+
+        self.assertEqual(self.cache.size, 0)
+
+    def test_invalidate_headers(self):
+        self.cache.get_text((1, 2), (3,))
+
+        self.cache.invalidate((), (0,), (), (29,))
+        self.cache.invalidate((0,), (), (4,), ())
+
+        self.assertEqual(self.cache.size, 32)
+
+    def test_clear(self):
+        self.cache.get_text((1, 2), (3,))
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.size, 0)
+
+    def test_model_changed(self):
+        self.cache.get_text((1, 2), (3,))
+
+        self.cache.model = ArrayDataModel(
+            data=self.data, value_type=FloatValue()
+        )
+
+        self.assertEqual(self.cache.size, 0)
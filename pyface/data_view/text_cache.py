@@ -0,0 +1,227 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" Provides a cache of the text of data model cells.
+
+Formatting values as text, particularly locale-aware formatting of floating
+point numbers, can dominate the cost of displaying large data models, and
+toolkits typically ask for the text of each visible cell many times.  The
+TextCache class keeps the text of recently displayed cells so that each
+cell is only formatted once until its value changes.
+"""
+from collections import OrderedDict
+
+from traits.api import (
+    Dict, HasStrictTraits, Instance, Int, Property, Tuple, observe
+)
+
+from .abstract_data_model import AbstractDataModel
+
+
+class TextCache(HasStrictTraits):
+    """ A least-recently-used cache of the text of data model cells.
+
+    Text is requested from the data model's ``get_texts`` method a block of
+    cells at a time.  The cache does not listen to the data model itself:
+    the toolkit, which receives the data model's events on the GUI thread,
+    is responsible for calling ``invalidate`` when the data model fires
+    ``values_changed`` and ``clear`` when the structure of the data model
+    changes.  Changes to value types are covered by this, as data models
+    are expected to fire ``values_changed`` when their value types are
+    updated.
+
+    Only the text of data cells is cached; row and column headers are not.
+    """
+
+    #: The data model whose text is being cached.
+    model = Instance(AbstractDataModel)
+
+    #: The number of rows of text requested from the data model at once.
+    block_rows = Int(64)
+
+    #: The number of columns of text requested from the data model at once.
+    block_columns = Int(16)
+
+    #: The maximum number of cells to hold in the cache.  The least recently
+    #: used blocks of cells are discarded when this is exceeded.  A value of
+    #: 0 means that the cache is unbounded.
+    max_cells = Int(0)
+
+    #: The number of cells currently cached.
+    size = Property(Int)
+
+    #: The number of requests for text satisfied from the cache.
+    cache_hits = Int()
+
+    #: The number of requests for text which required fetching a block.
+    cache_misses = Int()
+
+    #: The cached blocks of text, keyed by (parent, row_start, column_start),
+    #: in order from least to most recently used.
+    _blocks = Instance(OrderedDict, ())
+
+    #: The keys of the cached blocks for each parent row.
+    _parent_keys = Dict(Tuple, Instance(set))
+
+    #: The number of cells currently cached.
+    _size = Int()
+
+    def get_text(self, row, column):
+        """ Get the text of a data cell.
+
+        Parameters
+        ----------
+        row : tuple of int
+            The indices of the row as a sequence from root to leaf.  This
+            must not be the root row.
+        column : tuple of int
+            The indices of the column as a sequence of length 1.
+
+        Returns
+        -------
+        text : str or None
+            The text of the cell, or None if the cell has no text.
+        """
+        parent = row[:-1]
+        row_start = row[-1] - row[-1] % self.block_rows
+        column_start = column[0] - column[0] % self.block_columns
+        key = (parent, row_start, column_start)
+        blocks = self._blocks
+        block = blocks.get(key)
+        if block is None:
+            self.cache_misses += 1
+            block = self._fetch_block(key)
+        else:
+            self.cache_hits += 1
+            blocks.move_to_end(key)
+
+        try:
+            return block[0][row[-1] - row_start][column[0] - column_start]
+        except IndexError:
+            return None
+
+    def invalidate(self, top, left, bottom, right):
+        """ Discard the cached text of a region of cells.
+
+        The arguments are the same as the values of the data model's
+        ``values_changed`` event.  Blocks which overlap the region are
+        discarded, as are any blocks of descendants of the rows in the
+        region.
+
+        Parameters
+        ----------
+        top : tuple of int
+            The first row of the region.
+        left : tuple of int
+            The first column of the region.
+        bottom : tuple of int
+            The last row of the region.
+        right : tuple of int
+            The last column of the region.
+        """
+        if len(top) == 0 or len(bottom) == 0:
+            if top == bottom:
+                # only the column headers have changed
+                return
+            self.clear()
+            return
+        if len(left) == 0 and len(right) == 0:
+            # only the row headers have changed
+            return
+
+        for i, (top_row, bottom_row) in enumerate(zip(top, bottom)):
+            if top_row != bottom_row:
+                break
+        parent = tuple(top[:i])
+        first = top[i]
+        last = bottom[i]
+        first_column = left[0] if left else 0
+        last_column = right[0] if right else self.model.get_column_count()
+
+        depth = len(parent)
+        discard = []
+        for block_parent, keys in self._parent_keys.items():
+            if block_parent[:depth] != parent:
+                continue
+            if len(block_parent) > depth:
+                if not first <= block_parent[depth] <= last:
+                    continue
+                first_row = 0
+                last_row = None
+            else:
+                first_row = first
+                last_row = last
+            for key in keys:
+                row_start, column_start = key[1:]
+                if (
+                    (last_row is None or row_start <= last_row)
+                    and row_start + self.block_rows > first_row
+                    and column_start <= last_column
+                    and column_start + self.block_columns > first_column
+                ):
+                    discard.append(key)
+
+        for key in discard:
+            self._discard_block(key)
+
+    def clear(self):
+        """ Discard all cached text. """
+        self._blocks.clear()
+        self._parent_keys = {}
+        self._size = 0
+
+    # Private methods -------------------------------------------------------
+
+    def _fetch_block(self, key):
+        """ Fetch a block of text from the data model and cache it. """
+        parent, row_start, column_start = key
+        rows = range(
+            row_start,
+            min(row_start + self.block_rows, self.model.get_row_count(parent)),
+        )
+        columns = range(
+            column_start,
+            min(
+                column_start + self.block_columns,
+                self.model.get_column_count(),
+            ),
+        )
+        texts = self.model.get_texts(parent, rows, columns)
+        cells = len(rows) * len(columns)
+        block = (texts, cells)
+
+        self._blocks[key] = block
+        self._parent_keys.setdefault(parent, set()).add(key)
+        self._size += cells
+        if self.max_cells > 0:
+            while self._size > self.max_cells and len(self._blocks) > 1:
+                self._discard_block(next(iter(self._blocks)))
+        return block
+
+    def _discard_block(self, key):
+        """ Remove a block from the cache. """
+        texts, cells = self._blocks.pop(key)
+        keys = self._parent_keys[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._parent_keys[key[0]]
+        self._size -= cells
+
+    # Trait property methods -------------------------------------------------
+
+    def _get_size(self):
+        return self._size
+
+    # Trait change handlers --------------------------------------------------
+
+    @observe('model')
+    def _reset_cache(self, event):
+        """ Discard all cached text when the model is replaced. """
+        self.clear()
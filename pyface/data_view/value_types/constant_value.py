@@ -29,3 +29,7 @@ class ConstantValue(AbstractValueType):
 
     def get_text(self, model, row, column):
         return self.text
+
+    def get_texts(self, model, parent, rows, columns):
+        text = self.text or None
+        return [[text] * len(columns) for row in rows]
@@ -20,6 +20,9 @@ class NoValue(AbstractValueType):
     def has_text(self, model, row, column):
         return False
 
+    def get_texts(self, model, parent, rows, columns):
+        return [[None] * len(columns) for row in rows]
+
 
 #: Standard instance of the NoValue class, since it has no state.
 no_value = NoValue()
@@ -88,24 +88,63 @@ class NumericValue(EditableValue):
         # Qt recognises them
         return self.evaluate(model.get_value(row, column))
 
-    def get_text(self, model, row, column):
-        """ Get the display text from the underlying value.
+    def format_value(self, value):
+        """ Get the display text of an underlying value.
 
         Parameters
         ----------
-        model : AbstractDataModel
-            The data model holding the data.
-        row : sequence of int
-            The row in the data model being queried.
-        column : sequence of int
-            The column in the data model being queried.
+        value : number
+            The underlying value.
 
         Returns
         -------
         text : str
             The text to display.
         """
-        return self.format(model.get_value(row, column))
+        return self.format(value)
+
+    def get_texts(self, model, parent, rows, columns):
+        """ Get the display text for a block of underlying values.
+
+        When the model returns the values as a numeric array and ``format``
+        is the ``%`` operator of a format string, such as
+        ``"%.3f".__mod__``, the whole block is formatted with a single
+        vectorized operation.  Otherwise each value is formatted in turn.
+
+        Parameters
+        ----------
+        model : AbstractDataModel
+            The data model holding the data.
+        parent : sequence of int
+            The parent row of the rows being queried.
+        rows : sequence of int
+            The positions of the rows in the parent's children.
+        columns : sequence of int
+            The column numbers being queried.
+
+        Returns
+        -------
+        texts : list of lists of str or None
+            The text to display, indexed first by row and then by column,
+            or None if a value has no text.
+        """
+        template = getattr(self.format, "__self__", None)
+        if (
+            not isinstance(template, str)
+            or getattr(self.format, "__name__", None) != "__mod__"
+        ):
+            return super().get_texts(model, parent, rows, columns)
+
+        values = model.get_values(parent, rows, columns)
+        dtype = getattr(values, "dtype", None)
+        if dtype is None or dtype.kind not in "biuf" or values.ndim != 2:
+            return self._format_values(values)
+
+        from numpy import char
+        texts = char.mod(template, values)
+        if (texts == "").any():
+            return self._format_values(values)
+        return texts.tolist()
 
     def set_text(self, model, row, column, text):
         """ Set the text of the underlying value.
@@ -44,6 +44,21 @@ class TestConstantValue(UnittestTools, TestCase):
             "something"
         )
 
+    def test_get_texts(self):
+        value_type = ConstantValue(text="something")
+        self.assertEqual(
+            value_type.get_texts(self.model, [], range(2), range(3)),
+            [["something"] * 3] * 2
+        )
+        self.model.get_values.assert_not_called()
+
+    def test_get_texts_empty(self):
+        value_type = ConstantValue()
+        self.assertEqual(
+            value_type.get_texts(self.model, [], range(2), range(3)),
+            [[None] * 3] * 2
+        )
+
     def test_text_changed(self):
         value_type = ConstantValue()
         with self.assertTraitChanges(value_type, 'updated'):
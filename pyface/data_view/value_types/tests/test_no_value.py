@@ -26,3 +26,11 @@ class TestNoValue(TestCase):
     def test_has_text(self):
         value_type = NoValue()
         self.assertFalse(value_type.has_text(self.model, [0], [0]))
+
+    def test_get_texts(self):
+        value_type = NoValue()
+        self.assertEqual(
+            value_type.get_texts(self.model, [], range(2), range(3)),
+            [[None] * 3] * 2
+        )
+        self.model.get_values.assert_not_called()
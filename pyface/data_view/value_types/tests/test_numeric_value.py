@@ -9,7 +9,9 @@
 # Thanks for using Enthought open source!
 
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+
+from traits.testing.optional_dependencies import numpy as np, requires_numpy
 
 from pyface.data_view.abstract_data_model import DataViewSetError
 from pyface.data_view.value_types.numeric_value import (
@@ -69,6 +71,36 @@ class TestNumericValue(TestCase):
         text = value.get_text(self.model, [0], [0])
         self.assertEqual(text, format_locale(1.0))
 
+    def test_get_texts(self):
+        self.model.get_values = Mock(return_value=[[1.0, 1.0]])
+        value = NumericValue()
+        texts = value.get_texts(self.model, [], range(1), range(2))
+        self.assertEqual(texts, [[format_locale(1.0), format_locale(1.0)]])
+        self.model.get_values.assert_called_once_with([], range(1), range(2))
+
+    def test_get_texts_empty(self):
+        self.model.get_values = Mock(return_value=[[1.0]])
+        value = NumericValue(format=lambda x: "")
+        texts = value.get_texts(self.model, [], range(1), range(1))
+        self.assertEqual(texts, [[None]])
+
+    @requires_numpy
+    def test_get_texts_vectorized(self):
+        self.model.get_values = Mock(
+            return_value=np.array([[1.0, 2.5], [-3.0, 0.125]])
+        )
+        value = NumericValue(format="%.2f".__mod__)
+        with patch("numpy.char.mod", wraps=np.char.mod) as mod:
+            texts = value.get_texts(self.model, [], range(2), range(2))
+        self.assertEqual(texts, [["1.00", "2.50"], ["-3.00", "0.12"]])
+        mod.assert_called_once()
+
+    def test_get_texts_percent_format_not_array(self):
+        self.model.get_values = Mock(return_value=[[1.0, 2.5]])
+        value = NumericValue(format="%.2f".__mod__)
+        texts = value.get_texts(self.model, [], range(1), range(2))
+        self.assertEqual(texts, [["1.00", "2.50"]])
+
     def test_set_text(self):
         value = NumericValue(evaluate=float)
         value.set_text(self.model, [0], [0], format_locale(1.1))
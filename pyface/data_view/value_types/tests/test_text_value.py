@@ -45,6 +45,19 @@ class TestTextValue(TestCase):
         editable = value.get_text(self.model, [0], [0])
         self.assertEqual(editable, "test")
 
+    def test_get_texts(self):
+        self.model.get_values = Mock(return_value=[["test", "test"]])
+        value = TextValue()
+        texts = value.get_texts(self.model, [], range(1), range(2))
+        self.assertEqual(texts, [["test", "test"]])
+        self.model.get_values.assert_called_once_with([], range(1), range(2))
+
+    def test_get_texts_empty(self):
+        self.model.get_values = Mock(return_value=[["test"]])
+        value = TextValue(format=lambda x: "")
+        texts = value.get_texts(self.model, [], range(1), range(1))
+        self.assertEqual(texts, [[None]])
+
     def test_set_text(self):
         value = TextValue()
         value.set_text(self.model, [0], [0], "test")
@@ -23,24 +23,20 @@ class TextValue(EditableValue):
     #: A function that converts to a value from a display string.
     unformat = Callable(str)
 
-    def get_text(self, model, row, column):
-        """ Get the display text from the underlying value.
+    def format_value(self, value):
+        """ Get the display text of an underlying value.
 
         Parameters
         ----------
-        model : AbstractDataModel
-            The data model holding the data.
-        row : sequence of int
-            The row in the data model being queried.
-        column : sequence of int
-            The column in the data model being queried.
+        value : any
+            The underlying value.
 
         Returns
         -------
         text : str
             The text to display.
         """
-        return self.format(model.get_value(row, column))
+        return self.format(value)
 
     def set_text(self, model, row, column, text):
         """ Set the text of the underlying value.
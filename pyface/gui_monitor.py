@@ -0,0 +1,456 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Opt-in instrumentation of the GUI event loop.
+
+When an application freezes, it is usually because some call on the GUI
+thread has taken too long.  This module provides two tools for finding such
+calls, which can be left running in production:
+
+- a :py:class:`CallProfiler`, which times the calls made by
+  ``GUI.invoke_later`` and friends and by Pyface timers, and keeps a
+  histogram of the durations of each callable;
+- a :py:class:`StallWatchdog`, which uses a background thread to detect
+  when the GUI event loop has stopped responding, and captures the stack of
+  the GUI thread while it is stalled.
+
+Both report slow calls and stalls as warnings on the ``pyface.gui_monitor``
+logger, so they can be collected by the application's usual log handlers::
+
+    profiler = CallProfiler(slow_threshold=0.05)
+    profiler.start()
+    watchdog = StallWatchdog(threshold=0.5)
+    watchdog.start()
+"""
+import functools
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+
+from traits.api import Any, Float, HasStrictTraits, Instance, Int, Range
+
+
+logger = logging.getLogger(__name__)
+
+#: The profiler which is recording calls, or None.
+_profiler = None
+
+
+def get_profiler():
+    """ Get the profiler which is recording GUI calls, or None. """
+    return _profiler
+
+
+def profiled_call(callable, *args, **kw):
+    """ Make a call, recording it with the current profiler, if any.
+
+    Parameters
+    ----------
+    callable : callable
+        The callable to call.
+    *args, **kw :
+        Arguments to be passed through to the callable.
+
+    Returns
+    -------
+    result : any
+        The result of the call.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return callable(*args, **kw)
+    return profiler.call(callable, args, kw)
+
+
+def callable_name(callable):
+    """ Get a readable name for a callable, for reporting.
+
+    Parameters
+    ----------
+    callable : any
+        A function, method, partial or other callable object.
+
+    Returns
+    -------
+    name : str
+        The module and qualified name of the callable, if it has them.
+    """
+    while isinstance(callable, functools.partial):
+        callable = callable.func
+    function = getattr(callable, "__func__", callable)
+    qualname = getattr(function, "__qualname__", None)
+    if qualname is None:
+        qualname = type(callable).__qualname__
+        module = type(callable).__module__
+    else:
+        module = getattr(function, "__module__", None)
+    if module is None:
+        return qualname
+    return "{}.{}".format(module, qualname)
+
+
+class CallProfiler(HasStrictTraits):
+    """ Record the durations of the calls made on the GUI thread.
+
+    While the profiler is started, calls made by ``GUI.invoke_later``,
+    ``GUI.invoke_after`` and the related methods, and the callbacks of
+    Pyface timers, are timed.  The durations are kept in histograms for
+    each callable, whose buckets are powers of two microseconds wide.
+    Calls which take longer than ``slow_threshold`` are logged.
+    """
+
+    #: Calls which take at least this many seconds are logged as warnings.
+    slow_threshold = Range(low=0.0, value=0.1)
+
+    #: The name of the callable currently being called, or None.  This is
+    #: read by the StallWatchdog to report the call which stalled.
+    current = Any()
+
+    # Private traits ---------------------------------------------------------
+
+    #: The statistics of each callable, keyed by name, as lists of [count,
+    #: total duration, maximum duration, histogram].
+    _statistics = Instance(dict, ())
+
+    #: A lock protecting the statistics.
+    _lock = Any()
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """ Start recording calls, replacing any other active profiler. """
+        global _profiler
+        _profiler = self
+
+    def stop(self):
+        """ Stop recording calls. """
+        global _profiler
+        if _profiler is self:
+            _profiler = None
+
+    def call(self, callable, args=(), kw=None, target=None):
+        """ Make a call and record its duration.
+
+        Parameters
+        ----------
+        callable : callable
+            The callable to call.
+        args : tuple
+            The positional arguments of the call.
+        kw : dict or None
+            The keyword arguments of the call.
+        target : any
+            The object to record the call against, if not the callable.
+
+        Returns
+        -------
+        result : any
+            The result of the call.
+        """
+        name = callable_name(callable if target is None else target)
+        previous = self.current
+        self.current = name
+        start = time.perf_counter()
+        try:
+            if kw:
+                return callable(*args, **kw)
+            return callable(*args)
+        finally:
+            duration = time.perf_counter() - start
+            self.current = previous
+            self.record(name, duration)
+
+    def record(self, name, duration):
+        """ Record the duration of a call.
+
+        Parameters
+        ----------
+        name : str
+            The name of the callable.
+        duration : float
+            The duration of the call in seconds.
+        """
+        # bucket n holds durations of up to 2**n microseconds
+        bucket = max(math.frexp(duration * 1e6)[1], 0)
+        with self._lock:
+            statistics = self._statistics.get(name)
+            if statistics is None:
+                statistics = [0, 0.0, 0.0, {}]
+                self._statistics[name] = statistics
+            statistics[0] += 1
+            statistics[1] += duration
+            if duration > statistics[2]:
+                statistics[2] = duration
+            histogram = statistics[3]
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+        if duration >= self.slow_threshold:
+            logger.warning(
+                "Slow GUI call: %s took %.3f s", name, duration,
+                extra={"callable": name, "duration": duration},
+            )
+
+    def statistics(self, reset=False):
+        """ Get the statistics of the calls which have been recorded.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to discard the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary keyed by the names of the callables, holding
+            dictionaries with the ``count`` of calls, the ``total``,
+            ``mean`` and ``max`` durations in seconds, and the
+            ``histogram`` of durations as a list of (upper bound in seconds,
+            count) pairs.
+        """
+        with self._lock:
+            items = [
+                (name, count, total, maximum, dict(histogram))
+                for name, (count, total, maximum, histogram)
+                in self._statistics.items()
+            ]
+            if reset:
+                self._statistics = {}
+
+        return {
+            name: {
+                "count": count,
+                "total": total,
+                "mean": total / count,
+                "max": maximum,
+                "histogram": [
+                    (2.0 ** bucket * 1e-6, histogram[bucket])
+                    for bucket in sorted(histogram)
+                ],
+            }
+            for name, count, total, maximum, histogram in items
+        }
+
+    def log_statistics(self, level=logging.INFO, limit=10):
+        """ Log the callables which have taken the most time.
+
+        Parameters
+        ----------
+        level : int
+            The logging level to use.
+        limit : int
+            The number of callables to log.
+        """
+        statistics = sorted(
+            self.statistics().items(),
+            key=lambda item: item[1]["total"],
+            reverse=True,
+        )
+        for name, data in statistics[:limit]:
+            logger.log(
+                level,
+                "GUI call %s: %d calls, %.3f s total, %.3f s mean, "
+                "%.3f s max",
+                name, data["count"], data["total"], data["mean"], data["max"],
+            )
+
+
+class StallWatchdog(HasStrictTraits):
+    """ Detect stalls of the GUI event loop from a background thread.
+
+    A background thread regularly asks the GUI thread to respond via
+    ``GUI.invoke_later``.  If the GUI thread hasn't responded after
+    ``threshold`` seconds, the event loop is stalled: the stack of the GUI
+    thread is captured and logged as a warning, together with the callable
+    being run if a :py:class:`CallProfiler` is active.  When the GUI thread
+    responds, the total length of the stall is logged.
+    """
+
+    #: The time in seconds that the event loop may be unresponsive before
+    #: it is considered to be stalled.
+    threshold = Range(low=0.001, value=0.5)
+
+    #: The maximum number of stalls to keep.
+    max_stalls = Int(100)
+
+    # Private traits ---------------------------------------------------------
+
+    #: The stalls which have been detected, as dictionaries.
+    _stalls = Instance(list, ())
+
+    #: The number of stalls which have been detected.
+    _stall_count = Int()
+
+    #: The longest time the event loop has taken to respond, in seconds.
+    _max_latency = Float()
+
+    #: The time the pending request was made, or None.
+    _ping = Any()
+
+    #: The stall which is in progress, or None.
+    _stall = Any()
+
+    #: The identifier of the GUI thread.
+    _gui_thread = Any()
+
+    #: The background thread.
+    _thread = Instance(threading.Thread)
+
+    #: Event set to stop the background thread.
+    _stopping = Instance(threading.Event, ())
+
+    #: A lock protecting the state shared with the background thread.
+    _lock = Any()
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """ Start watching the event loop.
+
+        This must be called from the GUI thread.
+        """
+        if self._thread is not None:
+            return
+        self._gui_thread = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="pyface-stall-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """ Stop watching the event loop. """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._ping = None
+            self._stall = None
+
+    def stalls(self):
+        """ Get the stalls which have been detected.
+
+        Returns
+        -------
+        stalls : list of dict
+            The stalls, oldest first, as dictionaries with the ``time`` at
+            which the stall started (from ``time.perf_counter``), its
+            ``duration`` in seconds or None if it is still in progress, the
+            ``stack`` of the GUI thread as a string, and the name of the
+            ``callable`` being profiled or None.
+        """
+        with self._lock:
+            return [dict(stall) for stall in self._stalls]
+
+    def statistics(self, reset=False):
+        """ Get statistics about the responsiveness of the event loop.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics and discard the stalls after
+            reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of ``stalls`` and the
+            ``max_latency`` in seconds of the event loop.
+        """
+        with self._lock:
+            statistics = {
+                "stalls": self._stall_count,
+                "max_latency": self._max_latency,
+            }
+            if reset:
+                self._stall_count = 0
+                self._max_latency = 0.0
+                self._stalls = []
+        return statistics
+
+    # Private methods --------------------------------------------------------
+
+    def _watch(self):
+        """ Check the event loop regularly, on the background thread. """
+        from pyface.gui import GUI
+
+        interval = self.threshold / 4
+        while not self._stopping.wait(interval):
+            now = time.perf_counter()
+            with self._lock:
+                ping = self._ping
+                if ping is None:
+                    self._ping = now
+                    stalled = False
+                else:
+                    stalled = (
+                        self._stall is None and now - ping > self.threshold
+                    )
+            if ping is None:
+                GUI.invoke_later(self._respond, now)
+            elif stalled:
+                self._capture(ping, now)
+
+    def _capture(self, ping, now):
+        """ Capture the stack of the stalled GUI thread. """
+        frame = sys._current_frames().get(self._gui_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        profiler = get_profiler()
+        name = profiler.current if profiler is not None else None
+        stall = {
+            "time": ping,
+            "duration": None,
+            "stack": stack,
+            "callable": name,
+        }
+        with self._lock:
+            if self._ping != ping:
+                # the GUI thread responded in the meantime
+                return
+            self._stall = stall
+            self._stall_count += 1
+            self._stalls.append(stall)
+            excess = len(self._stalls) - max(self.max_stalls, 0)
+            if excess > 0:
+                del self._stalls[:excess]
+
+        logger.warning(
+            "GUI event loop stalled for more than %.3f s in %s:\n%s",
+            now - ping, name, stack,
+            extra={"callable": name, "stack": stack},
+        )
+
+    def _respond(self, ping):
+        """ Respond to the background thread, on the GUI thread. """
+        latency = time.perf_counter() - ping
+        with self._lock:
+            if self._ping != ping:
+                return
+            self._ping = None
+            stall = self._stall
+            self._stall = None
+            if stall is not None:
+                stall["duration"] = latency
+            if latency > self._max_latency:
+                self._max_latency = latency
+
+        if stall is not None:
+            logger.warning(
+                "GUI event loop stalled for %.3f s in %s",
+                latency, stall["callable"],
+                extra={"callable": stall["callable"], "duration": latency},
+            )
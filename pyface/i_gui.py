@@ -13,6 +13,8 @@
 
 import logging
 import os
+import threading
+import time
 
 
 from traits.etsconfig.api import ETSConfig
@@ -96,6 +98,86 @@ class IGUI(Interface):
             Arguments and keyword arguments to be used when calling.
         """
 
+    @classmethod
+    def invoke_later_coalesced(cls, key, callable, *args, **kw):
+        """ Call a callable in the main GUI thread, replacing pending calls.
+
+        If a call with the same key is still waiting to be made, it is
+        replaced by this call, so that only the most recent call for each
+        key is made.  This is useful for worker threads which frequently
+        request updates where only the latest matters.
+
+        Parameters
+        ----------
+        key : hashable
+            The key identifying calls which replace one another.
+        callable : callable
+            Callable to be called
+        args, kwargs :
+            Arguments and keyword arguments to be used when calling.
+        """
+
+    @classmethod
+    def set_trait_later_coalesced(cls, obj, trait_name, new):
+        """ Sets a trait in the main GUI thread, keeping only the last value.
+
+        This may be called from any thread.  Pending values for the same
+        object and trait are replaced by newer values, and pending values
+        are applied at most once per frame, so a worker can report
+        progress or status as often as it likes without flooding the GUI
+        thread with trait notifications.
+
+        Parameters
+        ----------
+        obj : HasTraits instance
+            Object on which the trait is to be set
+        trait_name : str
+            The name of the trait to set
+        new : any
+            The value to set.
+        """
+
+    @classmethod
+    def coalesced_trait_statistics(cls, reset=False):
+        """ Statistics about the values set by set_trait_later_coalesced.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the counts after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of values ``pending``, the
+            number ``applied`` and the number ``dropped`` because a newer
+            value replaced them.
+        """
+
+    @classmethod
+    def dispatch_statistics(cls, reset=False):
+        """ Statistics about the calls made by invoke_later and friends.
+
+        Toolkits which queue calls and make them in batches on the main GUI
+        thread report on the queue; other toolkits return an empty
+        dictionary.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the current ``queue_depth``, the
+            ``max_queue_depth``, the number of calls ``dispatched``, the
+            number of calls ``coalesced`` by invoke_later_coalesced, the
+            number of ``batches`` and the ``last_drain_latency`` and
+            ``max_drain_latency`` in seconds, where the drain latency is
+            the time the oldest call in a batch spent in the queue.
+        """
+
     @classmethod
     def set_trait_after(cls, millisecs, obj, trait_name, new):
         """ Sets a trait after a specific delay in the main GUI thread.
@@ -181,6 +263,36 @@ class MGUI(object):
 
         signal.signal(signal.SIGINT, signal.SIG_DFL)
 
+    @classmethod
+    def invoke_later_coalesced(cls, key, callable, *args, **kw):
+        """ Call a callable in the main GUI thread, replacing pending calls.
+
+        This default implementation does not coalesce calls: every call is
+        made, in order, via ``invoke_later``.
+        """
+        cls.invoke_later(callable, *args, **kw)
+
+    @classmethod
+    def set_trait_later_coalesced(cls, obj, trait_name, new):
+        """ Sets a trait in the main GUI thread, keeping only the last value.
+        """
+        _coalesced_traits.set_trait(cls, obj, trait_name, new)
+
+    @classmethod
+    def coalesced_trait_statistics(cls, reset=False):
+        """ Statistics about the values set by set_trait_later_coalesced.
+        """
+        return _coalesced_traits.statistics(reset)
+
+    @classmethod
+    def dispatch_statistics(cls, reset=False):
+        """ Statistics about the calls made by invoke_later and friends.
+
+        This default implementation does not track calls, and returns an
+        empty dictionary.
+        """
+        return {}
+
     def _default_state_location(self):
         """ Return the default state location. """
 
@@ -194,3 +306,85 @@ class MGUI(object):
         logger.debug("GUI state location is <%s>", state_location)
 
         return state_location
+
+
+class _CoalescedTraitSetter(object):
+    """ Applies the latest values of traits on the GUI thread, once a frame.
+
+    Values are stored under a lock, keyed by the object and trait name.  The
+    first value stored when none are pending schedules a flush on the GUI
+    thread, which is delayed if necessary so that flushes happen at most
+    once per ``frame_interval``.
+    """
+
+    #: The minimum time between flushes, in seconds.
+    frame_interval = 1.0 / 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled = False
+        self._last_flush = 0.0
+        self._applied = 0
+        self._dropped = 0
+
+    def set_trait(self, gui, obj, trait_name, new):
+        """ Store a value and ensure that a flush is scheduled. """
+        with self._lock:
+            key = (id(obj), trait_name)
+            if key in self._pending:
+                self._dropped += 1
+            self._pending[key] = (obj, trait_name, new)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        gui.invoke_later(self._schedule_flush, gui)
+
+    def statistics(self, reset=False):
+        """ Get a dictionary of statistics. """
+        with self._lock:
+            statistics = {
+                "pending": len(self._pending),
+                "applied": self._applied,
+                "dropped": self._dropped,
+            }
+            if reset:
+                self._applied = 0
+                self._dropped = 0
+        return statistics
+
+    def _schedule_flush(self, gui):
+        """ Flush now, or after the rest of the frame, on the GUI thread. """
+        delay = self._last_flush + self.frame_interval - time.perf_counter()
+        if delay > 0:
+            gui.invoke_after(int(delay * 1000) + 1, self._flush)
+        else:
+            self._flush()
+
+    def _flush(self):
+        """ Apply all the pending values on the GUI thread. """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._scheduled = False
+            self._last_flush = time.perf_counter()
+            self._applied += len(pending)
+
+        error = None
+        for obj, trait_name, new in pending.values():
+            try:
+                setattr(obj, trait_name, new)
+            except Exception as exc:
+                if error is None:
+                    error = exc
+                else:
+                    # only the first error can be raised
+                    logger.exception(
+                        "Error setting trait %r of %r", trait_name, obj
+                    )
+        if error is not None:
+            raise error
+
+
+#: The shared setter used by GUI.set_trait_later_coalesced.
+_coalesced_traits = _CoalescedTraitSetter()
@@ -9,12 +9,19 @@
 # Thanks for using Enthought open source!
 """ The interface for an image resource. """
 
+import hashlib
+import weakref
 from collections.abc import Sequence
 
-from pyface.resource_manager import resource_manager
+from pyface.resource_manager import decoded_image_cache, resource_manager
+from pyface.resource.resource_reference import ImageReference
 from pyface.resource.resource_path import resource_module, resource_path
 from traits.api import Interface, List, Str
 
+#: The digests of the data of image references, computed once per reference,
+#: which identify images loaded from data without keeping the data alive.
+_data_digests = weakref.WeakKeyDictionary()
+
 
 class IImageResource(Interface):
     """ The interface for an image resource.
@@ -163,7 +170,7 @@ class MImageResource(object):
         """
         ref = self._get_ref(size)
         if ref is not None:
-            image = ref.load()
+            image = self._load_image(ref)
 
         else:
             image = self._get_image_not_found_image()
@@ -174,6 +181,88 @@ class MImageResource(object):
     # Private interface.
     # ------------------------------------------------------------------------
 
+    def _load_image(self, ref):
+        """ Load the image for a reference, using the shared image cache.
+
+        Parameters
+        ----------
+        ref : ResourceReference instance
+            The reference to the image.
+
+        Returns
+        -------
+        image : toolkit image
+            The image.
+        """
+        key = self._get_cache_key(ref)
+        image = decoded_image_cache.get(key)
+        if image is None:
+            image = ref.load()
+            decoded_image_cache.add(key, image, self._get_image_bytes(image))
+        return self._share_image(image)
+
+    def _get_cache_key(self, ref):
+        """ Get the key of the image for a reference in the image cache.
+
+        The image loaded from a reference doesn't depend on the size it was
+        requested at, so sizes which fall back to the same image share it.
+
+        Parameters
+        ----------
+        ref : ResourceReference instance
+            The reference to the image.
+
+        Returns
+        -------
+        key : tuple
+            The key of the image in the shared image cache.
+        """
+        # references to the same file or data are the same image, other
+        # references are only known to be the same by their identity
+        if isinstance(ref, ImageReference) and ref.filename is not None:
+            return ("file", ref.filename)
+        elif isinstance(ref, ImageReference) and ref.data is not None:
+            digest = _data_digests.get(ref)
+            if digest is None:
+                digest = hashlib.sha256(ref.data).hexdigest()
+                _data_digests[ref] = digest
+            return ("data", digest)
+        else:
+            return ("reference", ref)
+
+    def _get_image_bytes(self, image):
+        """ Estimate the memory used by a toolkit image, in bytes.
+
+        Parameters
+        ----------
+        image : toolkit image
+            The image.
+
+        Returns
+        -------
+        nbytes : int
+            The estimated size of the image data.
+        """
+        width, height = self.image_size(image)
+        return width * height * 4
+
+    def _share_image(self, image):
+        """ Get an image from the cache which is safe to give to callers.
+
+        Toolkits whose images are mutable should return a copy.
+
+        Parameters
+        ----------
+        image : toolkit image
+            The cached image.
+
+        Returns
+        -------
+        image : toolkit image
+            The image to give to the caller.
+        """
+        return image
+
     def _get_ref(self, size=None):
         """ Return the resource manager reference to the image.
 
@@ -186,15 +275,27 @@ class MImageResource(object):
         Returns
         -------
         ref : ImageReference instance
-            The reference to the requested image.
+            The reference to the requested image.  If there is no image
+            specifically for the size, this is the reference to the image
+            for the default size.
         """
-
-        if self._ref is None:
-            self._ref = resource_manager.locate_image(
+        if size is None:
+            if self._ref is None:
+                self._ref = resource_manager.locate_image(
+                    self.name, self.search_path
+                )
+            return self._ref
+
+        size = tuple(size)
+        if size not in self._sized_refs:
+            self._sized_refs[size] = resource_manager.locate_image(
                 self.name, self.search_path, size
             )
+        ref = self._sized_refs[size]
+        if ref is None:
+            ref = self._get_ref()
 
-        return self._ref
+        return ref
 
     def _get_image_not_found_image(self):
         """ Returns the 'image not found' image.
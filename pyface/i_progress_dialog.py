@@ -63,6 +63,25 @@ class IProgressDialog(IDialog):
             The progress value to set.
         """
 
+    def report(self, value):
+        """ Report the progress value from any thread.
+
+        Unlike ``update``, this may be called from worker threads, and
+        returns without waiting for the GUI.  The dialog displays the most
+        recently reported value, so a worker may report progress as often
+        as it likes.
+
+        Parameters
+        ----------
+        value :
+            The progress value to set.
+
+        Returns
+        -------
+        continue : bool
+            False if the user has cancelled the dialog, True otherwise.
+        """
+
     def change_message(self, message):
         """ Change the displayed message in the progress dialog
 
@@ -78,7 +97,7 @@ class MProgressDialog(object):
     """ The mixin class that contains common code for toolkit specific
     implementations of the IProgressDialog interface.
 
-    Implements: update()
+    Implements: update(), report()
     """
 
     #: The progress bar toolkit object
@@ -119,6 +138,27 @@ class MProgressDialog(object):
         if value >= self.max:
             self.close()
 
+    def report(self, value):
+        """ Report the progress value from any thread.
+
+        This default implementation calls ``update`` on the GUI thread,
+        replacing any pending call which has not yet been made.
+
+        Parameters
+        ----------
+        value :
+            The progress value to set.
+
+        Returns
+        -------
+        continue : bool
+            False if the user has cancelled the dialog, True otherwise.
+        """
+        from pyface.gui import GUI
+
+        GUI.invoke_later_coalesced((id(self), "report"), self.update, value)
+        return not getattr(self, "_user_cancelled", False)
+
     def change_message(self, message):
         """ Change the displayed message in the progress dialog
 
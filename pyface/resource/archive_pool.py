@@ -0,0 +1,219 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" A pool of open zip archives for reading resources.
+
+Opening a zip file reads and parses its central directory, which is slow
+for large archives, such as zipped eggs.  The archive pool opens each zip
+file once, keeps the names of its members in a set so that lookups don't
+need to read the archive, and keeps a bounded number of archives open for
+reading, closing those which have not been used for a while.
+"""
+
+from collections import OrderedDict
+import os
+import stat
+import threading
+import time
+from zipfile import BadZipFile, ZipFile
+
+from traits.api import Any, Dict, Float, HasTraits, Instance, Int
+
+
+class ArchivePool(HasTraits):
+    """ A pool of open zip archives. """
+
+    # The maximum number of archives to keep open.
+    max_open = Int(8)
+
+    # The time in seconds after which an unused archive is closed.
+    idle_timeout = Float(30.0)
+
+    # The time in seconds for which the member names of an archive are
+    # trusted without checking whether the archive has been modified.
+    check_interval = Float(1.0)
+
+    # Private interface ------------------------------------------------------
+
+    # The member names of each file that has been looked at, keyed by
+    # filename.  Each value is a list of the time that the file was last
+    # checked, its signature from _get_signature, and a frozenset of member
+    # names, or None if the file is not a zip file.
+    _archives = Dict()
+
+    # The open archives, keyed by filename, from least to most recently
+    # used.  Each value is a list of the time the archive was last used and
+    # the ZipFile.
+    _open = Instance(OrderedDict, ())
+
+    # Statistics about the pool.
+    _statistics = Dict(value={"opened": 0, "closed": 0, "reads": 0})
+
+    # A lock protecting the pool, so archives can be read from any thread.
+    _lock = Any()
+
+    # The shared pool.
+    _default = None
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def default(cls):
+        """ Get the shared pool used by resource managers by default. """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def names(self, filename):
+        """ Get the names of the members of a zip file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        names : frozenset or None
+            The names of the members of the archive, or None if the file
+            doesn't exist or is not a zip file.
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._archives.get(filename)
+            if entry is None:
+                signature = self._get_signature(filename)
+            else:
+                # directories never become zip files
+                if entry[1] == "directory":
+                    return None
+                if now - entry[0] < self.check_interval:
+                    return entry[2]
+                entry[0] = now
+                signature = self._get_signature(filename)
+                if signature == entry[1]:
+                    return entry[2]
+
+            self._close(filename)
+            names = None
+            if signature is not None and signature != "directory":
+                try:
+                    archive = self._open_archive(filename, now)
+                except (OSError, BadZipFile):
+                    pass
+                else:
+                    names = frozenset(archive.namelist())
+            self._archives[filename] = [now, signature, names]
+            self._close_idle(now)
+            return names
+
+    def read(self, filename, name):
+        """ Read a member of a zip file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the zip file.
+        name : str
+            The name of the member.
+
+        Returns
+        -------
+        data : bytes
+            The contents of the member.
+
+        Raises
+        ------
+        KeyError
+            If the archive has no such member.
+        """
+        with self._lock:
+            now = time.monotonic()
+            opened = self._open.get(filename)
+            if opened is None:
+                archive = self._open_archive(filename, now)
+            else:
+                opened[0] = now
+                archive = opened[1]
+                self._open.move_to_end(filename)
+            self._statistics["reads"] += 1
+            data = archive.read(name)
+            self._close_idle(now)
+            return data
+
+    def close_all(self):
+        """ Close all the open archives and forget their contents. """
+        with self._lock:
+            for filename in list(self._open):
+                self._close(filename)
+            self._archives = {}
+
+    def statistics(self, reset=False):
+        """ Get statistics about the pool.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of archives ``opened`` and
+            ``closed``, the number of members ``reads`` and the number of
+            archives currently ``open``.
+        """
+        with self._lock:
+            statistics = dict(self._statistics)
+            statistics["open"] = len(self._open)
+            if reset:
+                self.reset_traits(["_statistics"])
+        return statistics
+
+    # Private methods --------------------------------------------------------
+
+    def _open_archive(self, filename, now):
+        """ Open an archive and add it to the open archives. """
+        archive = ZipFile(filename, "r")
+        self._statistics["opened"] += 1
+        self._open[filename] = [now, archive]
+        while len(self._open) > max(self.max_open, 1):
+            self._close(next(iter(self._open)))
+        return archive
+
+    def _close(self, filename):
+        """ Close an archive if it is open. """
+        opened = self._open.pop(filename, None)
+        if opened is not None:
+            opened[1].close()
+            self._statistics["closed"] += 1
+
+    def _close_idle(self, now):
+        """ Close the archives which have not been used recently. """
+        for filename, (last_used, archive) in list(self._open.items()):
+            if now - last_used < self.idle_timeout:
+                # archives are in order of use, so the rest are recent
+                break
+            self._close(filename)
+
+    def _get_signature(self, filename):
+        """ Get the modification time and size of a file.
+
+        Returns "directory" for directories and None for missing files.
+        """
+        try:
+            info = os.stat(filename)
+        except OSError:
+            return None
+        if stat.S_ISDIR(info.st_mode):
+            return "directory"
+        return (info.st_mtime_ns, info.st_size)
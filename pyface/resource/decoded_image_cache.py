@@ -0,0 +1,144 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" A memory-bounded cache of decoded toolkit images.
+
+Decoding an image file is much slower than handing out an image which has
+already been decoded, so image resources keep the images that they create
+in a shared cache, keyed by the identity of the image's resource reference.
+The least recently used images are discarded when the estimated memory used
+by the cached images exceeds a budget.
+"""
+
+from collections import OrderedDict
+import threading
+
+from traits.api import Any, Dict, HasTraits, Instance, Int
+
+
+class DecodedImageCache(HasTraits):
+    """ A least recently used cache of decoded images. """
+
+    # The maximum number of bytes of image data to keep in the cache.
+    max_bytes = Int(32 * 1024 * 1024)
+
+    # Private interface ------------------------------------------------------
+
+    # The cached images, from least to most recently used.  Each value is a
+    # tuple of the image and its estimated size in bytes.
+    _images = Instance(OrderedDict, ())
+
+    # The estimated number of bytes used by the cached images.
+    _bytes = Int()
+
+    # Statistics about the use of the cache.
+    _statistics = Dict(value={"hits": 0, "misses": 0, "evictions": 0})
+
+    # A lock protecting the cache.
+    _lock = Any()
+
+    def __init__(self, **traits):
+        # the lock is needed if max_bytes is set by the constructor
+        self._lock = threading.Lock()
+        super().__init__(**traits)
+
+    def get(self, key):
+        """ Get an image from the cache.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the image.
+
+        Returns
+        -------
+        image : toolkit image or None
+            The cached image, or None if there is no image with the key.
+        """
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None:
+                self._statistics["misses"] += 1
+                return None
+            self._images.move_to_end(key)
+            self._statistics["hits"] += 1
+            return entry[0]
+
+    def add(self, key, image, nbytes):
+        """ Add an image to the cache.
+
+        Images which are larger than the whole budget are not cached.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the image.
+        image : toolkit image
+            The image.
+        nbytes : int
+            The estimated memory used by the image, in bytes.
+        """
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return
+            self._images[key] = (image, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def clear(self):
+        """ Discard all the cached images. """
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def statistics(self, reset=False):
+        """ Get statistics about the use of the cache.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of lookups which were ``hits``
+            and ``misses``, the number of images discarded to stay within
+            the budget (``evictions``), and the number of ``images`` and
+            estimated ``bytes`` in the cache.
+        """
+        with self._lock:
+            statistics = dict(self._statistics)
+            statistics["images"] = len(self._images)
+            statistics["bytes"] = self._bytes
+            if reset:
+                self.reset_traits(["_statistics"])
+        return statistics
+
+    # Private methods --------------------------------------------------------
+
+    def _discard(self, key):
+        """ Remove an image from the cache if it is present. """
+        entry = self._images.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self):
+        """ Discard the least recently used images until within budget. """
+        while self._bytes > self.max_bytes:
+            self._discard(next(iter(self._images)))
+            self._statistics["evictions"] += 1
+
+    # Trait change handlers --------------------------------------------------
+
+    def _max_bytes_changed(self):
+        with self._lock:
+            self._evict()
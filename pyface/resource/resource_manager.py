@@ -13,13 +13,19 @@ A resource manager locates and loads application resources such as images and
 sounds etc.
 """
 
-import collections.abc, glob, inspect, os, sys, types
+import collections.abc, inspect, os, sys, time, types
 from os.path import join
-from zipfile import is_zipfile, ZipFile
 
-from traits.api import HasTraits, Instance, List
+try:
+    # Python 3.9 and later
+    from importlib.resources import files as resource_files
+except ImportError:
+    resource_files = None
+
+from traits.api import Dict, Float, HasTraits, Instance, List
 from traits.util.resource import get_path
 
+from pyface.resource.archive_pool import ArchivePool
 from pyface.resource.resource_factory import ResourceFactory
 from pyface.resource.resource_reference import ImageReference
 
@@ -43,6 +49,35 @@ class ResourceManager(HasTraits):
     # a images in the format that they require.
     resource_factory = Instance(ResourceFactory)
 
+    # The pool of zip files that images are read from.
+    archive_pool = Instance(ArchivePool)
+
+    # The time in seconds for which the directory index is trusted without
+    # checking whether the directories have been modified.
+    index_check_interval = Float(1.0)
+
+    # The index of the image files in each directory that has been searched,
+    # keyed by directory name.  Each value is a list of the time that the
+    # directory was last checked, its modification time (or None if it
+    # doesn't exist), and a dictionary mapping image base names to
+    # dictionaries mapping extensions to filenames.
+    _directory_index = Dict()
+
+    # The data of the images found in modules, keyed by module name, image
+    # name and size.  Images which were not found have a value of None.
+    _module_images = Dict()
+
+    # Statistics about the use of the directory index.
+    _index_statistics = Dict(
+        value={
+            "hits": 0,
+            "misses": 0,
+            "checks": 0,
+            "module_hits": 0,
+            "module_misses": 0,
+        }
+    )
+
     # ------------------------------------------------------------------------
     # 'ResourceManager' interface.
     # ------------------------------------------------------------------------
@@ -76,6 +111,38 @@ class ResourceManager(HasTraits):
 
         return image
 
+    def index_statistics(self, reset=False):
+        """ Get statistics about the directory index used to find images.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of directory lookups which were
+            index ``hits``, the number of ``misses`` where a directory had
+            to be read, the number of ``checks`` of directory modification
+            times, the number of ``directories`` indexed, and the number of
+            image lookups in modules which were cached (``module_hits``) or
+            had to search the module (``module_misses``).
+        """
+        statistics = dict(self._index_statistics)
+        statistics["directories"] = len(self._directory_index)
+        if reset:
+            self.reset_traits(["_index_statistics"])
+        return statistics
+
+    def invalidate_index(self):
+        """ Discard the directory index, so directories are read again.
+
+        This also discards the images found in modules.
+        """
+        self._directory_index = {}
+        self._module_images = {}
+
     # ------------------------------------------------------------------------
     # Private interface.
     # ------------------------------------------------------------------------
@@ -93,12 +160,10 @@ class ResourceManager(HasTraits):
         basename, extension = os.path.splitext(image_name)
         if len(extension) > 0:
             extensions = [extension]
-            pattern = image_name
 
         # Otherwise, we will search for common image suffixes.
         else:
             extensions = self.IMAGE_EXTENSIONS
-            pattern = image_name + ".*"
 
         # Try the 'images' sub-directory first (since that is commonly
         # where we put them!).  If the image is not found there then look
@@ -110,32 +175,36 @@ class ResourceManager(HasTraits):
 
         for dirname in resource_path:
 
-            # If we come across a reference to a module, use pkg_resources
-            # to try and find the image inside of an .egg, .zip, etc.
+            # If we come across a reference to a module, use importlib to
+            # try and find the image inside of the package, an .egg, .zip, etc.
             if isinstance(dirname, types.ModuleType):
-                from pkg_resources import resource_string
-
-                for path in subdirs:
-                    for extension in extensions:
-                        searchpath = "%s/%s%s" % (path, basename, extension)
-                        try:
-                            data = resource_string(
-                                dirname.__name__, searchpath
-                            )
-                            return ImageReference(
-                                self.resource_factory, data=data
-                            )
-                        except IOError:
-                            pass
+                key = (
+                    dirname.__name__,
+                    image_name,
+                    None if size is None else tuple(size),
+                )
+                if key in self._module_images:
+                    self._index_statistics["module_hits"] += 1
+                    data = self._module_images[key]
                 else:
-                    continue
+                    self._index_statistics["module_misses"] += 1
+                    data = self._find_module_image(
+                        dirname, subdirs, basename, extensions
+                    )
+                    self._module_images[key] = data
+                if data is not None:
+                    return ImageReference(self.resource_factory, data=data)
+                continue
 
             # Is there anything resembling the image name in the directory?
             for path in subdirs:
-                filenames = glob.glob(join(dirname, path, pattern))
-                for filename in filenames:
-                    not_used, extension = os.path.splitext(filename)
-                    if extension in extensions:
+                images = self._get_directory_images(join(dirname, path))
+                available = images.get(os.path.normcase(basename))
+                if available is None:
+                    continue
+                for extension in extensions:
+                    filename = available.get(os.path.normcase(extension))
+                    if filename is not None:
                         reference = ImageReference(
                             self.resource_factory, filename=filename
                         )
@@ -144,72 +213,127 @@ class ResourceManager(HasTraits):
 
             # Is there an 'images' zip file in the directory?
             zip_filename = join(dirname, "images.zip")
-            if os.path.isfile(zip_filename):
-                zip_file = ZipFile(zip_filename, "r")
-                # Try the image name itself, and then the image name with
-                # common images suffixes.
-                for extension in extensions:
-                    try:
-                        image_data = zip_file.read(basename + extension)
-                        reference = ImageReference(
-                            self.resource_factory, data=image_data
-                        )
-
-                        return reference
-
-                    except:
-                        pass
+            reference = self._locate_in_archive(
+                zip_filename, [""], basename, extensions
+            )
+            if reference is not None:
+                return reference
 
             # is this a path within a zip file?
-            # first, find the zip file in the path
-            filepath = dirname
+            # first, find the zip file in the path: the paths within it
+            # don't exist, so only walk up the path until one does
+            filepath = os.path.normpath(dirname)
             zippath = ""
-            while (
-                not is_zipfile(filepath)
-                and os.path.splitdrive(filepath)[1].startswith("\\")
-                and os.path.splitdrive(filepath)[1].startswith("/")
-            ):
-                filepath, tail = os.path.split(filepath)
+            while not os.path.exists(filepath):
+                parent, tail = os.path.split(filepath)
+                if not tail or parent == filepath:
+                    break
+                zippath = tail if zippath == "" else tail + "/" + zippath
+                filepath = parent
+
+            # if we found a zipfile, then look inside it for the image!
+            if os.path.isfile(filepath):
+                # since zip files don't recognize a leading slash, we have
+                # to be very particular about how we build the prefixes
                 if zippath != "":
-                    zippath = tail + "/" + zippath
+                    prefixes = [zippath + "/images/", zippath + "/"]
                 else:
-                    zippath = tail
+                    prefixes = ["images/", ""]
+                reference = self._locate_in_archive(
+                    filepath, prefixes, basename, extensions
+                )
+                if reference is not None:
+                    return reference
 
-            # if we found a zipfile, then look inside it for the image!
-            if is_zipfile(filepath):
-
-                zip_file = ZipFile(filepath)
-                for subpath in ["images", ""]:
-                    for extension in extensions:
-                        try:
-                            # this is a little messy. since zip files don't
-                            # recognize a leading slash, we have to be very
-                            # particular about how we build this path when
-                            # there are empty strings
-                            if zippath != "":
-                                path = zippath + "/"
-                            else:
-                                path = ""
-
-                            if subpath != "":
-                                path = path + subpath + "/"
-
-                            path = path + basename + extension
-                            # now that we have the path we can attempt to load
-                            # the image
-                            image_data = zip_file.read(path)
-                            reference = ImageReference(
-                                self.resource_factory, data=image_data
-                            )
-
-                            # if there was no exception then return the result
-                            return reference
-
-                        except:
-                            pass
+        return None
 
+    def _locate_in_archive(self, filename, prefixes, basename, extensions):
+        """ Attempts to locate an image in a zip file.
+
+        Each prefix is tried in turn with each extension.  If the image is
+        found, an image resource reference is returned, otherwise None.
+        """
+        names = self.archive_pool.names(filename)
+        if names is None:
+            return None
+        for prefix in prefixes:
+            for extension in extensions:
+                path = prefix + basename + extension
+                if path in names:
+                    image_data = self.archive_pool.read(filename, path)
+                    return ImageReference(
+                        self.resource_factory, data=image_data
+                    )
         return None
 
+    def _find_module_image(self, module, subdirs, basename, extensions):
+        """ Searches the resources of a module for an image.
+
+        Returns the data of the image if it is found, otherwise None.
+        """
+        for path in subdirs:
+            parts = [part for part in path.split("/") if part]
+            for extension in extensions:
+                data = _read_module_resource(
+                    module, parts + [basename + extension]
+                )
+                if data is not None:
+                    return data
+        return None
+
+    def _get_directory_images(self, dirname):
+        """ Get the image files in a directory from the directory index.
+
+        The directory is read when it is first searched, and again when its
+        modification time changes.  The modification time is checked at
+        most once every ``index_check_interval`` seconds.
+
+        Returns a dictionary mapping image base names to dictionaries
+        mapping extensions to filenames.  The names and extensions are
+        normalized with ``os.path.normcase``, so that they are matched
+        without regard to case on case-insensitive file systems, as the
+        file system itself would.
+        """
+        statistics = self._index_statistics
+        now = time.monotonic()
+        entry = self._directory_index.get(dirname)
+        if entry is not None:
+            if now - entry[0] < self.index_check_interval:
+                statistics["hits"] += 1
+                return entry[2]
+            statistics["checks"] += 1
+            entry[0] = now
+            if self._get_mtime(dirname) == entry[1]:
+                statistics["hits"] += 1
+                return entry[2]
+
+        statistics["misses"] += 1
+        mtime = self._get_mtime(dirname)
+        images = {}
+        if mtime is not None:
+            try:
+                for dir_entry in os.scandir(dirname):
+                    if dir_entry.name.startswith("."):
+                        continue
+                    basename, extension = os.path.splitext(
+                        os.path.normcase(dir_entry.name)
+                    )
+                    if extension and dir_entry.is_file():
+                        images.setdefault(basename, {})[extension] = join(
+                            dirname, dir_entry.name
+                        )
+            except OSError:
+                mtime = None
+        self._directory_index[dirname] = [now, mtime, images]
+        return images
+
+    def _get_mtime(self, dirname):
+        """ Get the modification time of a directory, or None. """
+        try:
+            return os.stat(dirname).st_mtime_ns
+        except OSError:
+            return None
+
     def _get_resource_path(self, object):
         """ Returns the resource path for an object. """
 
@@ -236,3 +360,55 @@ class ResourceManager(HasTraits):
                 break
 
         return resource_path
+
+    # Trait initializers -----------------------------------------------------
+
+    def _archive_pool_default(self):
+        return ArchivePool.default()
+
+
+def _read_module_resource(module, parts):
+    """ Read a resource of a module, returning None if it doesn't exist.
+
+    Resources are found relative to the package containing the module, or
+    to the module's directory if it is not in a package.  This uses the
+    module's loader, so it works for modules imported from zip files.
+
+    Parameters
+    ----------
+    module : module
+        The module that the resource belongs to.
+    parts : list of str
+        The components of the path of the resource.
+
+    Returns
+    -------
+    data : bytes or None
+        The contents of the resource, or None if it doesn't exist.
+    """
+    if hasattr(module, "__path__"):
+        package = module.__name__
+    else:
+        package = getattr(module, "__package__", None)
+
+    if resource_files is not None and package:
+        try:
+            resource = resource_files(package)
+        except (ImportError, TypeError):
+            pass
+        else:
+            for part in parts:
+                resource = resource.joinpath(part)
+            if resource.is_file():
+                return resource.read_bytes()
+            return None
+
+    # Fall back to the loader when importlib.resources is not available.
+    loader = getattr(module, "__loader__", None)
+    filename = getattr(module, "__file__", None)
+    if not hasattr(loader, "get_data") or filename is None:
+        return None
+    try:
+        return loader.get_data(join(os.path.dirname(filename), *parts))
+    except OSError:
+        return None
@@ -0,0 +1,545 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+""" A persistent cache of scaled images.
+
+Applications scale the same toolbar and tree icons every time they start.
+The scaled image cache keeps the encoded data of scaled images in a single
+file in the Traits image cache directory, so that they can be reused by
+later runs.  The whole file is read with a single read the first time the
+cache is used.  Each entry records the modification time and size of its
+source file when it was scaled, and entries whose source has changed since
+are discarded when they are looked up.
+
+The file is a header followed by records, each of which is the lengths of
+its key and data, packed as two little-endian 32-bit unsigned integers,
+then its key, a JSON list of the source filename, width, height, device
+pixel ratio, source modification time and source size, and then its data.
+New records are appended to the file, and later records for the same key
+replace earlier ones.  When the file is full, it is rewritten without the
+stale and replaced records, and if that doesn't free enough space, without
+the least recently used entries, leaving room for more records to be
+appended before it needs to be rewritten again.
+
+The file may be shared by several processes, so it is only read, appended
+to or rewritten while holding an advisory lock on a lock file beside it,
+and it is read again if another process has changed it since it was last
+read, so that the records of other processes are not lost when it is
+rewritten.  Images can be stored with ``add_later``, which encodes and
+writes them in batches on a background thread, so that the GUI thread
+doesn't wait for them.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import json
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from traits.api import Any, Bool, Dict, HasTraits, Instance, Int, Str
+from traits.trait_base import traits_home
+
+# The header at the start of the cache file.
+HEADER = b"pyface scaled image cache 1\n"
+
+# The lengths of the key and data of a record.
+RECORD_LENGTHS = struct.Struct("<II")
+
+
+class ScaledImageCache(HasTraits):
+    """ A persistent cache of the encoded data of scaled images. """
+
+    # The name of the cache file.  By default this is in the same directory
+    # as the images extracted from image library volumes.
+    path = Str()
+
+    # Whether the cache is used.
+    enabled = Bool(True)
+
+    # The maximum size of the cache file in bytes.  When the file would grow
+    # beyond this, stale and least recently used entries are removed.
+    max_bytes = Int(8 * 1024 * 1024)
+
+    # Private interface ------------------------------------------------------
+
+    # The entries, keyed by source filename, width, height and device pixel
+    # ratio, from least to most recently used.  Each value is a tuple of the
+    # source signature from _get_signature, the image data and the size of
+    # the entry's record.
+    _entries = Instance(OrderedDict, ())
+
+    # Whether the cache file has been read.
+    _loaded = Bool(False)
+
+    # The size of the cache file.
+    _file_size = Int()
+
+    # The identity, size and modification time of the cache file when this
+    # process last read or wrote it, or None if it didn't exist.
+    _file_state = Any()
+
+    # The number of nested holds of the lock on the lock file.
+    _file_lock_depth = Int()
+
+    # The images waiting to be encoded and written by add_later, as tuples
+    # of the arguments of add, with a callable in place of the data.
+    _pending = Instance(list, ())
+
+    # Whether a write of the pending images has been scheduled.
+    _write_scheduled = Bool(False)
+
+    # The thread which writes the pending images, created when needed.
+    _writer = Any()
+
+    # A lock held while pending images are written.
+    _flush_lock = Any()
+
+    # Statistics about the use of the cache.
+    _statistics = Dict(
+        value={"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+    )
+
+    # A lock protecting the cache, so it can be used from worker threads.
+    _lock = Any()
+
+    def __init__(self, **traits):
+        # the lock is needed if the path is set by the constructor
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        super().__init__(**traits)
+
+    def get(self, source, width, height, ratio=1.0):
+        """ Get the data of a scaled image.
+
+        Parameters
+        ----------
+        source : str
+            The filename of the image that was scaled.
+        width, height : int
+            The size of the scaled image in pixels.
+        ratio : float
+            The device pixel ratio of the scaled image.
+
+        Returns
+        -------
+        data : bytes or None
+            The data of the scaled image, or None if it isn't in the cache
+            or its source has changed since it was scaled.
+        """
+        if not self.enabled:
+            return None
+        key = (source, width, height, float(ratio))
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._statistics["misses"] += 1
+                return None
+            if entry[0] != _get_signature(source):
+                del self._entries[key]
+                self._statistics["stale"] += 1
+                self._statistics["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._statistics["hits"] += 1
+            return bytes(entry[1])
+
+    def add(self, source, width, height, ratio, data):
+        """ Store the data of a scaled image.
+
+        Parameters
+        ----------
+        source : str
+            The filename of the image that was scaled.
+        width, height : int
+            The size of the scaled image in pixels.
+        ratio : float
+            The device pixel ratio of the scaled image.
+        data : bytes
+            The encoded data of the scaled image.
+        """
+        if not self.enabled:
+            return
+        signature = _get_signature(source)
+        if signature is None:
+            return
+        self._add_all([(source, width, height, ratio, signature, data)])
+
+    def add_later(self, source, width, height, ratio, encode):
+        """ Store the data of a scaled image from a background thread.
+
+        The data is encoded and written to the file together with the data
+        of any other images which are waiting to be stored, so that the
+        caller doesn't wait for the encoding or the file.
+
+        Parameters
+        ----------
+        source : str
+            The filename of the image that was scaled.
+        width, height : int
+            The size of the scaled image in pixels.
+        ratio : float
+            The device pixel ratio of the scaled image.
+        encode : callable
+            A callable taking no arguments which returns the encoded data of
+            the scaled image.  It is called on a background thread.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending.append((source, width, height, ratio, encode))
+            if self._write_scheduled:
+                return
+            self._write_scheduled = True
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1)
+            self._writer.submit(self.flush)
+
+    def flush(self):
+        """ Encode and write the images waiting to be stored by add_later.
+
+        This waits for any images which are being written by the background
+        thread.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                self._pending = []
+                self._write_scheduled = False
+            # encode without holding the lock, so lookups aren't blocked
+            items = []
+            for source, width, height, ratio, encode in pending:
+                signature = _get_signature(source)
+                if signature is not None:
+                    items.append(
+                        (source, width, height, ratio, signature, encode())
+                    )
+            self._add_all(items)
+
+    def compact(self):
+        """ Rewrite the cache file without stale or replaced entries. """
+        with self._lock, self._file_lock():
+            self._load()
+            self._sync()
+            entries = OrderedDict(
+                (key, entry) for key, entry in self._entries.items()
+                if entry[0] == _get_signature(key[0])
+            )
+            self._rewrite(entries)
+
+    def clear(self):
+        """ Remove all the entries, and the cache file. """
+        with self._lock:
+            try:
+                with self._file_lock():
+                    os.remove(self.path)
+            except OSError:
+                pass
+            self._entries = OrderedDict()
+            self._file_size = 0
+            self._file_state = None
+            self._loaded = True
+
+    def statistics(self, reset=False):
+        """ Get statistics about the use of the cache.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of lookups which were ``hits``
+            and ``misses``, the number of misses which were ``stale``
+            because the source had changed, the number of entries removed
+            to make room in the file (``evictions``), and the number of
+            ``entries`` and ``file_size`` of the cache.
+        """
+        with self._lock:
+            statistics = dict(self._statistics)
+            statistics["entries"] = len(self._entries)
+            statistics["file_size"] = self._file_size
+            if reset:
+                self.reset_traits(["_statistics"])
+        return statistics
+
+    # Private methods --------------------------------------------------------
+
+    def _add_all(self, items):
+        """ Store the data of scaled images, with a single write.
+
+        Each item is a tuple of the source filename, width, height, device
+        pixel ratio and source signature, and the data of an image.
+        """
+        if not items:
+            return
+        with self._lock:
+            try:
+                with self._file_lock():
+                    self._load()
+                    self._sync()
+                    self._append(items)
+            except OSError:
+                # the cache directory is not writable: don't try again
+                self.enabled = False
+
+    def _append(self, items):
+        """ Append records to the file, making room for them if needed. """
+        records = []
+        for source, width, height, ratio, signature, data in items:
+            key = (source, width, height, float(ratio))
+            records.append(
+                (key, signature, data, _encode_record(key, signature, data))
+            )
+        size = sum(len(record[3]) for record in records)
+        if self._file_size + size > self.max_bytes:
+            self._make_room(size)
+            while records and self._file_size + size > self.max_bytes:
+                # store the newest images which fit
+                size -= len(records.pop(0)[3])
+            if not records:
+                return
+
+        # start a new file if the file is missing or unreadable
+        with open(self.path, "ab" if self._file_size else "wb") as fp:
+            if self._file_size == 0:
+                fp.write(HEADER)
+                self._file_size = len(HEADER)
+            fp.write(b"".join(record[3] for record in records))
+            fp.flush()
+            self._file_state = _get_file_state(os.fstat(fp.fileno()))
+        for key, signature, data, record in records:
+            self._file_size += len(record)
+            self._entries.pop(key, None)
+            self._entries[key] = (signature, bytes(data), len(record))
+
+    @contextmanager
+    def _file_lock(self):
+        """ Hold the advisory lock on the lock file beside the cache file.
+
+        The lock is held for the current thread by the lock of the cache,
+        which must be held by the caller, and may be nested.
+        """
+        if self._file_lock_depth > 0:
+            self._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._file_lock_depth -= 1
+            return
+
+        try:
+            self._make_directory()
+            fp = open(self.path + ".lock", "a+b")
+        except OSError:
+            # the directory is not writable, so the file can only be read
+            fp = None
+        try:
+            if fp is not None:
+                _lock_file(fp, True)
+            self._file_lock_depth = 1
+            yield
+        finally:
+            self._file_lock_depth = 0
+            if fp is not None:
+                _lock_file(fp, False)
+                fp.close()
+
+    def _sync(self):
+        """ Read the file again if another process has changed it. """
+        state = _get_file_state(self.path)
+        if state == self._file_state:
+            return
+        used = list(self._entries)
+        self._loaded = False
+        self._load()
+        # keep the order in which this process has used the entries, after
+        # the entries which it hasn't seen
+        for key in used:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def _make_directory(self):
+        """ Create the directory of the cache file if it doesn't exist. """
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _make_room(self, size):
+        """ Make room in the file for a record of the given size.
+
+        Stale and replaced records are removed first.  If that is not
+        enough, the least recently used entries are removed until the file
+        is half full, so that the file isn't rewritten for every new record.
+        """
+        entries = OrderedDict(
+            (key, entry) for key, entry in self._entries.items()
+            if entry[0] == _get_signature(key[0])
+        )
+        used = len(HEADER) + sum(entry[2] for entry in entries.values())
+        if used + size > self.max_bytes:
+            while entries and used + size > self.max_bytes // 2:
+                key, entry = entries.popitem(last=False)
+                used -= entry[2]
+                self._statistics["evictions"] += 1
+        self._rewrite(entries)
+
+    def _rewrite(self, entries):
+        """ Rewrite the cache file with the given entries.
+
+        The caller must hold the file lock, and have synchronized the
+        entries with the file.
+        """
+        temporary = self.path + ".tmp"
+        try:
+            self._make_directory()
+            with open(temporary, "wb") as fp:
+                fp.write(HEADER)
+                for key, (signature, data, record_size) in entries.items():
+                    fp.write(_encode_record(key, signature, data))
+            os.replace(temporary, self.path)
+        except OSError:
+            return
+        self._file_state = _get_file_state(self.path)
+        self._entries = entries
+        self._file_size = len(HEADER) + sum(
+            entry[2] for entry in entries.values()
+        )
+
+    def _load(self):
+        """ Read the cache file, if it hasn't been read. """
+        if self._loaded:
+            return
+        self._loaded = True
+        self._entries = OrderedDict()
+        self._file_size = 0
+        self._file_state = None
+        if not os.path.exists(self.path):
+            return
+        try:
+            with self._file_lock():
+                with open(self.path, "rb") as fp:
+                    contents = fp.read()
+                    self._file_state = _get_file_state(os.fstat(fp.fileno()))
+                self._read(contents)
+        except OSError:
+            return
+
+    def _read(self, contents):
+        """ Read the entries from the contents of the cache file. """
+        if not contents.startswith(HEADER):
+            # an unknown format: it will be replaced
+            return
+
+        # slices of the memoryview share the contents without copying
+        view = memoryview(contents)
+        offset = len(HEADER)
+        entries = OrderedDict()
+        while offset + RECORD_LENGTHS.size <= len(contents):
+            key_length, data_length = RECORD_LENGTHS.unpack_from(
+                contents, offset
+            )
+            start = offset + RECORD_LENGTHS.size
+            end = start + key_length + data_length
+            if end > len(contents):
+                # a truncated record, from an interrupted write
+                break
+            try:
+                fields = json.loads(
+                    bytes(view[start:start + key_length]).decode("utf-8")
+                )
+                source, width, height, ratio, mtime, size = fields
+            except ValueError:
+                break
+            key = (source, width, height, float(ratio))
+            data = view[start + key_length:end]
+            entries.pop(key, None)
+            entries[key] = ((mtime, size), data, end - offset)
+            offset = end
+
+        self._entries = entries
+        self._file_size = offset
+        if offset < len(contents):
+            # drop the damaged tail, so that new records can be read
+            self.compact()
+
+    # Trait initializers -----------------------------------------------------
+
+    def _path_default(self):
+        return os.path.join(
+            traits_home(), "image_cache", "scaled_images.cache"
+        )
+
+    # Trait change handlers --------------------------------------------------
+
+    def _path_changed(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._file_size = 0
+            self._file_state = None
+            self._loaded = False
+
+
+def _encode_record(key, signature, data):
+    """ Encode an entry as a record of the cache file. """
+    source, width, height, ratio = key
+    key_data = json.dumps(
+        [source, width, height, ratio, signature[0], signature[1]]
+    ).encode("utf-8")
+    return (
+        RECORD_LENGTHS.pack(len(key_data), len(data)) + key_data + bytes(data)
+    )
+
+
+def _get_file_state(file):
+    """ Get the identity, size and modification time of a file, or None.
+
+    The file is given by its filename or the result of ``os.stat``.
+    """
+    if isinstance(file, str):
+        try:
+            file = os.stat(file)
+        except OSError:
+            return None
+    return (file.st_dev, file.st_ino, file.st_size, file.st_mtime_ns)
+
+
+def _lock_file(fp, lock):
+    """ Take or release an advisory lock on an open file. """
+    if fcntl is not None:
+        fcntl.flock(fp.fileno(), fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        fp.seek(0)
+        msvcrt.locking(
+            fp.fileno(), msvcrt.LK_LOCK if lock else msvcrt.LK_UNLCK, 1
+        )
+
+
+def _get_signature(filename):
+    """ Get the modification time and size of a file, or None. """
+    try:
+        info = os.stat(filename)
+    except OSError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
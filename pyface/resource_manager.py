@@ -12,6 +12,7 @@
 
 
 from pyface.resource.api import ResourceManager
+from pyface.resource.decoded_image_cache import DecodedImageCache
 
 # Import the toolkit specific version.
 from .toolkit import toolkit_object
@@ -23,3 +24,6 @@ PyfaceResourceFactory = toolkit_object(
 
 #: A shared instance.
 resource_manager = ResourceManager(resource_factory=PyfaceResourceFactory())
+
+#: A shared cache of the images created by image resources.
+decoded_image_cache = DecodedImageCache()
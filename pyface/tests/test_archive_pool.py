@@ -0,0 +1,114 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from ..resource.archive_pool import ArchivePool
+
+
+class TestArchivePool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.pool = ArchivePool(check_interval=0.0)
+        self.addCleanup(self.pool.close_all)
+
+    def make_zip(self, name, members):
+        filename = os.path.join(self.tmpdir, name)
+        with zipfile.ZipFile(filename, "w") as archive:
+            for member in members:
+                archive.writestr(member, member.encode("ascii"))
+        return filename
+
+    def test_names(self):
+        filename = self.make_zip("a.zip", ["one.png", "two.png"])
+
+        names = self.pool.names(filename)
+
+        self.assertEqual(names, {"one.png", "two.png"})
+
+    def test_names_not_zip(self):
+        filename = os.path.join(self.tmpdir, "a.txt")
+        with open(filename, "w") as f:
+            f.write("not a zip file")
+
+        self.assertIsNone(self.pool.names(filename))
+        self.assertIsNone(self.pool.names(self.tmpdir))
+        self.assertIsNone(self.pool.names(os.path.join(self.tmpdir, "x")))
+
+    def test_read(self):
+        filename = self.make_zip("a.zip", ["one.png"])
+
+        self.assertEqual(self.pool.read(filename, "one.png"), b"one.png")
+        with self.assertRaises(KeyError):
+            self.pool.read(filename, "two.png")
+
+    def test_opened_once(self):
+        filename = self.make_zip("a.zip", ["one.png", "two.png"])
+
+        self.pool.names(filename)
+        self.pool.read(filename, "one.png")
+        self.pool.read(filename, "two.png")
+
+        statistics = self.pool.statistics()
+        self.assertEqual(statistics["opened"], 1)
+        self.assertEqual(statistics["reads"], 2)
+        self.assertEqual(statistics["open"], 1)
+
+    def test_modified(self):
+        filename = self.make_zip("a.zip", ["one.png"])
+        self.pool.names(filename)
+
+        os.remove(filename)
+        self.make_zip("a.zip", ["one.png", "two.png", "three.png"])
+
+        self.assertEqual(
+            self.pool.names(filename), {"one.png", "two.png", "three.png"}
+        )
+        self.assertEqual(self.pool.read(filename, "two.png"), b"two.png")
+
+    def test_max_open(self):
+        self.pool.max_open = 2
+        filenames = [
+            self.make_zip("%d.zip" % i, ["one.png"]) for i in range(3)
+        ]
+
+        for filename in filenames:
+            self.pool.names(filename)
+
+        statistics = self.pool.statistics()
+        self.assertEqual(statistics["open"], 2)
+        self.assertEqual(statistics["closed"], 1)
+        # closed archives can still be read from
+        self.assertEqual(self.pool.read(filenames[0], "one.png"), b"one.png")
+
+    def test_idle_timeout(self):
+        self.pool.idle_timeout = 0.0
+        first = self.make_zip("a.zip", ["one.png"])
+        second = self.make_zip("b.zip", ["one.png"])
+
+        self.pool.names(first)
+        self.pool.names(second)
+
+        self.assertEqual(self.pool.statistics()["open"], 0)
+
+    def test_statistics_reset(self):
+        filename = self.make_zip("a.zip", ["one.png"])
+        self.pool.read(filename, "one.png")
+
+        statistics = self.pool.statistics(reset=True)
+
+        self.assertEqual(statistics["reads"], 1)
+        self.assertEqual(self.pool.statistics()["reads"], 0)
+        self.assertEqual(self.pool.statistics()["open"], 1)
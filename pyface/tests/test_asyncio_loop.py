@@ -0,0 +1,254 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import asyncio
+import socket
+import threading
+from unittest import TestCase, skipIf
+
+from pyface.asyncio_loop import (
+    EventLoopPump,
+    GUIEventLoop,
+    GUIEventLoopPolicy,
+    invoke_after_async,
+    invoke_later_async,
+    TimerTicks,
+)
+from pyface.gui import GUI
+from pyface.toolkit import toolkit_object
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+IOWatcher = toolkit_object("io_watcher:IOWatcher")
+no_io_watcher = IOWatcher.__name__ == "Unimplemented"
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestEventLoopPump(GuiTestAssistant, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.loop = GUIEventLoop()
+        self.pump = EventLoopPump(loop=self.loop)
+        self.pump.start()
+
+    def tearDown(self):
+        self.pump.stop()
+        self.loop.close()
+        GuiTestAssistant.tearDown(self)
+
+    def run_in_gui(self, coroutine):
+        task = self.loop.create_task(coroutine)
+        self.assertEventuallyTrueInGui(task.done)
+        return task.result()
+
+    def test_coroutine(self):
+        thread = []
+
+        async def record_thread():
+            await asyncio.sleep(0.01)
+            thread.append(threading.current_thread())
+            return 42
+
+        result = self.run_in_gui(record_thread())
+
+        self.assertEqual(result, 42)
+        self.assertIs(thread[0], threading.main_thread())
+        self.assertGreater(self.pump.iterations, 0)
+
+    def test_socket_io(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+
+        async def echo():
+            reader, writer = await asyncio.open_connection(sock=client)
+            server.sendall(b"hello\n")
+            line = await reader.readline()
+            writer.close()
+            return line
+
+        result = self.run_in_gui(echo())
+
+        self.assertEqual(result, b"hello\n")
+
+    @skipIf(no_io_watcher, "The toolkit can't watch file descriptors")
+    def test_idle(self):
+        self.run_in_gui(asyncio.sleep(0.01))
+        self.event_loop_helper.event_loop(5)
+        iterations = self.pump.iterations
+
+        # wait without any work for the asyncio loop
+        waited = []
+        GUI.invoke_after(100, waited.append, True)
+        self.assertEventuallyTrueInGui(lambda: waited)
+
+        self.assertEqual(self.pump.iterations, iterations)
+        self.assertFalse(self.pump._timer.active)
+
+    @skipIf(no_io_watcher, "The toolkit can't watch file descriptors")
+    def test_socket_readiness(self):
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+        received = []
+        self.loop.add_reader(client, lambda: received.append(client.recv(5)))
+        self.event_loop_helper.event_loop(5)
+        iterations = self.pump.iterations
+
+        # the loop is run when the socket is ready, without polling
+        GUI.invoke_after(50, server.sendall, b"hello")
+        self.assertEventuallyTrueInGui(lambda: received)
+
+        self.assertEqual(received, [b"hello"])
+        self.assertLessEqual(self.pump.iterations - iterations, 3)
+        self.loop.remove_reader(client)
+        self.assertNotIn(client.fileno(), self.pump._watchers)
+
+    def test_invoke_later_async(self):
+        async def call():
+            return await invoke_later_async(lambda x: x * 2, 21)
+
+        result = self.run_in_gui(call())
+
+        self.assertEqual(result, 42)
+
+    def test_invoke_later_async_exception(self):
+        def fail():
+            raise ZeroDivisionError()
+
+        async def call():
+            try:
+                await invoke_later_async(fail)
+            except ZeroDivisionError:
+                return "raised"
+
+        result = self.run_in_gui(call())
+
+        self.assertEqual(result, "raised")
+
+    def test_invoke_after_async(self):
+        async def call():
+            start = self.loop.time()
+            await invoke_after_async(50, lambda: None)
+            return self.loop.time() - start
+
+        result = self.run_in_gui(call())
+
+        self.assertGreaterEqual(result, 0.045)
+
+    def test_invoke_later_async_from_worker_loop(self):
+        results = []
+
+        def worker():
+            async def call():
+                return await invoke_later_async(threading.current_thread)
+
+            loop = asyncio.new_event_loop()
+            try:
+                results.append(loop.run_until_complete(call()))
+            finally:
+                loop.close()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertEventuallyTrueInGui(lambda: results)
+        thread.join()
+
+        self.assertIs(results[0], threading.main_thread())
+
+    def test_timer_ticks(self):
+        async def count_ticks():
+            ticks = []
+            async for tick in TimerTicks(0.01, repeat=3):
+                ticks.append(tick)
+            return ticks
+
+        ticks = self.run_in_gui(count_ticks())
+
+        self.assertEqual(len(ticks), 3)
+        self.assertEqual(ticks, sorted(ticks))
+
+    def test_timer_ticks_context_manager(self):
+        ticks = TimerTicks(0.01)
+
+        async def first_tick():
+            async with ticks:
+                async for tick in ticks:
+                    return tick
+
+        tick = self.run_in_gui(first_tick())
+
+        self.assertIsInstance(tick, float)
+        self.assertFalse(ticks.timer.active)
+
+    def test_timer_ticks_aclose(self):
+        ticks = TimerTicks(0.01)
+
+        async def two_iterations():
+            values = []
+            async for tick in ticks:
+                values.append(tick)
+                await ticks.aclose()
+            return values
+
+        values = self.run_in_gui(two_iterations())
+
+        self.assertEqual(len(values), 1)
+        self.assertFalse(ticks.timer.active)
+
+    def test_stop(self):
+        self.pump.stop()
+        task = self.loop.create_task(asyncio.sleep(0))
+
+        self.event_loop_helper.event_loop(5)
+
+        self.assertFalse(task.done())
+        self.pump.start()
+        self.assertEventuallyTrueInGui(task.done)
+
+    def test_closed_loop(self):
+        self.loop.close()
+
+        self.assertEventuallyTrueInGui(lambda: not self.pump.active)
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestGUIEventLoopPolicy(GuiTestAssistant, TestCase):
+
+    def test_new_event_loop(self):
+        policy = GUIEventLoopPolicy(poll_interval=0.005)
+        loop = policy.new_event_loop()
+        try:
+            pump = policy.get_pump(loop)
+            self.assertIsInstance(loop, GUIEventLoop)
+            self.assertTrue(pump.active)
+            self.assertEqual(pump.poll_interval, 0.005)
+
+            task = loop.create_task(asyncio.sleep(0.01, result="done"))
+            self.assertEventuallyTrueInGui(task.done)
+            self.assertEqual(task.result(), "done")
+        finally:
+            loop.close()
+        self.assertEventuallyTrueInGui(lambda: not pump.active)
+
+    def test_new_event_loop_in_thread(self):
+        policy = GUIEventLoopPolicy()
+        loops = []
+        thread = threading.Thread(
+            target=lambda: loops.append(policy.new_event_loop())
+        )
+        thread.start()
+        thread.join()
+        try:
+            self.assertIsNone(policy.get_pump(loops[0]))
+        finally:
+            loops[0].close()
@@ -0,0 +1,242 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import threading
+from unittest import TestCase, skipIf
+
+from traits.api import Any, HasTraits
+
+from pyface.background_executor import BackgroundExecutor
+from pyface.toolkit import toolkit_object
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+def square(x):
+    return x * x
+
+
+def fail():
+    raise ZeroDivisionError()
+
+
+class Owner(HasTraits):
+    """ A stand-in for a widget. """
+
+    control = Any()
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestBackgroundExecutor(GuiTestAssistant, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.executor = BackgroundExecutor(max_workers=1)
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.executor.shutdown()
+        GuiTestAssistant.tearDown(self)
+
+    def blocked(self, value=None):
+        self.started.set()
+        self.gate.wait(10.0)
+        return value
+
+    def test_result_on_gui_thread(self):
+        threads = []
+        results = []
+
+        def done(future):
+            threads.append(threading.current_thread())
+            results.append(future.result())
+
+        future = self.executor.submit(square, 3)
+        future.add_done_callback(done)
+
+        self.assertEventuallyTrueInGui(lambda: results)
+        self.assertEqual(results, [9])
+        self.assertIs(threads[0], threading.main_thread())
+
+    def test_exception(self):
+        future = self.executor.submit(fail)
+
+        self.assertEventuallyTrueInGui(future.done)
+        self.assertIsInstance(future.exception(), ZeroDivisionError)
+
+    def test_progress(self):
+        values = []
+        threads = []
+
+        def work(count, progress):
+            for i in range(count):
+                progress(i)
+            return count
+
+        def record(value):
+            threads.append(threading.current_thread())
+            values.append(value)
+
+        future = self.executor.submit_with_progress(work, 1000)
+        future.add_progress_callback(record)
+
+        self.assertEventuallyTrueInGui(future.done)
+        self.assertEqual(future.result(), 1000)
+        self.event_loop_helper.event_loop(5)
+        # intermediate values may be coalesced, and values arriving after
+        # the work is done are dropped
+        self.assertLessEqual(len(values), 1000)
+        self.assertEqual(values, sorted(values))
+        self.assertTrue(all(
+            thread is threading.main_thread() for thread in threads
+        ))
+
+    def test_progress_cancel_all(self):
+        results = []
+        done = []
+
+        def work(progress):
+            self.started.set()
+            self.gate.wait(10.0)
+            results.append(progress(1))
+
+        future = self.executor.submit_with_progress(work)
+        future.add_done_callback(done.append)
+        self.started.wait(10.0)
+
+        self.executor.cancel_all()
+        self.gate.set()
+
+        self.assertEventuallyTrueInGui(lambda: results)
+        self.assertEqual(results, [False])
+        self.assertEventuallyTrueInGui(future.done)
+        self.event_loop_helper.event_loop(5)
+        # the running work can't be cancelled, but its callbacks are dropped
+        self.assertFalse(future.cancelled())
+        self.assertEqual(done, [])
+
+    def test_running(self):
+        future = self.executor.submit(self.blocked, 42)
+        self.started.wait(10.0)
+
+        self.assertTrue(future.running())
+        self.gate.set()
+        self.assertEventuallyTrueInGui(future.done)
+        self.assertFalse(future.running())
+        self.assertEqual(future.result(), 42)
+
+    def test_not_running_while_queued(self):
+        self.executor.submit(self.blocked)
+        self.started.wait(10.0)
+
+        future = self.executor.submit(square, 2)
+
+        self.assertFalse(future.running())
+        self.gate.set()
+        self.assertEqual(future.result(timeout=10.0), 4)
+
+    def test_cancel_queued(self):
+        self.executor.submit(self.blocked)
+        self.started.wait(10.0)
+        ran = []
+        future = self.executor.submit(ran.append, 1)
+
+        self.assertTrue(future.cancel())
+        self.gate.set()
+        self.assertEventuallyTrueInGui(
+            lambda: self.executor.active_count == 0
+        )
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(ran, [])
+
+    def test_cancel_running(self):
+        future = self.executor.submit(self.blocked, 42)
+        self.started.wait(10.0)
+
+        # as with other futures, running work can't be cancelled
+        self.assertFalse(future.cancel())
+        self.gate.set()
+        self.assertEventuallyTrueInGui(
+            lambda: self.executor.active_count == 0
+        )
+
+        self.assertFalse(future.cancelled())
+        self.assertEqual(future.result(), 42)
+
+    def test_status_traits(self):
+        self.executor.submit(self.blocked)
+        self.executor.submit(self.blocked)
+        self.executor.submit(self.blocked)
+
+        self.assertEventuallyTrueInGui(
+            lambda: self.executor.queue_length == 2
+        )
+        self.assertEqual(self.executor.active_count, 1)
+        self.assertEqual(self.executor.utilisation, 1.0)
+
+        self.gate.set()
+        self.assertEventuallyTrueInGui(
+            lambda: self.executor.active_count == 0
+        )
+        self.assertEqual(self.executor.queue_length, 0)
+        self.assertEqual(self.executor.utilisation, 0.0)
+
+    def test_owner_destroyed(self):
+        self.executor.submit(self.blocked)
+        self.started.wait(10.0)
+        owner = Owner(control=object())
+        future = self.executor.submit_for(owner, square, 2)
+
+        owner.control = None
+
+        self.assertTrue(future.cancelled())
+        self.gate.set()
+        self.assertEventuallyTrueInGui(lambda: not self.executor._owned)
+
+    def test_owner_destroyed_while_running(self):
+        done = []
+        owner = Owner(control=object())
+        future = self.executor.submit_for(owner, self.blocked, 42)
+        future.add_done_callback(done.append)
+        self.started.wait(10.0)
+
+        owner.control = None
+
+        self.assertFalse(future.cancelled())
+        self.gate.set()
+        self.assertEventuallyTrueInGui(future.done)
+        self.event_loop_helper.event_loop(5)
+        # the owner has gone, so the done callbacks are dropped
+        self.assertEqual(done, [])
+        self.assertEqual(self.executor._owned, {})
+
+    def test_owner_released(self):
+        owner = Owner(control=object())
+        future = self.executor.submit_for(owner, square, 2)
+
+        self.assertEventuallyTrueInGui(lambda: not self.executor._owned)
+        owner.control = None
+
+        self.assertEqual(future.result(), 4)
+
+    def test_process_pool(self):
+        executor = BackgroundExecutor(kind="process", max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        future = executor.submit(square, 5)
+
+        self.assertEventuallyTrueInGui(future.done, timeout=30.0)
+        self.assertEqual(future.result(), 25)
+        with self.assertRaises(ValueError):
+            executor.submit_with_progress(square, 5)
@@ -0,0 +1,84 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import unittest
+
+from ..resource.decoded_image_cache import DecodedImageCache
+
+
+class TestDecodedImageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = DecodedImageCache(max_bytes=100)
+
+    def test_get(self):
+        image = object()
+        self.cache.add("a", image, 10)
+
+        self.assertIs(self.cache.get("a"), image)
+        self.assertIsNone(self.cache.get("b"))
+        statistics = self.cache.statistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["images"], 1)
+        self.assertEqual(statistics["bytes"], 10)
+
+    def test_eviction(self):
+        for key in "abc":
+            self.cache.add(key, key, 40)
+        # "a" was least recently used when "c" was added
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), "b")
+
+        self.cache.add("d", "d", 40)
+
+        # "b" was used more recently than "c"
+        self.assertIsNone(self.cache.get("c"))
+        self.assertEqual(self.cache.get("b"), "b")
+        statistics = self.cache.statistics()
+        self.assertEqual(statistics["evictions"], 2)
+        self.assertEqual(statistics["bytes"], 80)
+
+    def test_too_large(self):
+        self.cache.add("a", "a", 101)
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.statistics()["bytes"], 0)
+
+    def test_replace(self):
+        self.cache.add("a", "a", 40)
+        self.cache.add("a", "A", 60)
+
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertEqual(self.cache.statistics()["bytes"], 60)
+
+    def test_reduce_max_bytes(self):
+        for key in "abc":
+            self.cache.add(key, key, 30)
+
+        self.cache.max_bytes = 50
+
+        self.assertEqual(self.cache.statistics()["images"], 1)
+        self.assertEqual(self.cache.get("c"), "c")
+
+    def test_clear(self):
+        self.cache.add("a", "a", 30)
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.statistics()["bytes"], 0)
+
+    def test_statistics_reset(self):
+        self.cache.add("a", "a", 30)
+        self.cache.get("a")
+
+        self.assertEqual(self.cache.statistics(reset=True)["hits"], 1)
+        self.assertEqual(self.cache.statistics()["hits"], 0)
+        self.assertEqual(self.cache.statistics()["images"], 1)
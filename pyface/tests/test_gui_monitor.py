@@ -0,0 +1,213 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import functools
+import time
+from unittest import TestCase, skipIf
+
+from pyface.gui import GUI
+from pyface.gui_monitor import (
+    callable_name,
+    CallProfiler,
+    get_profiler,
+    profiled_call,
+    StallWatchdog,
+)
+from pyface.timer.api import CallbackTimer
+from pyface.toolkit import toolkit_object
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+def add(x, y):
+    return x + y
+
+
+def block_gui():
+    time.sleep(0.3)
+
+
+class Slow(object):
+
+    def method(self):
+        pass
+
+
+class TestCallableName(TestCase):
+
+    def test_function(self):
+        self.assertEqual(callable_name(add), __name__ + ".add")
+
+    def test_method(self):
+        self.assertEqual(
+            callable_name(Slow().method), __name__ + ".Slow.method"
+        )
+
+    def test_partial(self):
+        self.assertEqual(
+            callable_name(functools.partial(add, 1)), __name__ + ".add"
+        )
+
+    def test_callable_object(self):
+        self.assertEqual(callable_name(Slow()), __name__ + ".Slow")
+
+
+class TestCallProfiler(TestCase):
+
+    def setUp(self):
+        self.profiler = CallProfiler()
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_start_stop(self):
+        self.assertIsNone(get_profiler())
+        self.profiler.start()
+        self.assertIs(get_profiler(), self.profiler)
+        self.profiler.stop()
+        self.assertIsNone(get_profiler())
+
+    def test_profiled_call(self):
+        self.profiler.start()
+
+        result = profiled_call(add, 1, y=2)
+
+        self.assertEqual(result, 3)
+        statistics = self.profiler.statistics()
+        self.assertEqual(statistics[__name__ + ".add"]["count"], 1)
+
+    def test_profiled_call_inactive(self):
+        result = profiled_call(add, 1, 2)
+
+        self.assertEqual(result, 3)
+        self.assertEqual(self.profiler.statistics(), {})
+
+    def test_record(self):
+        self.profiler.record("f", 0.000003)
+        self.profiler.record("f", 0.000003)
+        self.profiler.record("f", 0.001)
+
+        statistics = self.profiler.statistics(reset=True)
+
+        self.assertEqual(statistics["f"]["count"], 3)
+        self.assertAlmostEqual(statistics["f"]["total"], 0.001006)
+        self.assertAlmostEqual(statistics["f"]["max"], 0.001)
+        self.assertEqual(
+            statistics["f"]["histogram"], [(4e-6, 2), (1.024e-3, 1)]
+        )
+        self.assertEqual(self.profiler.statistics(), {})
+
+    def test_slow_call_logged(self):
+        self.profiler.slow_threshold = 0.01
+
+        with self.assertLogs("pyface.gui_monitor") as logs:
+            self.profiler.call(time.sleep, (0.02,))
+
+        self.assertIn("time.sleep", logs.output[0])
+
+    def test_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.profiler.call(lambda: 1 / 0)
+
+        self.assertIsNone(self.profiler.current)
+        self.assertEqual(len(self.profiler.statistics()), 1)
+
+    def test_log_statistics(self):
+        self.profiler.record("fast", 0.001)
+        self.profiler.record("slow", 0.002)
+
+        with self.assertLogs("pyface.gui_monitor", level="INFO") as logs:
+            self.profiler.log_statistics(limit=1)
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("slow", logs.output[0])
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestCallProfilerGUI(GuiTestAssistant, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.profiler = CallProfiler()
+        self.profiler.start()
+
+    def tearDown(self):
+        self.profiler.stop()
+        GuiTestAssistant.tearDown(self)
+
+    def test_invoke_later(self):
+        results = []
+        GUI.invoke_later(results.append, 1)
+        GUI.invoke_after(10, results.append, 2)
+
+        self.assertEventuallyTrueInGui(lambda: len(results) == 2)
+
+        name = callable_name(results.append)
+        self.assertEqual(self.profiler.statistics()[name]["count"], 2)
+
+    def test_timer(self):
+        timer = CallbackTimer.timer(
+            callback=add, args=(1, 2), interval=0.01, repeat=2
+        )
+        self.addCleanup(timer.stop)
+
+        self.assertEventuallyTrueInGui(lambda: not timer.active)
+
+        statistics = self.profiler.statistics()
+        self.assertEqual(statistics[__name__ + ".add"]["count"], 2)
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestStallWatchdog(GuiTestAssistant, TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.watchdog = StallWatchdog(threshold=0.05)
+
+    def tearDown(self):
+        self.watchdog.stop()
+        GuiTestAssistant.tearDown(self)
+
+    def test_no_stall(self):
+        self.watchdog.threshold = 1.0
+        self.watchdog.start()
+        end = time.perf_counter() + 0.6
+        self.event_loop_helper.event_loop_until_condition(
+            lambda: time.perf_counter() > end
+        )
+
+        self.assertEqual(self.watchdog.stalls(), [])
+        self.assertGreater(self.watchdog.statistics()["max_latency"], 0.0)
+
+    def test_stall(self):
+        profiler = CallProfiler(slow_threshold=10.0)
+        profiler.start()
+        self.addCleanup(profiler.stop)
+        self.watchdog.start()
+        # let the watchdog see the event loop respond once
+        self.event_loop_helper.event_loop(5)
+
+        with self.assertLogs("pyface.gui_monitor") as logs:
+            GUI.invoke_later(block_gui)
+            self.assertEventuallyTrueInGui(
+                lambda: self.watchdog.stalls()
+                and self.watchdog.stalls()[0]["duration"] is not None
+            )
+
+        stall = self.watchdog.stalls()[0]
+        self.assertIn("block_gui", stall["stack"])
+        self.assertEqual(stall["callable"], __name__ + ".block_gui")
+        self.assertGreater(stall["duration"], 0.05)
+        self.assertEqual(len(logs.output), 2)
+        statistics = self.watchdog.statistics(reset=True)
+        self.assertEqual(statistics["stalls"], 1)
+        self.assertGreater(statistics["max_latency"], 0.05)
+        self.assertEqual(self.watchdog.stalls(), [])
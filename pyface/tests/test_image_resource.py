@@ -12,11 +12,16 @@
 import os
 import platform
 import pkg_resources
+import shutil
+import tempfile
 import unittest
 
 import pyface
 import pyface.tests
 from ..image_resource import ImageResource
+from ..resource.resource_factory import ResourceFactory
+from ..resource.resource_reference import ImageReference
+from ..resource_manager import decoded_image_cache
 from ..toolkit import toolkit_object
 
 
@@ -111,3 +116,77 @@ class TestImageResource(unittest.TestCase):
             os.path.join(SEARCH_PATH, "splash.png"),
         )
         self.assertEqual(size, (601, 203))
+
+    def test_create_image_cached(self):
+        decoded_image_cache.clear()
+        decoded_image_cache.statistics(reset=True)
+
+        ImageResource("core").create_image()
+        ImageResource("core").create_image()
+
+        statistics = decoded_image_cache.statistics()
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["images"], 1)
+
+    def test_create_image_sized_default_cached(self):
+        decoded_image_cache.clear()
+        decoded_image_cache.statistics(reset=True)
+        image_resource = ImageResource("core")
+
+        # there are no sized images, so each size uses the default image
+        image_resource.create_image()
+        image_resource.create_image(size=(16, 16))
+        image_resource.create_image(size=(32, 32))
+
+        statistics = decoded_image_cache.statistics()
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hits"], 2)
+        self.assertEqual(statistics["images"], 1)
+
+    def test_data_cache_key(self):
+        with open(IMAGE_PATH, "rb") as fp:
+            data = fp.read()
+        factory = ResourceFactory()
+        image_resource = ImageResource("core")
+
+        key = image_resource._get_cache_key(ImageReference(factory, data=data))
+        other = image_resource._get_cache_key(
+            ImageReference(factory, data=bytes(data))
+        )
+
+        # references to the same data share a key which doesn't hold the data
+        self.assertEqual(key, other)
+        self.assertNotIn(data, key)
+
+    @unittest.skipIf(not is_qt, "Qt pixmaps are shared by copying")
+    def test_create_image_copies(self):
+        image_resource = ImageResource("core")
+
+        image = image_resource.create_image()
+        other = image_resource.create_image()
+
+        # painting on one image must not change the other
+        self.assertIsNot(image, other)
+        self.assertEqual(
+            image_resource.image_size(image),
+            image_resource.image_size(other),
+        )
+
+    def test_create_image_sized(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        os.makedirs(os.path.join(tmpdir, "images", "16x16"))
+        default = os.path.join(tmpdir, "images", "core.png")
+        sized = os.path.join(tmpdir, "images", "16x16", "core.png")
+        shutil.copy(IMAGE_PATH, default)
+        shutil.copy(IMAGE_PATH, sized)
+        image_resource = ImageResource("core", [tmpdir])
+
+        image = image_resource.create_image(size=(16, 16))
+
+        self.assertIsNotNone(image)
+        self.assertEqual(image_resource._get_ref((16, 16)).filename, sized)
+        # the default image is not affected by the sized image
+        self.assertEqual(image_resource.absolute_path, default)
+        self.assertEqual(image_resource._get_ref((32, 32)).filename, default)
@@ -11,8 +11,14 @@
 
 from collections.abc import Sequence
 import os
+import shutil
+import sys
+import tempfile
 import unittest
+from unittest import mock
+import zipfile
 
+from ..resource.archive_pool import ArchivePool
 from ..resource_manager import PyfaceResourceFactory
 from ..resource_manager import ResourceManager
 
@@ -47,3 +53,255 @@ class TestPyfaceResourceFactory(unittest.TestCase):
         resource_manager = ResourceManager()
         img_ref = resource_manager.locate_image("core.png", sequence)
         self.assertEqual(IMAGE_PATH, img_ref.filename)
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        os.makedirs(os.path.join(self.tmpdir, "images", "16x16"))
+        self.resource_manager = ResourceManager(index_check_interval=0.0)
+
+    def make_file(self, *path):
+        filename = os.path.join(self.tmpdir, *path)
+        with open(filename, "wb"):
+            pass
+        return filename
+
+    def test_locate_extension_order(self):
+        self.make_file("images", "icon.gif")
+        png = self.make_file("images", "icon.png")
+
+        reference = self.resource_manager.locate_image("icon", [self.tmpdir])
+
+        self.assertEqual(reference.filename, png)
+
+    def test_locate_exact_extension(self):
+        self.make_file("images", "icon.png")
+        gif = self.make_file("images", "icon.gif")
+
+        reference = self.resource_manager.locate_image(
+            "icon.gif", [self.tmpdir]
+        )
+
+        self.assertEqual(reference.filename, gif)
+
+    def test_locate_size(self):
+        self.make_file("images", "icon.png")
+        sized = self.make_file("images", "16x16", "icon.png")
+
+        reference = self.resource_manager.locate_image(
+            "icon", [self.tmpdir], size=(16, 16)
+        )
+
+        self.assertEqual(reference.filename, sized)
+
+    def test_locate_missing(self):
+        self.make_file("images", "other.png")
+
+        reference = self.resource_manager.locate_image("icon", [self.tmpdir])
+
+        self.assertIsNone(reference)
+
+    def test_locate_case_insensitive(self):
+        png = self.make_file("images", "Icon.PNG")
+
+        # as on a case-insensitive file system
+        with mock.patch("os.path.normcase", side_effect=str.lower):
+            reference = self.resource_manager.locate_image(
+                "icon.png", [self.tmpdir]
+            )
+
+        self.assertEqual(reference.filename, png)
+
+    def test_index_hits(self):
+        png = self.make_file("images", "icon.png")
+        self.resource_manager.index_check_interval = 60.0
+
+        for i in range(3):
+            reference = self.resource_manager.locate_image(
+                "icon", [self.tmpdir]
+            )
+            self.assertEqual(reference.filename, png)
+
+        statistics = self.resource_manager.index_statistics(reset=True)
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hits"], 2)
+        self.assertEqual(statistics["checks"], 0)
+        self.assertEqual(statistics["directories"], 1)
+        statistics = self.resource_manager.index_statistics()
+        self.assertEqual(statistics["misses"], 0)
+        self.assertEqual(statistics["hits"], 0)
+
+    def test_index_modified(self):
+        self.make_file("images", "other.png")
+        self.assertIsNone(
+            self.resource_manager.locate_image("icon", [self.tmpdir])
+        )
+        png = self.make_file("images", "icon.png")
+        # make sure the modification time changes
+        directory = os.path.join(self.tmpdir, "images")
+        stat = os.stat(directory)
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        reference = self.resource_manager.locate_image("icon", [self.tmpdir])
+
+        self.assertEqual(reference.filename, png)
+        statistics = self.resource_manager.index_statistics()
+        self.assertEqual(statistics["checks"], 1)
+
+    def test_invalidate_index(self):
+        self.resource_manager.index_check_interval = 60.0
+        self.resource_manager.locate_image("icon", [self.tmpdir])
+        png = self.make_file("images", "icon.png")
+
+        self.resource_manager.invalidate_index()
+        reference = self.resource_manager.locate_image("icon", [self.tmpdir])
+
+        self.assertEqual(reference.filename, png)
+
+
+class TestZipArchives(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.pool = ArchivePool()
+        self.addCleanup(self.pool.close_all)
+        self.resource_manager = ResourceManager(archive_pool=self.pool)
+
+    def make_zip(self, filename, members):
+        filename = os.path.join(self.tmpdir, filename)
+        with zipfile.ZipFile(filename, "w") as archive:
+            for name in members:
+                archive.writestr(name, name.encode("ascii"))
+        return filename
+
+    def test_locate_in_images_zip(self):
+        self.make_zip("images.zip", ["icon.gif", "icon.png"])
+
+        reference = self.resource_manager.locate_image("icon", [self.tmpdir])
+
+        self.assertEqual(reference.data, b"icon.png")
+
+    def test_locate_in_enclosing_zip(self):
+        filename = self.make_zip(
+            "package.egg", ["package/images/icon.png", "package/other.png"]
+        )
+        dirname = os.path.join(filename, "package")
+
+        reference = self.resource_manager.locate_image("icon", [dirname])
+        other = self.resource_manager.locate_image("other", [dirname])
+
+        self.assertEqual(reference.data, b"package/images/icon.png")
+        self.assertEqual(other.data, b"package/other.png")
+        # the archive is only opened once
+        self.assertEqual(self.pool.statistics()["opened"], 1)
+
+    def test_locate_missing_in_zip(self):
+        filename = self.make_zip("package.egg", ["package/icon.png"])
+        dirname = os.path.join(filename, "package")
+
+        reference = self.resource_manager.locate_image("other", [dirname])
+
+        self.assertIsNone(reference)
+        self.assertEqual(self.pool.statistics()["reads"], 0)
+
+    def test_locate_in_directory(self):
+        dirname = os.path.join(self.tmpdir, "package")
+        os.makedirs(dirname)
+
+        reference = self.resource_manager.locate_image("icon", [dirname])
+
+        self.assertIsNone(reference)
+        # the directory and its parents are not looked at as zip files
+        self.assertEqual(
+            set(self.pool._archives), {os.path.join(dirname, "images.zip")}
+        )
+
+    def test_locate_in_missing_directory(self):
+        dirname = os.path.join(self.tmpdir, "missing", "package")
+
+        reference = self.resource_manager.locate_image("icon", [dirname])
+
+        self.assertIsNone(reference)
+        # the parents of the first existing directory are not looked at
+        self.assertEqual(
+            set(self.pool._archives), {os.path.join(dirname, "images.zip")}
+        )
+
+
+class TestModuleResources(unittest.TestCase):
+    def setUp(self):
+        self.resource_manager = ResourceManager()
+
+    def test_locate_in_module(self):
+        from pyface import tests
+
+        reference = self.resource_manager.locate_image("core", [tests])
+
+        with open(IMAGE_PATH, "rb") as fp:
+            self.assertEqual(reference.data, fp.read())
+
+    def test_locate_in_module_with_loader(self):
+        from pyface import tests
+
+        target = "pyface.resource.resource_manager.resource_files"
+        with mock.patch(target, None):
+            reference = self.resource_manager.locate_image("core", [tests])
+            missing = self.resource_manager.locate_image("missing", [tests])
+
+        with open(IMAGE_PATH, "rb") as fp:
+            self.assertEqual(reference.data, fp.read())
+        self.assertIsNone(missing)
+
+    def test_module_cache(self):
+        from pyface import tests
+
+        for i in range(3):
+            self.resource_manager.locate_image("core", [tests])
+            self.assertIsNone(
+                self.resource_manager.locate_image("missing", [tests])
+            )
+
+        statistics = self.resource_manager.index_statistics()
+        self.assertEqual(statistics["module_misses"], 2)
+        self.assertEqual(statistics["module_hits"], 4)
+
+        self.resource_manager.invalidate_index()
+        self.resource_manager.locate_image("core", [tests])
+        statistics = self.resource_manager.index_statistics()
+        self.assertEqual(statistics["module_misses"], 3)
+
+    def test_module_cache_size(self):
+        from pyface import tests
+
+        self.resource_manager.locate_image("core", [tests])
+        self.resource_manager.locate_image("core", [tests], size=(16, 16))
+
+        statistics = self.resource_manager.index_statistics()
+        self.assertEqual(statistics["module_misses"], 2)
+
+    def test_locate_in_zipimported_module(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        filename = os.path.join(tmpdir, "zipped.zip")
+        with zipfile.ZipFile(filename, "w") as archive:
+            archive.writestr("zipped_images_package/__init__.py", "")
+            archive.writestr(
+                "zipped_images_package/images/icon.png", b"image data"
+            )
+        sys.path.insert(0, filename)
+        self.addCleanup(sys.path.remove, filename)
+        self.addCleanup(sys.modules.pop, "zipped_images_package", None)
+
+        import zipped_images_package
+
+        reference = self.resource_manager.locate_image(
+            "icon", [zipped_images_package]
+        )
+        self.assertEqual(reference.data, b"image data")
+        self.assertIsNone(
+            self.resource_manager.locate_image(
+                "other", [zipped_images_package]
+            )
+        )
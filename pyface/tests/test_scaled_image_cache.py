@@ -0,0 +1,271 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from ..resource.scaled_image_cache import HEADER, ScaledImageCache
+
+
+class TestScaledImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, "cache", "scaled.cache")
+        self.source = os.path.join(self.tmpdir, "icon.png")
+        with open(self.source, "wb") as fp:
+            fp.write(b"source image")
+        self.cache = ScaledImageCache(path=self.path)
+
+    def touch_source(self):
+        stat = os.stat(self.source)
+        os.utime(
+            self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+        )
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(self.source, 16, 16))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_add_and_get(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        self.cache.add(self.source, 32, 32, 1.0, b"32")
+
+        self.assertEqual(self.cache.get(self.source, 16, 16), b"16")
+        self.assertEqual(self.cache.get(self.source, 32, 32), b"32")
+        self.assertIsNone(self.cache.get(self.source, 16, 16, 2.0))
+
+    def test_persistent(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        self.cache.add(self.source, 16, 16, 2.0, b"32")
+
+        cache = ScaledImageCache(path=self.path)
+
+        self.assertEqual(cache.get(self.source, 16, 16), b"16")
+        self.assertEqual(cache.get(self.source, 16, 16, 2.0), b"32")
+        self.assertEqual(cache.statistics()["entries"], 2)
+
+    def test_later_records_replace_earlier(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"old")
+        self.cache.add(self.source, 16, 16, 1.0, b"new")
+
+        cache = ScaledImageCache(path=self.path)
+
+        self.assertEqual(cache.get(self.source, 16, 16), b"new")
+
+    def test_stale(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        self.touch_source()
+
+        cache = ScaledImageCache(path=self.path)
+
+        self.assertIsNone(cache.get(self.source, 16, 16))
+        statistics = cache.statistics()
+        self.assertEqual(statistics["stale"], 1)
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["entries"], 0)
+
+    def test_missing_source(self):
+        self.cache.add(os.path.join(self.tmpdir, "x.png"), 16, 16, 1.0, b"x")
+
+        self.assertEqual(self.cache.statistics()["entries"], 0)
+
+    def test_truncated(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        self.cache.add(self.source, 32, 32, 1.0, b"32")
+        with open(self.path, "rb+") as fp:
+            fp.truncate(os.path.getsize(self.path) - 1)
+
+        cache = ScaledImageCache(path=self.path)
+
+        self.assertEqual(cache.get(self.source, 16, 16), b"16")
+        self.assertIsNone(cache.get(self.source, 32, 32))
+        # the damaged record has been removed, so new records can be read
+        cache.add(self.source, 32, 32, 1.0, b"32")
+        cache = ScaledImageCache(path=self.path)
+        self.assertEqual(cache.get(self.source, 32, 32), b"32")
+
+    def test_unknown_format(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as fp:
+            fp.write(b"something else")
+
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+
+        with open(self.path, "rb") as fp:
+            self.assertTrue(fp.read().startswith(HEADER))
+        cache = ScaledImageCache(path=self.path)
+        self.assertEqual(cache.get(self.source, 16, 16), b"16")
+
+    def test_compact(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"old")
+        self.cache.add(self.source, 16, 16, 1.0, b"new")
+        size = os.path.getsize(self.path)
+
+        self.cache.compact()
+
+        self.assertLess(os.path.getsize(self.path), size)
+        self.assertEqual(
+            self.cache.statistics()["file_size"], os.path.getsize(self.path)
+        )
+        cache = ScaledImageCache(path=self.path)
+        self.assertEqual(cache.get(self.source, 16, 16), b"new")
+
+    def test_max_bytes(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"x" * 100)
+        record_size = self.cache.statistics()["file_size"] - len(HEADER)
+        # room for one record, but not two
+        max_bytes = len(HEADER) + record_size + record_size // 2
+        self.cache.max_bytes = max_bytes
+        self.touch_source()
+
+        # the stale entry is removed to make room
+        self.cache.add(self.source, 32, 32, 1.0, b"y" * 100)
+        self.assertEqual(self.cache.get(self.source, 32, 32), b"y" * 100)
+        self.assertEqual(self.cache.statistics()["entries"], 1)
+
+        # the least recently used entry is removed to make room
+        self.cache.add(self.source, 48, 48, 1.0, b"z" * 100)
+        self.assertEqual(self.cache.get(self.source, 48, 48), b"z" * 100)
+        self.assertIsNone(self.cache.get(self.source, 32, 32))
+        self.assertEqual(self.cache.statistics()["evictions"], 1)
+        self.assertLessEqual(os.path.getsize(self.path), max_bytes)
+
+    def test_max_bytes_repeated_adds(self):
+        self.cache.add(self.source, 100, 100, 1.0, b"x" * 100)
+        record_size = self.cache.statistics()["file_size"] - len(HEADER)
+        # room for ten records
+        max_bytes = len(HEADER) + 10 * record_size
+        self.cache.max_bytes = max_bytes
+
+        with mock.patch(
+            "pyface.resource.scaled_image_cache.os.replace",
+            side_effect=os.replace,
+        ) as replace:
+            for size in range(101, 200):
+                self.cache.add(self.source, size, size, 1.0, b"x" * 100)
+                self.assertLessEqual(os.path.getsize(self.path), max_bytes)
+                # the newest entry is always stored
+                self.assertEqual(
+                    self.cache.get(self.source, size, size), b"x" * 100
+                )
+
+        # the file is rewritten when it is full, not for every add
+        self.assertLess(replace.call_count, 20)
+        self.assertGreater(self.cache.statistics()["evictions"], 0)
+
+    def test_max_bytes_keeps_recently_used(self):
+        self.cache.add(self.source, 100, 100, 1.0, b"x" * 100)
+        record_size = self.cache.statistics()["file_size"] - len(HEADER)
+        self.cache.max_bytes = len(HEADER) + 6 * record_size
+        for size in range(101, 106):
+            self.cache.add(self.source, size, size, 1.0, b"x" * 100)
+
+        # use the oldest entry, then fill the file
+        self.cache.get(self.source, 100, 100)
+        self.cache.add(self.source, 106, 106, 1.0, b"x" * 100)
+
+        self.assertIsNotNone(self.cache.get(self.source, 100, 100))
+        self.assertIsNotNone(self.cache.get(self.source, 106, 106))
+        self.assertIsNone(self.cache.get(self.source, 101, 101))
+
+    def test_add_later(self):
+        encoded = threading.Event()
+        threads = []
+
+        def encode():
+            threads.append(threading.current_thread())
+            encoded.set()
+            return b"16"
+
+        self.cache.add_later(self.source, 16, 16, 1.0, encode)
+        self.assertTrue(encoded.wait(5.0))
+        self.cache.flush()
+
+        # the data was encoded on the background thread
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertEqual(self.cache.get(self.source, 16, 16), b"16")
+        cache = ScaledImageCache(path=self.path)
+        self.assertEqual(cache.get(self.source, 16, 16), b"16")
+
+    def test_add_later_batched(self):
+        # hold the lock, so the images queue up behind the first
+        with self.cache._flush_lock:
+            for size in (16, 32, 48):
+                self.cache.add_later(
+                    self.source, size, size, 1.0, str(size).encode
+                )
+
+            self.assertEqual(len(self.cache._pending), 3)
+        self.cache.flush()
+
+        cache = ScaledImageCache(path=self.path)
+        for size in (16, 32, 48):
+            self.assertEqual(
+                cache.get(self.source, size, size), str(size).encode()
+            )
+
+    def test_records_of_other_processes_kept(self):
+        other = ScaledImageCache(path=self.path)
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        other.add(self.source, 32, 32, 1.0, b"32")
+        self.cache.add(self.source, 48, 48, 1.0, b"48")
+
+        # the rewrite keeps the record added by the other cache
+        self.cache.compact()
+
+        cache = ScaledImageCache(path=self.path)
+        for size in (16, 32, 48):
+            self.assertEqual(
+                cache.get(self.source, size, size), str(size).encode()
+            )
+        self.assertEqual(
+            self.cache.statistics()["file_size"], os.path.getsize(self.path)
+        )
+
+    def test_rewrite_by_other_process(self):
+        other = ScaledImageCache(path=self.path)
+        self.cache.add(self.source, 16, 16, 1.0, b"old")
+        other.add(self.source, 16, 16, 1.0, b"new")
+        other.compact()
+
+        self.cache.add(self.source, 32, 32, 1.0, b"32")
+
+        cache = ScaledImageCache(path=self.path)
+        self.assertEqual(cache.get(self.source, 16, 16), b"new")
+        self.assertEqual(cache.get(self.source, 32, 32), b"32")
+
+    def test_disabled(self):
+        self.cache.enabled = False
+
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+
+        self.assertIsNone(self.cache.get(self.source, 16, 16))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_clear(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get(self.source, 16, 16))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_statistics_reset(self):
+        self.cache.add(self.source, 16, 16, 1.0, b"16")
+        self.cache.get(self.source, 16, 16)
+
+        self.assertEqual(self.cache.statistics(reset=True)["hits"], 1)
+        self.assertEqual(self.cache.statistics()["hits"], 0)
@@ -10,5 +10,11 @@
 
 
 from .do_later import do_later, do_after, DoLaterTimer
+from .fixed_rate_timer import FixedRateCallbackTimer, FixedRateEventTimer
 from .i_timer import ICallbackTimer, IEventTimer, ITimer
 from .timer import CallbackTimer, EventTimer, Timer
+from .timer_scheduler import (
+    ScheduledCallbackTimer,
+    ScheduledEventTimer,
+    TimerScheduler,
+)
@@ -0,0 +1,201 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+"""
+Timers which run at a fixed rate, without drift.
+
+The standard timers re-arm a toolkit timer with their interval after each
+callback, so lateness accumulates: a 60 Hz timer whose wake-ups are each a
+millisecond late runs at about 57 Hz, and callbacks which take longer than
+the interval are silently delayed.  The timers in this module instead
+target absolute deadlines, ``interval`` seconds apart from when the timer
+started, and set a single-shot toolkit timer for the time remaining until
+the next deadline, so lateness does not accumulate.
+
+When callbacks overrun, so that later deadlines pass before the timer can
+handle them, the ``overrun_policy`` decides what happens:
+
+- ``"coalesce"``: the callback is made once for all of the deadlines which
+  have passed, and the timer waits for the next deadline;
+- ``"skip"``: deadlines which have been overtaken by later deadlines are
+  dropped without a callback, the callback is made for the latest deadline
+  which has passed, and the timer waits for the next deadline;
+- ``"catch_up"``: the callback is made for every deadline, back to back,
+  until the timer has caught up.
+
+Each timer keeps statistics of its lateness (jitter), missed deadlines and
+callback times, which are available from its ``statistics`` method.
+"""
+import math
+
+from traits.api import Any, Enum, Float, Instance, Int
+
+from pyface.timer.i_timer import BaseTimer, MCallbackTimer, MEventTimer, \
+    perf_counter
+from pyface.timer.timer import CallbackTimer
+
+
+class FixedRateTimer(BaseTimer):
+    """ Base class for timers which run at a fixed rate. """
+
+    #: What to do when callbacks overrun.
+    overrun_policy = Enum("coalesce", "skip", "catch_up")
+
+    # Private traits ---------------------------------------------------------
+
+    #: The single-shot toolkit timer which wakes the timer.
+    _driver = Instance(BaseTimer)
+
+    #: The time the timer started, from which deadlines are measured.
+    _origin = Float()
+
+    #: The interval when the timer started.
+    _period = Float()
+
+    #: The number of the next deadline.
+    _index = Int()
+
+    #: The number of the latest deadline which has been counted as missed.
+    _missed_index = Int()
+
+    #: The statistics of the timer.
+    _statistics = Any()
+
+    def __init__(self, **traits):
+        super().__init__(**traits)
+        self._statistics = self._empty_statistics()
+
+    def statistics(self, reset=False):
+        """ Get statistics about the timing of the timer.
+
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
+
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of callbacks ``performed``, the
+            number of deadlines ``missed`` because they had passed before an
+            earlier deadline was handled, the number of ``overruns`` where a
+            callback took longer than the interval, the ``mean_jitter`` and
+            ``max_jitter`` in seconds by which callbacks were late, and the
+            ``mean_callback_time`` and ``max_callback_time`` in seconds.
+        """
+        statistics = dict(self._statistics)
+        performed = statistics.pop("performed")
+        total_jitter = statistics.pop("total_jitter")
+        total_callback_time = statistics.pop("total_callback_time")
+        statistics["performed"] = performed
+        statistics["mean_jitter"] = total_jitter / max(performed, 1)
+        statistics["mean_callback_time"] = (
+            total_callback_time / max(performed, 1)
+        )
+        if reset:
+            self._statistics = self._empty_statistics()
+        return statistics
+
+    # BaseTimer Protected methods --------------------------------------------
+
+    def _start(self):
+        self._origin = perf_counter()
+        self._period = self.interval
+        self._index = 1
+        self._missed_index = 0
+        self._arm()
+
+    def _stop(self):
+        if self._driver is not None:
+            self._driver.stop()
+
+    # Private methods --------------------------------------------------------
+
+    def _arm(self):
+        """ Set the toolkit timer for the next deadline. """
+        if self._driver is None:
+            self._driver = CallbackTimer(callback=self._wake)
+        deadline = self._origin + self._index * self._period
+        # round up to whole milliseconds, so the toolkit timer isn't early
+        delay = max(deadline - perf_counter(), 0.0)
+        self._driver.interval = math.ceil(delay * 1000) / 1000
+        self._driver.start()
+
+    def _wake(self):
+        """ Handle the next deadline when the toolkit timer fires. """
+        self._driver.stop()
+        if not self._active:
+            return
+
+        now = perf_counter()
+        index = self._index
+        period = self._period
+        if period > 0:
+            # the number of the latest deadline which has passed
+            due = max(int((now - self._origin) // period), index)
+        else:
+            due = index
+
+        statistics = self._statistics
+        missed = due - max(index, self._missed_index)
+        if missed > 0:
+            statistics["missed"] += missed
+            self._missed_index = due
+
+        if self.overrun_policy == "skip":
+            # drop the overtaken deadlines, and handle the latest one
+            index = self._index = due
+
+        if self.overrun_policy == "catch_up":
+            deadline = self._origin + index * period
+        else:
+            deadline = self._origin + due * period
+        jitter = now - deadline
+        statistics["total_jitter"] += jitter
+        if jitter > statistics["max_jitter"]:
+            statistics["max_jitter"] = jitter
+        try:
+            self.perform()
+        finally:
+            callback_time = perf_counter() - now
+            statistics["performed"] += 1
+            statistics["total_callback_time"] += callback_time
+            if callback_time > statistics["max_callback_time"]:
+                statistics["max_callback_time"] = callback_time
+            if callback_time > period:
+                statistics["overruns"] += 1
+
+            if self.overrun_policy == "catch_up":
+                self._index = index + 1
+            else:
+                self._index = due + 1
+            if self._active:
+                self._arm()
+
+    @staticmethod
+    def _empty_statistics():
+        return {
+            "performed": 0,
+            "missed": 0,
+            "overruns": 0,
+            "total_jitter": 0.0,
+            "max_jitter": 0.0,
+            "total_callback_time": 0.0,
+            "max_callback_time": 0.0,
+        }
+
+
+class FixedRateEventTimer(MEventTimer, FixedRateTimer):
+    """ An event timer which fires at a fixed rate. """
+    pass
+
+
+class FixedRateCallbackTimer(MCallbackTimer, FixedRateTimer):
+    """ A callback timer which calls back at a fixed rate. """
+    pass
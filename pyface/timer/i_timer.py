@@ -35,6 +35,8 @@ from traits.api import (
     provides,
 )
 
+from pyface.gui_monitor import get_profiler
+
 perf_counter = time.perf_counter
 
 
@@ -197,8 +199,14 @@ class BaseTimer(ABCHasTraits):
         if self.repeat is not None:
             self.repeat -= 1
 
+        profiler = get_profiler()
         try:
-            self._perform()
+            if profiler is None:
+                self._perform()
+            else:
+                # record the call against the callback, if there is one
+                target = getattr(self, "callback", None) or self
+                profiler.call(self._perform, target=target)
         except StopIteration:
             self.stop()
         except:
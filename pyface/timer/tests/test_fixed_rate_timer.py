@@ -0,0 +1,217 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+from unittest import TestCase, mock, skipIf
+
+from pyface.toolkit import toolkit_object
+from ..fixed_rate_timer import FixedRateCallbackTimer, FixedRateEventTimer
+from .test_timer import ConditionHandler
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+class FakeClock(object):
+    """ A clock whose time only changes when it is advanced. """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestFixedRateTimer(TestCase, GuiTestAssistant):
+    """ Test the fixed rate timers. """
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+
+    def tearDown(self):
+        GuiTestAssistant.tearDown(self)
+
+    def test_event_timer(self):
+        timer = FixedRateEventTimer(interval=0.01)
+        handler = ConditionHandler()
+        timer.on_trait_change(handler.callback, "timeout")
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                handler.called_n(3)
+            )
+            self.assertTrue(timer.active)
+        finally:
+            timer.stop()
+        self.assertFalse(timer.active)
+
+    def test_repeat(self):
+        handler = ConditionHandler()
+        timer = FixedRateCallbackTimer(
+            callback=handler.callback, interval=0.01, repeat=4
+        )
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+
+        self.assertEqual(handler.count, 4)
+        self.assertEqual(timer.statistics()["performed"], 4)
+
+    def test_no_drift(self):
+        handler = ConditionHandler()
+        timer = FixedRateCallbackTimer(
+            callback=handler.callback, interval=0.01, repeat=20
+        )
+
+        timer.start()
+        start = timer._origin
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+
+        # every callback is at or after its deadline, and lateness does not
+        # accumulate from one callback to the next
+        for n, time in enumerate(handler.times, 1):
+            self.assertGreaterEqual(time, start + n * 0.01 - 0.001)
+        self.assertLess(handler.times[-1] - start, 0.2 + 0.1)
+
+    def test_stop_in_callback(self):
+        timer = FixedRateCallbackTimer(interval=0.01)
+        handler = ConditionHandler()
+
+        def callback():
+            handler.callback()
+            raise StopIteration()
+
+        timer.callback = callback
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+
+        self.event_loop_helper.event_loop(5)
+        self.assertEqual(handler.count, 1)
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestOverrunPolicy(TestCase, GuiTestAssistant):
+    """ Test overrun handling with a fake clock. """
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.clock = FakeClock()
+        patcher = mock.patch(
+            "pyface.timer.fixed_rate_timer.perf_counter", self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.deadlines = []
+
+    def tearDown(self):
+        GuiTestAssistant.tearDown(self)
+
+    def make_timer(self, policy):
+        timer = FixedRateCallbackTimer(
+            callback=self.callback, interval=0.25, overrun_policy=policy
+        )
+        timer.start()
+        self.addCleanup(timer.stop)
+        return timer
+
+    def callback(self):
+        self.deadlines.append(self.clock.now)
+        if len(self.deadlines) == 1:
+            # the first callback takes three and a half intervals
+            self.clock.now += 0.875
+
+    def run_timer(self, timer, times):
+        for _ in range(times):
+            timer._wake()
+
+    def test_coalesce(self):
+        timer = self.make_timer("coalesce")
+        self.clock.now += 0.25
+        self.run_timer(timer, 2)
+
+        self.assertEqual(self.deadlines, [100.25, 101.125])
+        self.assertEqual(timer._index, 5)
+        statistics = timer.statistics()
+        self.assertEqual(statistics["missed"], 2)
+        self.assertEqual(statistics["overruns"], 1)
+        self.assertEqual(statistics["max_callback_time"], 0.875)
+        # lateness is measured from the most recent deadline, at 101.0
+        self.assertEqual(statistics["max_jitter"], 0.125)
+
+    def test_skip(self):
+        timer = self.make_timer("skip")
+        self.clock.now += 0.25
+        self.run_timer(timer, 2)
+
+        # the overtaken deadlines are dropped, the latest is performed,
+        # and the next is for 101.25
+        self.assertEqual(self.deadlines, [100.25, 101.125])
+        self.assertEqual(timer._index, 5)
+        self.clock.now = 101.25
+        self.run_timer(timer, 1)
+
+        self.assertEqual(self.deadlines, [100.25, 101.125, 101.25])
+        statistics = timer.statistics()
+        self.assertEqual(statistics["missed"], 2)
+        self.assertEqual(statistics["performed"], 3)
+
+    def test_skip_single_late_wake(self):
+        timer = self.make_timer("skip")
+        self.clock.now += 0.625
+        self.run_timer(timer, 1)
+
+        # the deadline at 100.25 is dropped, and the one at 100.5 performed
+        self.assertEqual(self.deadlines, [100.625])
+        self.assertEqual(timer._index, 3)
+        statistics = timer.statistics()
+        self.assertEqual(statistics["missed"], 1)
+        self.assertEqual(statistics["performed"], 1)
+        self.assertEqual(statistics["max_jitter"], 0.125)
+
+    def test_catch_up(self):
+        timer = self.make_timer("catch_up")
+        self.clock.now += 0.25
+        self.run_timer(timer, 4)
+
+        # every deadline is performed
+        self.assertEqual(self.deadlines, [100.25] + [101.125] * 3)
+        self.assertEqual(timer._index, 5)
+        statistics = timer.statistics()
+        # lateness is measured from each deadline, the first at 100.5
+        self.assertEqual(statistics["max_jitter"], 0.625)
+        self.assertEqual(statistics["missed"], 2)
+        self.assertEqual(statistics["performed"], 4)
+
+    def test_statistics_reset(self):
+        timer = self.make_timer("coalesce")
+        self.clock.now += 0.25
+        self.run_timer(timer, 1)
+
+        statistics = timer.statistics(reset=True)
+
+        self.assertEqual(statistics["performed"], 1)
+        self.assertEqual(timer.statistics()["performed"], 0)
+        self.assertEqual(timer.statistics()["mean_jitter"], 0.0)
@@ -0,0 +1,219 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+from unittest import TestCase, skipIf
+
+from pyface.toolkit import toolkit_object
+from ..timer_scheduler import (
+    ScheduledCallbackTimer, ScheduledEventTimer, TimerScheduler
+)
+from .test_timer import ConditionHandler
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+no_gui_test_assistant = GuiTestAssistant.__name__ == "Unimplemented"
+
+
+@skipIf(no_gui_test_assistant, "No GuiTestAssistant")
+class TestTimerScheduler(TestCase, GuiTestAssistant):
+    """ Test the TimerScheduler and scheduled timers. """
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.scheduler = TimerScheduler()
+
+    def tearDown(self):
+        GuiTestAssistant.tearDown(self)
+
+    def test_default_scheduler(self):
+        timer = ScheduledCallbackTimer(callback=lambda: None)
+
+        self.assertIs(timer.scheduler, TimerScheduler.default())
+
+    def test_event_timer(self):
+        timer = ScheduledEventTimer(scheduler=self.scheduler)
+        handler = ConditionHandler()
+        timer.on_trait_change(handler.callback, "timeout")
+
+        timer.start()
+        try:
+            self.assertTrue(timer.active)
+            self.assertEqual(self.scheduler.timer_count, 1)
+            self.event_loop_helper.event_loop_until_condition(
+                handler.is_called
+            )
+            self.assertTrue(timer.active)
+        finally:
+            timer.stop()
+        self.assertFalse(timer.active)
+        self.assertEqual(self.scheduler.timer_count, 0)
+
+    def test_repeat(self):
+        handler = ConditionHandler()
+        timer = ScheduledCallbackTimer(
+            callback=handler.callback, repeat=4, scheduler=self.scheduler
+        )
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+        self.assertEqual(handler.count, 4)
+        self.assertEqual(self.scheduler.timer_count, 0)
+
+    def test_interval_not_early(self):
+        handler = ConditionHandler()
+        timer = ScheduledCallbackTimer(
+            callback=handler.callback,
+            repeat=4,
+            interval=0.1,
+            scheduler=self.scheduler,
+        )
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+        self.assertEqual(handler.count, 4)
+
+        start_times = [timer._start_time] + handler.times[:-1]
+        for start, actual in zip(start_times, handler.times):
+            self.assertGreaterEqual(actual - start, 0.1)
+
+    def test_expire(self):
+        handler = ConditionHandler()
+        timer = ScheduledCallbackTimer(
+            callback=handler.callback,
+            interval=0.1,
+            expire=0.5,
+            scheduler=self.scheduler,
+        )
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+        self.assertTrue(
+            all(
+                t < timer._start_time + timer.expire + 0.01
+                for t in handler.times
+            )
+        )
+
+    def test_stop_iteration(self):
+        def do_stop_iteration():
+            raise StopIteration()
+
+        timer = ScheduledCallbackTimer(
+            callback=do_stop_iteration, scheduler=self.scheduler
+        )
+
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not timer.active
+            )
+        finally:
+            timer.stop()
+        self.assertEqual(self.scheduler.timer_count, 0)
+
+    def test_shared_wakeups(self):
+        handlers = [ConditionHandler() for i in range(20)]
+        timers = [
+            ScheduledCallbackTimer(
+                callback=handler.callback,
+                # similar, but not identical, intervals
+                interval=0.05 + 0.001 * (i % 5),
+                repeat=5,
+                scheduler=self.scheduler,
+            )
+            for i, handler in enumerate(handlers)
+        ]
+        for timer in timers:
+            timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not any(timer.active for timer in timers)
+            )
+        finally:
+            for timer in timers:
+                timer.stop()
+
+        self.assertTrue(all(handler.count == 5 for handler in handlers))
+        self.assertEqual(self.scheduler.performed, 100)
+        self.assertLessEqual(self.scheduler.wakeups, 25)
+
+    def test_stop_other_timer(self):
+        handler = ConditionHandler()
+        other = ScheduledCallbackTimer(
+            callback=handler.callback, interval=0.2, scheduler=self.scheduler
+        )
+        timer = ScheduledCallbackTimer(
+            callback=other.stop,
+            interval=0.01,
+            repeat=1,
+            scheduler=self.scheduler,
+        )
+
+        other.start()
+        timer.start()
+        try:
+            self.event_loop_helper.event_loop_until_condition(
+                lambda: not other.active
+            )
+        finally:
+            other.stop()
+            timer.stop()
+        self.assertEqual(handler.count, 0)
+        self.assertEqual(self.scheduler.timer_count, 0)
+
+    def test_exception_stops_only_failing_timer(self):
+        handler = ConditionHandler()
+
+        def fail():
+            raise ZeroDivisionError()
+
+        failing = ScheduledCallbackTimer(
+            callback=fail, interval=0.0, scheduler=self.scheduler
+        )
+        also_failing = ScheduledCallbackTimer(
+            callback=fail, interval=0.0, scheduler=self.scheduler
+        )
+        timer = ScheduledCallbackTimer(
+            callback=handler.callback, interval=0.0, scheduler=self.scheduler
+        )
+        failing.start()
+        also_failing.start()
+        timer.start()
+        try:
+            with self.assertLogs("pyface.timer.timer_scheduler") as logs:
+                self.scheduler._run_due()
+
+            # every exception is logged
+            self.assertEqual(len(logs.records), 2)
+            for record in logs.records:
+                self.assertIs(record.exc_info[0], ZeroDivisionError)
+            self.assertFalse(failing.active)
+            self.assertFalse(also_failing.active)
+            self.assertTrue(timer.active)
+            self.assertEqual(handler.count, 1)
+            self.assertEqual(self.scheduler.timer_count, 1)
+        finally:
+            failing.stop()
+            also_failing.stop()
+            timer.stop()
@@ -0,0 +1,232 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+"""
+A scheduler which drives many timers from a single toolkit timer.
+
+Each :py:class:`~pyface.timer.timer.CallbackTimer` or
+:py:class:`~pyface.timer.timer.EventTimer` owns a toolkit timer, which is
+fine for a handful of timers.  Applications with hundreds of periodic
+timers, such as dashboards which refresh many views, instead waste CPU
+time (and battery) on many unaligned wake-ups.  The scheduled timers in
+this module have the same API and semantics as the standard timers, but
+are all driven by a shared :py:class:`TimerScheduler`, which keeps the
+pending timers in a heap and uses a single toolkit timer to wake up when
+the earliest is due.  The deadlines of timers are rounded up to a grid
+whose spacing depends on their interval, so timers with similar intervals
+become aligned and share their wake-ups.
+"""
+import heapq
+import itertools
+import logging
+import math
+
+from traits.api import Any, HasStrictTraits, Instance, Int, Range
+
+from pyface.timer.i_timer import BaseTimer, MCallbackTimer, MEventTimer, \
+    perf_counter
+from pyface.timer.timer import CallbackTimer
+
+logger = logging.getLogger(__name__)
+
+
+class TimerScheduler(HasStrictTraits):
+    """ Drive many timers from a single toolkit timer.
+
+    Timers register themselves with the scheduler when they start and
+    unregister themselves when they stop.  When a timer is run, the
+    scheduler calls its ``perform`` method, so the usual handling of
+    ``repeat``, ``expire`` and ``StopIteration`` applies, and then
+    schedules it to run again one interval later if it is still active.
+    Exceptions raised by timers are logged, and stop only the timer which
+    raised them.
+    """
+
+    #: The fraction of a timer's interval by which it may be run late, so
+    #: that it can share a wake-up with other timers.  Timers are never run
+    #: early.
+    tolerance = Range(low=0.0, high=1.0, value=0.1)
+
+    #: The number of timers currently scheduled.
+    timer_count = Int()
+
+    #: The number of times that the toolkit timer has woken the scheduler.
+    wakeups = Int()
+
+    #: The number of timer callbacks performed.
+    performed = Int()
+
+    # Private traits ---------------------------------------------------------
+
+    #: The heap of scheduled entries, each a list of [deadline, sequence
+    #: number, timer], where the timer is None if the entry was cancelled.
+    _heap = Instance(list, ())
+
+    #: The scheduled entry of each timer.
+    _entries = Instance(dict, ())
+
+    #: A counter which orders timers with equal deadlines.
+    _counter = Instance(itertools.count, ())
+
+    #: The deadline that the toolkit timer is set for, or None.
+    _wakeup = Any()
+
+    #: The toolkit timer, created when it is first needed.
+    _timer = Instance(BaseTimer)
+
+    #: The shared scheduler.
+    _default = None
+
+    @classmethod
+    def default(cls):
+        """ Get the shared scheduler used by scheduled timers by default.
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def add(self, timer, delay=None):
+        """ Schedule a timer.
+
+        Parameters
+        ----------
+        timer : BaseTimer
+            The timer to schedule.  Its ``perform`` method is called when it
+            is due.
+        delay : float or None
+            The delay in seconds until the timer is due, or None to use the
+            timer's interval.
+        """
+        self.remove(timer)
+        if delay is None:
+            delay = timer.interval
+        self._push(timer, perf_counter() + delay)
+        self.timer_count = len(self._entries)
+        self._rearm()
+
+    def remove(self, timer):
+        """ Unschedule a timer, if it is scheduled.
+
+        Parameters
+        ----------
+        timer : BaseTimer
+            The timer to unschedule.
+        """
+        entry = self._entries.pop(timer, None)
+        if entry is not None:
+            # the entry is removed lazily from the heap
+            entry[2] = None
+            self.timer_count = len(self._entries)
+            if not self._entries:
+                self._heap = []
+                self._rearm()
+
+    # Private methods --------------------------------------------------------
+
+    def _run_due(self):
+        """ Run the timers which are due, or nearly due. """
+        self.wakeups += 1
+        self._timer.stop()
+        self._wakeup = None
+        now = perf_counter()
+        heap = self._heap
+        due = []
+        while heap:
+            deadline, _, timer = heap[0]
+            if timer is None:
+                heapq.heappop(heap)
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(heap)
+            del self._entries[timer]
+            due.append(timer)
+        self.timer_count = len(self._entries)
+
+        try:
+            for timer in due:
+                try:
+                    timer.perform()
+                except Exception:
+                    # there is nowhere to raise the exception to, as the
+                    # other timers which are due must still be run
+                    logger.exception("Error in scheduled timer %r", timer)
+                self.performed += 1
+                if timer.active and timer not in self._entries:
+                    self._push(timer, perf_counter() + timer.interval)
+        finally:
+            self.timer_count = len(self._entries)
+            self._rearm()
+
+    def _push(self, timer, deadline):
+        """ Add a timer to the heap with an aligned deadline. """
+        slack = timer.interval * self.tolerance
+        if slack >= 0.001:
+            # round up to a power-of-two fraction of a second, so that
+            # timers with similar intervals share the same grid
+            grid = 2.0 ** math.floor(math.log2(slack))
+            deadline = math.ceil(deadline / grid) * grid
+        entry = [deadline, next(self._counter), timer]
+        heapq.heappush(self._heap, entry)
+        self._entries[timer] = entry
+
+    def _rearm(self):
+        """ Set the toolkit timer for the earliest deadline. """
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+
+        if not heap:
+            if self._wakeup is not None:
+                self._timer.stop()
+                self._wakeup = None
+            return
+
+        deadline = heap[0][0]
+        if self._wakeup is not None and self._wakeup <= deadline:
+            return
+        if self._timer is None:
+            self._timer = CallbackTimer(callback=self._run_due)
+        self._timer.stop()
+        # round up to whole milliseconds, so the toolkit timer isn't early
+        delay = max(deadline - perf_counter(), 0.0)
+        self._timer.interval = math.ceil(delay * 1000) / 1000
+        self._timer.start()
+        self._wakeup = deadline
+
+
+class ScheduledTimer(BaseTimer):
+    """ Base class for timers which are driven by a TimerScheduler. """
+
+    #: The scheduler which drives the timer.  If not set, the shared
+    #: scheduler is used.
+    scheduler = Instance(TimerScheduler)
+
+    # BaseTimer Protected methods --------------------------------------------
+
+    def _start(self):
+        self.scheduler.add(self)
+
+    def _stop(self):
+        self.scheduler.remove(self)
+
+    # Trait defaults ---------------------------------------------------------
+
+    def _scheduler_default(self):
+        return TimerScheduler.default()
+
+
+class ScheduledEventTimer(MEventTimer, ScheduledTimer):
+    """ An event timer which is driven by a TimerScheduler. """
+    pass
+
+
+class ScheduledCallbackTimer(MCallbackTimer, ScheduledTimer):
+    """ A callback timer which is driven by a TimerScheduler. """
+    pass
@@ -12,7 +12,7 @@
 import os
 
 
-from traits.api import Any, HasTraits, List, Property, provides
+from traits.api import Any, Dict, HasTraits, List, Property, provides
 from traits.api import Str
 
 
@@ -30,6 +30,9 @@ class ImageResource(MImageResource, HasTraits):
     # The resource manager reference for the image.
     _ref = Any()
 
+    # The resource manager references for the image at specific sizes.
+    _sized_refs = Dict()
+
     # 'ImageResource' interface --------------------------------------------
 
     absolute_path = Property(Str)
@@ -52,6 +55,10 @@ class ImageResource(MImageResource, HasTraits):
     # Private interface.
     # ------------------------------------------------------------------------
 
+    def _get_image_bytes(self, image):
+        # the null toolkit's images are the image file's data
+        return len(image)
+
     def _get_absolute_path(self):
         # FIXME: This doesn't quite work with the new notion of image size. We
         # should find out who is actually using this trait, and for what!
@@ -11,11 +11,12 @@
 import logging
 
 from pyface.qt import is_qt5
-from pyface.qt.QtCore import QAbstractItemModel, QModelIndex, Qt
+from pyface.qt.QtCore import QAbstractItemModel, QModelIndex, Qt, QTimer
 from pyface.data_view.index_manager import Root
 from pyface.data_view.abstract_data_model import (
     AbstractDataModel, DataViewSetError
 )
+from pyface.data_view.text_cache import TextCache
 
 
 logger = logging.getLogger(__name__)
@@ -23,11 +24,85 @@ logger = logging.getLogger(__name__)
 # XXX This file is scaffolding and may need to be rewritten
 
 
+def _insert_row_map(row, parent, start, count):
+    """ Map a row index to its new value after child rows are inserted. """
+    n = len(parent)
+    if len(row) > n and row[:n] == parent and row[n] >= start:
+        return row[:n] + (row[n] + count,) + row[n+1:]
+    return row
+
+
+def _remove_row_map(row, parent, start, count):
+    """ Map a row index to its new value after child rows are removed.
+
+    Returns None if the row was removed.
+    """
+    n = len(parent)
+    if len(row) > n and row[:n] == parent and row[n] >= start:
+        if row[n] < start + count:
+            return None
+        return row[:n] + (row[n] - count,) + row[n+1:]
+    return row
+
+
+def _move_row_map(row, parent, start, count, destination, destination_row):
+    """ Map a row index to its new value after child rows are moved. """
+    new_destination = _remove_row_map(destination, parent, start, count)
+    if destination == parent and destination_row > start:
+        destination_row -= count
+    n = len(parent)
+    if len(row) > n and row[:n] == parent and start <= row[n] < start + count:
+        return (
+            new_destination
+            + (destination_row + row[n] - start,)
+            + row[n+1:]
+        )
+    row = _remove_row_map(row, parent, start, count)
+    return _insert_row_map(row, new_destination, destination_row, count)
+
+
 class DataViewItemModel(QAbstractItemModel):
     """ A QAbstractItemModel that understands AbstractDataModels. """
 
+    #: The number of rows of text requested from the data model at once.
+    block_rows = 64
+
+    #: The number of columns of text requested from the data model at once.
+    block_columns = 16
+
+    #: The interval in milliseconds over which values_changed events from
+    #: the data model are merged before the view is told about them.  If
+    #: None, every values_changed event is passed on to the view
+    #: immediately; if 0, changes are passed on once control returns to the
+    #: event loop.
+    coalesce_interval = None
+
     def __init__(self, model, parent=None):
         super().__init__(parent)
+        # blocks of text fetched from the data model
+        self._text_cache = TextCache(
+            block_rows=self.block_rows,
+            block_columns=self.block_columns,
+        )
+        self._text_cache_size = None
+        # whether the text cache is scheduled to be cleared
+        self._text_clear_pending = False
+        # bounding rectangles of changed values which the view has not yet
+        # been told about, keyed by parent row index; the column headers
+        # use a key of None
+        self._pending_changes = {}
+        #: The number of values_changed events received from the data model.
+        self.values_changed_received = 0
+        #: The number of dataChanged and headerDataChanged signals emitted.
+        self.values_changed_emitted = 0
+        # whether a collection of the index manager's cache is scheduled
+        self._collect_pending = False
+        # the insertion or removal announced by the data model whose rows
+        # the view has been told are about to change, as a tuple of the
+        # kind of change and the event value, or None
+        self._announced_rows = None
+        # the number of rows_inserted events received from the data model
+        self._rows_inserted_received = 0
         self.model = model
         self.destroyed.connect(self._on_destroyed)
 
@@ -38,6 +113,9 @@ class DataViewItemModel(QAbstractItemModel):
     @model.setter
     def model(self, model: AbstractDataModel):
         self._disconnect_model_observers()
+        self._text_cache.model = model
+        self._pending_changes.clear()
+        self._end_announced_rows()
         if hasattr(self, '_model'):
             self.beginResetModel()
             self._model = model
@@ -47,54 +125,172 @@ class DataViewItemModel(QAbstractItemModel):
             self._model = model
         self._connect_model_observers()
 
+    @property
+    def text_cache(self):
+        """ The cache of the text of data cells. """
+        return self._text_cache
+
+    @property
+    def text_cache_size(self):
+        """ The maximum number of cells of text to keep between paints.
+
+        If None, the text of cells is only kept until control returns to
+        the event loop.  Otherwise the text is kept until the value of the
+        cell changes or the cache holds more than this number of cells; a
+        value of 0 means that the cache is unbounded.
+        """
+        return self._text_cache_size
+
+    @text_cache_size.setter
+    def text_cache_size(self, size):
+        self._text_cache_size = size
+        self._text_cache.max_cells = size or 0
+        self._text_cache.clear()
+
     # model event listeners
 
     def on_structure_changed(self, event):
+        self._end_announced_rows()
+        self._text_cache.clear()
+        self._pending_changes.clear()
         self.beginResetModel()
         self.endResetModel()
 
     def on_values_changed(self, event):
+        self.values_changed_received += 1
         top, left, bottom, right = event.new
+        self._text_cache.invalidate(top, left, bottom, right)
         if top == () and bottom == ():
             # this is a column header change
-            self.headerDataChanged.emit(Qt.Horizontal, left[0], right[0])
+            parent = None
+            change = (0, left[0], 0, right[0])
         elif left == () and right == ():
             # this is a row header change
             # XXX this is currently not supported and not needed
-            pass
+            return
         else:
             for i, (top_row, bottom_row) in enumerate(zip(top, bottom)):
                 if top_row != bottom_row:
                     break
-            top = top[:i+1]
-            bottom = bottom[:i+1]
+            parent = tuple(top[:i])
+            change = (
+                top[i],
+                self._to_column(left),
+                bottom[i],
+                self._to_column(right),
+            )
 
-            top_left = self._to_model_index(top, left)
-            bottom_right = self._to_model_index(bottom, right)
-            self.dataChanged.emit(top_left, bottom_right)
+        if self.coalesce_interval is None:
+            self._emit_changed(parent, *change)
+            return
+
+        pending = self._pending_changes.get(parent)
+        if pending is None:
+            if not self._pending_changes:
+                QTimer.singleShot(
+                    self.coalesce_interval, self._flush_pending_changes
+                )
+            self._pending_changes[parent] = change
+        else:
+            self._pending_changes[parent] = (
+                min(pending[0], change[0]),
+                min(pending[1], change[1]),
+                max(pending[2], change[2]),
+                max(pending[3], change[3]),
+            )
+
+    def on_rows_about_to_be_inserted(self, event):
+        self._begin_rows_change("inserted", event.new)
+
+    def on_rows_inserted(self, event):
+        self._rows_inserted_received += 1
+        parent, start, count = event.new
+        parent = tuple(parent)
+        if not self._is_announced("inserted", event.new):
+            # the data model has already added the rows, so the view is
+            # told about the whole change at once
+            self._begin_rows_change("inserted", event.new)
+        self._remap_persistent_indexes(
+            lambda row: _insert_row_map(row, parent, start, count),
+            [parent],
+        )
+        self._announced_rows = None
+        self.endInsertRows()
+
+    def on_rows_about_to_be_removed(self, event):
+        self._begin_rows_change("removed", event.new)
+
+    def on_rows_removed(self, event):
+        parent, start, count = event.new
+        parent = tuple(parent)
+        if not self._is_announced("removed", event.new):
+            # the data model has already removed the rows, so views can't
+            # look at them, but they are still told about the change
+            self._begin_rows_change("removed", event.new)
+        self._remap_persistent_indexes(
+            lambda row: _remove_row_map(row, parent, start, count),
+            [parent],
+        )
+        self._announced_rows = None
+        self.endRemoveRows()
+
+    def on_rows_moved(self, event):
+        # changes that the view has not been told about precede this one
+        self._flush_pending_changes()
+        parent, start, count, destination, destination_row = event.new
+        parent = tuple(parent)
+        destination = tuple(destination)
+        self._text_cache.clear()
+        if not self.beginMoveRows(
+            self._to_model_index(parent, ()),
+            start,
+            start + count - 1,
+            self._to_model_index(destination, ()),
+            destination_row,
+        ):
+            logger.warning(
+                "Invalid row move: parent %r, start %r, count %r, "
+                "destination %r, destination row %r",
+                parent,
+                start,
+                count,
+                destination,
+                destination_row,
+            )
+            self.beginResetModel()
+            self.endResetModel()
+            return
+        self._remap_persistent_indexes(
+            lambda row: _move_row_map(
+                row, parent, start, count, destination, destination_row
+            ),
+            [parent, destination],
+        )
+        self.endMoveRows()
 
     # Structure methods
 
     def parent(self, index):
         if not index.isValid():
             return QModelIndex()
-        parent = index.internalPointer()
+        parent = self._to_parent_index(index)
         if parent == Root:
             return QModelIndex()
 
         grandparent, row = self.model.index_manager.get_parent_and_row(parent)
-        return self.createIndex(row, 0, grandparent)
+        return self._create_index(row, 0, grandparent)
 
     def index(self, row, column, parent):
         if parent.isValid():
             parent_index = self.model.index_manager.create_index(
-                parent.internalPointer(),
+                self._to_parent_index(parent),
                 parent.row(),
             )
+            if not self._collect_pending:
+                self._schedule_collect()
         else:
             parent_index = Root
-        index = self.createIndex(row, column, parent_index)
-        return index
+        return self._create_index(row, column, parent_index)
 
     def rowCount(self, index=QModelIndex()):
         row_index = self._to_row_index(index)
@@ -117,6 +313,33 @@ class DataViewItemModel(QAbstractItemModel):
 
         return 0
 
+    def canFetchMore(self, index):
+        row_index = self._to_row_index(index)
+        try:
+            return self.model.can_fetch_more(row_index)
+        except Exception:
+            logger.exception("Error in canFetchMore")
+
+        return False
+
+    def fetchMore(self, index):
+        row_index = self._to_row_index(index)
+        start = self.rowCount(index)
+        received = self._rows_inserted_received
+        try:
+            count = self.model.fetch_more(row_index)
+        except Exception:
+            logger.exception("Error in fetchMore")
+            return
+
+        if count > 0 and self._rows_inserted_received == received:
+            # the data model has added the rows without announcing them, so
+            # the view is told about the whole change at once
+            self._flush_pending_changes()
+            self._text_cache.clear()
+            self.beginInsertRows(index, start, start + count - 1)
+            self.endInsertRows()
+
     # Data methods
 
     def flags(self, index):
@@ -138,6 +361,9 @@ class DataViewItemModel(QAbstractItemModel):
     def data(self, index, role=Qt.DisplayRole):
         row = self._to_row_index(index)
         column = self._to_column_index(index)
+        if role == Qt.DisplayRole and row != () and column != ():
+            return self._get_block_text(row, column)
+
         value_type = self.model.get_value_type(row, column)
         if not value_type:
             return None
@@ -199,6 +425,167 @@ class DataViewItemModel(QAbstractItemModel):
 
     # Private utility methods
 
+    def _get_block_text(self, row, column):
+        """ Get the text of a cell via the text cache.
+
+        Views paint many adjacent cells at once, so rather than asking the
+        data model for each cell's text individually, the text cache fetches
+        the text for the whole block of cells around the requested cell in
+        one call.  Unless ``text_cache_size`` is set, the cached text is
+        discarded when control returns to the event loop.
+        """
+        if self._text_cache_size is None and not self._text_clear_pending:
+            self._text_clear_pending = True
+            QTimer.singleShot(0, self._clear_text_cache)
+        try:
+            return self._text_cache.get_text(row, column)
+        except Exception:
+            logger.exception(
+                "Error getting text: row %r, column %r", row, column
+            )
+            return None
+
+    def _clear_text_cache(self):
+        """ Discard the text fetched while painting. """
+        self._text_clear_pending = False
+        if self._text_cache_size is None:
+            self._text_cache.clear()
+
+    def _flush_pending_changes(self):
+        """ Tell the view about any changes which have been merged. """
+        if getattr(self, "_model", None) is None:
+            self._pending_changes.clear()
+            return
+        pending_changes = self._pending_changes
+        self._pending_changes = {}
+        for parent, change in pending_changes.items():
+            self._emit_changed(parent, *change)
+
+    def _emit_changed(self, parent, top, left, bottom, right):
+        """ Emit the signal for a rectangle of changed values.
+
+        A parent of None indicates a change to the column headers, in which
+        case the left and right values are column indices of the data
+        model.  Otherwise the top and bottom values are rows of the parent
+        and the left and right values are columns of the Qt model.
+        """
+        self.values_changed_emitted += 1
+        if parent is None:
+            self.headerDataChanged.emit(Qt.Horizontal, left, right)
+        else:
+            parent_index = self.model.index_manager.from_sequence(parent)
+            self.dataChanged.emit(
+                self._create_index(top, left, parent_index),
+                self._create_index(bottom, right, parent_index),
+            )
+
+    def _schedule_collect(self):
+        """ Schedule a collection if the index manager needs one.
+
+        Qt may be holding references to index objects in the middle of an
+        operation, so the collection is deferred until control returns to
+        the event loop.
+        """
+        if self.model.index_manager.needs_collect():
+            self._collect_pending = True
+            QTimer.singleShot(0, self._collect_indices)
+
+    def _collect_indices(self):
+        """ Discard index objects which Qt is no longer holding.
+
+        Outside of model operations, Qt only holds onto index objects via
+        persistent model indices: these are used for things like the
+        selection, the current item, and the set of expanded items.  Every
+        index object that these refer to, either as the parent or as the
+        item itself, is retained.
+        """
+        self._collect_pending = False
+        if getattr(self, "_model", None) is None:
+            return
+
+        index_manager = self._model.index_manager
+        keep = []
+        for index in self.persistentIndexList():
+            if index.isValid():
+                parent = index_manager.from_id(index.internalId())
+                keep.append(parent)
+                keep.append(index_manager.create_index(parent, index.row()))
+        index_manager.collect(keep)
+
+    def _remap_persistent_indexes(self, row_map, parents):
+        """ Update persistent indexes which are deeper descendants of rows
+        that have been inserted, removed or moved.
+
+        Qt updates the persistent indexes of the direct children of the
+        parents involved in the change, but the index objects held by the
+        persistent indexes of deeper descendants refer to row positions
+        which may no longer be correct.  These are recomputed using the
+        ``row_map`` function, which maps an old row index to the new row
+        index, or None if the row has been removed.
+        """
+        index_manager = self.model.index_manager
+        old_indexes = []
+        new_indexes = []
+        for index in self.persistentIndexList():
+            if not index.isValid():
+                continue
+            row = self._to_row_index(index)
+            if row[:-1] in parents:
+                # Qt adjusts these itself
+                continue
+            new_row = row_map(row)
+            if new_row is None or new_row == row:
+                continue
+            old_indexes.append(index)
+            new_indexes.append(
+                self._create_index(
+                    new_row[-1],
+                    index.column(),
+                    index_manager.from_sequence(new_row[:-1]),
+                )
+            )
+        if old_indexes:
+            self.changePersistentIndexList(old_indexes, new_indexes)
+
+    def _begin_rows_change(self, kind, change):
+        """ Tell the view that rows are about to be inserted or removed. """
+        if self._announced_rows is not None:
+            # an announced change which never completed can't be finished,
+            # so the state of the data model is unknown
+            self._end_announced_rows()
+            self.beginResetModel()
+            self.endResetModel()
+        # changes that the view has not been told about precede this one
+        self._flush_pending_changes()
+        parent, start, count = change
+        parent = tuple(parent)
+        self._text_cache.clear()
+        parent_index = self._to_model_index(parent, ())
+        if kind == "inserted":
+            self.beginInsertRows(parent_index, start, start + count - 1)
+        else:
+            self.beginRemoveRows(parent_index, start, start + count - 1)
+        self._announced_rows = (kind, (parent, start, count))
+
+    def _is_announced(self, kind, change):
+        """ Whether the view was told that a change was about to happen. """
+        parent, start, count = change
+        return self._announced_rows == (kind, (tuple(parent), start, count))
+
+    def _end_announced_rows(self):
+        """ End an announced change which is not going to be completed.
+
+        The caller is responsible for resetting the view afterwards.
+        """
+        if self._announced_rows is None:
+            return
+        kind, change = self._announced_rows
+        self._announced_rows = None
+        if kind == "inserted":
+            self.endInsertRows()
+        else:
+            self.endRemoveRows()
+
     def _on_destroyed(self):
         self._disconnect_model_observers()
         self._model = None
@@ -215,6 +602,31 @@ class DataViewItemModel(QAbstractItemModel):
                 'values_changed',
                 dispatch='ui',
             )
+            self._model.observe(
+                self.on_rows_about_to_be_inserted,
+                'rows_about_to_be_inserted',
+                dispatch='ui',
+            )
+            self._model.observe(
+                self.on_rows_inserted,
+                'rows_inserted',
+                dispatch='ui',
+            )
+            self._model.observe(
+                self.on_rows_about_to_be_removed,
+                'rows_about_to_be_removed',
+                dispatch='ui',
+            )
+            self._model.observe(
+                self.on_rows_removed,
+                'rows_removed',
+                dispatch='ui',
+            )
+            self._model.observe(
+                self.on_rows_moved,
+                'rows_moved',
+                dispatch='ui',
+            )
 
     def _disconnect_model_observers(self):
         if getattr(self, "_model", None) is not None:
@@ -230,12 +642,56 @@ class DataViewItemModel(QAbstractItemModel):
                 dispatch='ui',
                 remove=True,
             )
+            self._model.observe(
+                self.on_rows_about_to_be_inserted,
+                'rows_about_to_be_inserted',
+                dispatch='ui',
+                remove=True,
+            )
+            self._model.observe(
+                self.on_rows_inserted,
+                'rows_inserted',
+                dispatch='ui',
+                remove=True,
+            )
+            self._model.observe(
+                self.on_rows_about_to_be_removed,
+                'rows_about_to_be_removed',
+                dispatch='ui',
+                remove=True,
+            )
+            self._model.observe(
+                self.on_rows_removed,
+                'rows_removed',
+                dispatch='ui',
+                remove=True,
+            )
+            self._model.observe(
+                self.on_rows_moved,
+                'rows_moved',
+                dispatch='ui',
+                remove=True,
+            )
+
+    def _create_index(self, row, column, parent_index):
+        """ Create a QModelIndex with the given index object as parent.
+
+        The QModelIndex holds the integer id of the parent index object,
+        rather than a pointer to it, so that index managers are free to use
+        index objects, such as ints, which Qt cannot hold pointers to.
+        """
+        parent_id = self.model.index_manager.id(parent_index)
+        return self.createIndex(row, column, parent_id)
+
+    def _to_parent_index(self, index):
+        """ Get the index object of the parent of a valid QModelIndex. """
+        return self.model.index_manager.from_id(index.internalId())
 
     def _to_row_index(self, index):
         if not index.isValid():
             row_index = ()
         else:
-            parent = index.internalPointer()
+            parent = self._to_parent_index(index)
             if parent == Root:
                 row_index = ()
             else:
@@ -253,15 +709,17 @@ class DataViewItemModel(QAbstractItemModel):
             else:
                 return (column - 1,)
 
+    def _to_column(self, column_index):
+        if len(column_index) == 0:
+            return 0
+        else:
+            return column_index[0] + 1
+
     def _to_model_index(self, row_index, column_index):
         if len(row_index) == 0:
             return QModelIndex()
         index = self.model.index_manager.from_sequence(row_index[:-1])
         row = row_index[-1]
-        if len(column_index) == 0:
-            column = 0
-        else:
-            column = column_index[0] + 1
-
-        return self.createIndex(row, column, index)
+        column = self._to_column(column_index)
+        return self._create_index(row, column, index)
 
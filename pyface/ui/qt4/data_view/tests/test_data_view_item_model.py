@@ -0,0 +1,624 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+from argparse import Namespace
+import unittest
+from unittest.mock import patch
+
+from traits.api import Bool, Instance, Int, List
+from traits.testing.optional_dependencies import numpy as np, requires_numpy
+
+from pyface.gui import GUI
+from pyface.qt.QtCore import (
+    QModelIndex, QPersistentModelIndex, QSortFilterProxyModel, Qt
+)
+from pyface.data_view.abstract_data_model import AbstractDataModel
+from pyface.data_view.data_models.api import ArrayDataModel
+from pyface.data_view.index_manager import IntIndexManager, TupleIndexManager
+from pyface.data_view.value_types.api import FloatValue, IntValue
+from pyface.ui.qt4.data_view.data_view_item_model import DataViewItemModel
+
+
+class PagedDataModel(AbstractDataModel):
+    """ A flat data model which loads its rows a page at a time. """
+
+    #: The number of rows available in total.
+    total_rows = Int(35)
+
+    #: The number of rows loaded by each call to fetch_more.
+    page_size = Int(10)
+
+    #: The rows which have been loaded.
+    rows = List(Int)
+
+    index_manager = Instance(IntIndexManager, ())
+
+    def get_column_count(self):
+        return 1
+
+    def can_have_children(self, row):
+        return len(row) == 0
+
+    def get_row_count(self, row):
+        if len(row) == 0:
+            return len(self.rows)
+        return 0
+
+    def can_fetch_more(self, row):
+        return len(row) == 0 and len(self.rows) < self.total_rows
+
+    #: Whether new rows are announced with the inserting_rows context.
+    announce = Bool(True)
+
+    def fetch_more(self, row):
+        start = len(self.rows)
+        end = min(start + self.page_size, self.total_rows)
+        if self.announce and end > start:
+            with self.inserting_rows(row, start, end - start):
+                self.rows.extend(range(start, end))
+        else:
+            self.rows.extend(range(start, end))
+        return end - start
+
+    def get_value(self, row, column):
+        if len(row) == 0 or len(column) == 0:
+            return None
+        return self.rows[row[0]]
+
+    def get_value_type(self, row, column):
+        return IntValue()
+
+
+class TreeDataModel(AbstractDataModel):
+    """ A hierarchical data model of nested [value, children] lists. """
+
+    #: The top-level nodes of the tree.
+    data = List()
+
+    index_manager = Instance(TupleIndexManager, ())
+
+    def get_column_count(self):
+        return 1
+
+    def can_have_children(self, row):
+        return True
+
+    def get_row_count(self, row):
+        return len(self._children(row))
+
+    def get_value(self, row, column):
+        if len(row) == 0 or len(column) == 0:
+            return None
+        return self._children(row[:-1])[row[-1]][0]
+
+    def get_value_type(self, row, column):
+        return IntValue()
+
+    def insert_rows(self, parent, start, nodes):
+        with self.inserting_rows(parent, start, len(nodes)):
+            self._children(parent)[start:start] = nodes
+
+    def remove_rows(self, parent, start, count):
+        with self.removing_rows(parent, start, count):
+            del self._children(parent)[start:start + count]
+
+    def move_rows(self, parent, start, count, destination, destination_row):
+        source = self._children(parent)
+        target = self._children(destination)
+        nodes = source[start:start + count]
+        target[destination_row:destination_row] = nodes
+        if target is source and destination_row <= start:
+            start += count
+        del source[start:start + count]
+        self.rows_moved = (parent, start, count, destination, destination_row)
+
+    def _children(self, row):
+        children = self.data
+        for i in row:
+            children = children[i][1]
+        return children
+
+
+class TestDataViewItemModelFetchMore(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        self.model = PagedDataModel()
+        self.item_model = DataViewItemModel(self.model)
+        self.inserted = []
+        self.row_counts = []
+        self.item_model.rowsAboutToBeInserted.connect(
+            self._rows_about_to_be_inserted
+        )
+        self.item_model.rowsInserted.connect(self._rows_inserted)
+
+    def tearDown(self):
+        self.item_model.rowsAboutToBeInserted.disconnect(
+            self._rows_about_to_be_inserted
+        )
+        self.item_model.rowsInserted.disconnect(self._rows_inserted)
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def _rows_about_to_be_inserted(self, parent, first, last):
+        self.row_counts.append(self.item_model.rowCount(parent))
+
+    def _rows_inserted(self, parent, first, last):
+        self.inserted.append((parent.isValid(), first, last))
+
+    def test_can_fetch_more(self):
+        self.assertEqual(self.item_model.rowCount(), 0)
+        self.assertTrue(self.item_model.canFetchMore(QModelIndex()))
+
+    def test_fetch_more(self):
+        self.item_model.fetchMore(QModelIndex())
+
+        self.assertEqual(self.item_model.rowCount(), 10)
+        self.assertEqual(self.inserted, [(False, 0, 9)])
+        # the view isn't shown the new rows until it is told about them
+        self.assertEqual(self.row_counts, [0])
+
+    def test_fetch_more_not_announced(self):
+        self.model.announce = False
+
+        self.item_model.fetchMore(QModelIndex())
+        self.item_model.fetchMore(QModelIndex())
+
+        self.assertEqual(self.item_model.rowCount(), 20)
+        self.assertEqual(self.inserted, [(False, 0, 9), (False, 10, 19)])
+
+    def test_fetch_more_until_exhausted(self):
+        while self.item_model.canFetchMore(QModelIndex()):
+            self.item_model.fetchMore(QModelIndex())
+
+        self.assertEqual(self.item_model.rowCount(), 35)
+        self.assertEqual(
+            self.inserted,
+            [(False, 0, 9), (False, 10, 19), (False, 20, 29), (False, 30, 34)],
+        )
+        index = self.item_model.index(34, 1, QModelIndex())
+        self.assertEqual(self.item_model.data(index, Qt.DisplayRole), "34")
+
+    def test_fetch_more_nothing_loaded(self):
+        self.model.total_rows = 0
+
+        self.assertFalse(self.item_model.canFetchMore(QModelIndex()))
+        self.item_model.fetchMore(QModelIndex())
+
+        self.assertEqual(self.inserted, [])
+
+
+@requires_numpy
+class TestDataViewItemModel(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        self.data = np.arange(6000.0).reshape(200, 30)
+        self.model = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.item_model = DataViewItemModel(self.model)
+
+    def tearDown(self):
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def _index(self, row, column):
+        return self.item_model.index(row, column, QModelIndex())
+
+    def test_data_display(self):
+        result = self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+
+        self.assertEqual(result, "{:n}".format(self.data[3, 1]))
+
+    def test_data_display_row_header(self):
+        result = self.item_model.data(self._index(3, 0), Qt.DisplayRole)
+
+        self.assertEqual(result, "3")
+
+    def test_data_display_fetches_blocks(self):
+        with patch.object(
+                ArrayDataModel,
+                'get_texts',
+                autospec=True,
+                side_effect=ArrayDataModel.get_texts,
+        ) as get_texts:
+            for row in range(10):
+                for column in range(1, 11):
+                    self.item_model.data(
+                        self._index(row, column), Qt.DisplayRole
+                    )
+
+        get_texts.assert_called_once_with(
+            self.model, (), range(0, 64), range(0, 16)
+        )
+
+    def test_data_display_partial_block(self):
+        result = self.item_model.data(self._index(199, 30), Qt.DisplayRole)
+
+        self.assertEqual(result, "{:n}".format(self.data[199, 29]))
+
+    def test_data_display_blocks_cleared_by_event_loop(self):
+        self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+        self.assertNotEqual(self.item_model.text_cache.size, 0)
+
+        self.gui.process_events()
+
+        self.assertEqual(self.item_model.text_cache.size, 0)
+
+    def test_data_display_text_cache_size(self):
+        self.item_model.text_cache_size = 0
+        self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+
+        self.gui.process_events()
+
+        self.assertEqual(self.item_model.text_cache.size, 64 * 16)
+        self.model.set_value((3,), (1,), -1.0)
+        self.assertEqual(self.item_model.text_cache.size, 0)
+        result = self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+        self.assertEqual(result, "{:n}".format(-1.0))
+
+    def test_data_display_values_changed(self):
+        self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+
+        self.model.set_value((3,), (1,), -1.0)
+        result = self.item_model.data(self._index(3, 2), Qt.DisplayRole)
+
+        self.assertEqual(result, "{:n}".format(-1.0))
+
+    def test_can_fetch_more(self):
+        self.assertFalse(self.item_model.canFetchMore(QModelIndex()))
+
+
+@requires_numpy
+class TestDataViewItemModelCoalesce(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        self.data = np.arange(6000.0).reshape(200, 30)
+        self.model = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.item_model = DataViewItemModel(self.model)
+        self.item_model.coalesce_interval = 0
+        self.changed = []
+        self.header_changed = []
+        self.item_model.dataChanged.connect(self._data_changed)
+        self.item_model.headerDataChanged.connect(self._header_changed)
+
+    def tearDown(self):
+        self.item_model.dataChanged.disconnect(self._data_changed)
+        self.item_model.headerDataChanged.disconnect(self._header_changed)
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def _data_changed(self, top_left, bottom_right, roles=None):
+        self.changed.append((
+            (top_left.row(), top_left.column()),
+            (bottom_right.row(), bottom_right.column()),
+        ))
+
+    def _header_changed(self, orientation, first, last):
+        self.header_changed.append((first, last))
+
+    def test_values_changed_immediate(self):
+        self.item_model.coalesce_interval = None
+
+        self.model.values_changed = ((3,), (1,), (3,), (1,))
+        self.model.values_changed = ((5,), (4,), (6,), (4,))
+
+        self.assertEqual(self.changed, [((3, 2), (3, 2)), ((5, 5), (6, 5))])
+        self.assertEqual(self.item_model.values_changed_received, 2)
+        self.assertEqual(self.item_model.values_changed_emitted, 2)
+
+    def test_values_changed_coalesced(self):
+        for row in range(10, 20):
+            self.model.values_changed = ((row,), (row,), (row,), (row,))
+
+        self.assertEqual(self.changed, [])
+
+        self.gui.process_events()
+
+        self.assertEqual(self.changed, [((10, 11), (19, 20))])
+        self.assertEqual(self.item_model.values_changed_received, 10)
+        self.assertEqual(self.item_model.values_changed_emitted, 1)
+
+    def test_values_changed_coalesced_header(self):
+        self.model.values_changed = ((), (3,), (), (3,))
+        self.model.values_changed = ((), (7,), (), (8,))
+        self.model.values_changed = ((2,), (1,), (2,), (1,))
+
+        self.gui.process_events()
+
+        self.assertEqual(self.header_changed, [(3, 8)])
+        self.assertEqual(self.changed, [((2, 2), (2, 2))])
+        self.assertEqual(self.item_model.values_changed_emitted, 2)
+
+    def test_values_changed_flushed_before_rows_removed(self):
+        self.model.values_changed = ((199,), (0,), (199,), (0,))
+
+        self.model.data = self.data[:100]
+
+        # the pending change is reported before the rows are removed, and
+        # the change to the remaining rows is merged afterwards
+        self.assertEqual(self.changed, [((199, 1), (199, 1))])
+        self.gui.process_events()
+        self.assertEqual(
+            self.changed,
+            [((199, 1), (199, 1)), ((0, 1), (99, 30))],
+        )
+
+    def test_values_changed_discarded_by_structure_changed(self):
+        self.model.values_changed = ((3,), (1,), (3,), (1,))
+
+        self.model.structure_changed = True
+        self.gui.process_events()
+
+        self.assertEqual(self.changed, [])
+
+
+@requires_numpy
+class TestDataViewItemModelCollect(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        self.data = np.arange(1000.0).reshape(10, 10, 10)
+        self.model = ArrayDataModel(
+            data=self.data,
+            value_type=FloatValue(),
+            index_manager=TupleIndexManager(cache_limit=5),
+        )
+        self.item_model = DataViewItemModel(self.model)
+
+    def tearDown(self):
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def test_collect_indices(self):
+        index_manager = self.model.index_manager
+        kept = self.item_model.index(3, 0, QModelIndex())
+        kept_child = self.item_model.index(4, 2, kept)
+        persistent = QPersistentModelIndex(kept_child)
+        for row in range(10):
+            parent = self.item_model.index(row, 0, QModelIndex())
+            self.item_model.index(0, 0, parent)
+        self.assertEqual(index_manager.cache_size, 11)
+
+        self.gui.process_events()
+
+        # the root, the parent of the persistent index, and the index itself
+        self.assertEqual(index_manager.cache_size, 3)
+        self.assertTrue(persistent.isValid())
+        self.assertEqual(
+            self.item_model.data(QModelIndex(persistent), Qt.DisplayRole),
+            "{:n}".format(self.data[3, 4, 1]),
+        )
+
+    def test_collect_no_limit(self):
+        index_manager = self.model.index_manager
+        index_manager.cache_limit = 0
+        for row in range(10):
+            parent = self.item_model.index(row, 0, QModelIndex())
+            self.item_model.index(0, 0, parent)
+
+        self.gui.process_events()
+
+        self.assertEqual(index_manager.cache_size, 11)
+
+
+@requires_numpy
+class TestDataViewItemModelHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        self.data = np.arange(360.0).reshape(3, 4, 5, 6)
+        self.model = ArrayDataModel(data=self.data, value_type=FloatValue())
+        self.item_model = DataViewItemModel(self.model)
+
+    def tearDown(self):
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def test_index_parent_round_trip(self):
+        for index_manager in [self.model.index_manager, TupleIndexManager()]:
+            with self.subTest(index_manager=index_manager):
+                self.model.index_manager = index_manager
+                top = self.item_model.index(2, 0, QModelIndex())
+                middle = self.item_model.index(3, 0, top)
+                leaf = self.item_model.index(4, 6, middle)
+
+                self.assertEqual(self.item_model.parent(leaf), middle)
+                self.assertEqual(self.item_model.parent(middle), top)
+                self.assertFalse(self.item_model.parent(top).isValid())
+                self.assertEqual(self.item_model.rowCount(middle), 5)
+                self.assertEqual(self.item_model.rowCount(leaf), 0)
+                self.assertEqual(
+                    self.item_model.data(leaf, Qt.DisplayRole),
+                    "{:n}".format(self.data[2, 3, 4, 5]),
+                )
+
+
+class TestDataViewItemModelRowEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.gui = GUI()
+        values = iter(range(1000))
+        self.model = TreeDataModel(data=[
+            [next(values), [
+                [next(values), [[next(values), []] for k in range(2)]]
+                for j in range(3)
+            ]]
+            for i in range(6)
+        ])
+        self.item_model = DataViewItemModel(self.model)
+        self.resets = 0
+        self.item_model.modelReset.connect(self._model_reset)
+
+    def tearDown(self):
+        self.item_model.modelReset.disconnect(self._model_reset)
+        self.item_model.model = None
+        self.gui.process_events()
+
+    def _model_reset(self):
+        self.resets += 1
+
+    def _index(self, *rows):
+        parent = QModelIndex()
+        for row in rows[:-1]:
+            parent = self.item_model.index(row, 0, parent)
+        return self.item_model.index(rows[-1], 1, parent)
+
+    def _persistent(self, *rows):
+        index = self._index(*rows)
+        return QPersistentModelIndex(index), self.item_model.data(index)
+
+    def assertTracks(self, persistent, text, rows):
+        index = QModelIndex(persistent)
+        self.assertTrue(index.isValid())
+        self.assertEqual(self.item_model.data(index), text)
+        self.assertEqual(self.item_model._to_row_index(index), rows)
+
+    def test_rows_inserted(self):
+        child, child_text = self._persistent(3)
+        grandchild, grandchild_text = self._persistent(3, 1, 0)
+
+        self.model.insert_rows((), 0, [[-1, []], [-2, []]])
+
+        self.assertEqual(self.resets, 0)
+        self.assertEqual(self.item_model.rowCount(), 8)
+        self.assertTracks(child, child_text, (5,))
+        self.assertTracks(grandchild, grandchild_text, (5, 1, 0))
+        self.assertEqual(self.item_model.data(self._index(0)), "-1")
+
+    def test_rows_inserted_nested(self):
+        grandchild, grandchild_text = self._persistent(3, 1, 0)
+
+        self.model.insert_rows((3,), 0, [[-1, []]])
+
+        self.assertEqual(self.resets, 0)
+        self.assertEqual(self.item_model.rowCount(self._index(3)), 4)
+        self.assertTracks(grandchild, grandchild_text, (3, 2, 0))
+
+    def test_rows_removed(self):
+        child, child_text = self._persistent(3)
+        grandchild, grandchild_text = self._persistent(3, 1, 0)
+        removed, _ = self._persistent(1, 1, 0)
+
+        self.model.remove_rows((), 0, 2)
+
+        self.assertEqual(self.resets, 0)
+        self.assertEqual(self.item_model.rowCount(), 4)
+        self.assertTracks(child, child_text, (1,))
+        self.assertTracks(grandchild, grandchild_text, (1, 1, 0))
+        self.assertFalse(removed.isValid())
+
+    def test_rows_inserted_announced(self):
+        row_counts = []
+
+        def about_to_be_inserted(parent, first, last):
+            row_counts.append(self.item_model.rowCount(parent))
+
+        self.item_model.rowsAboutToBeInserted.connect(about_to_be_inserted)
+        try:
+            self.model.insert_rows((), 0, [[-1, []], [-2, []]])
+        finally:
+            self.item_model.rowsAboutToBeInserted.disconnect(
+                about_to_be_inserted
+            )
+
+        # the view isn't shown the new rows until it is told about them
+        self.assertEqual(row_counts, [6])
+        self.assertEqual(self.item_model.rowCount(), 8)
+
+    def test_rows_removed_announced(self):
+        removed = []
+
+        def about_to_be_removed(parent, first, last):
+            removed.append((
+                self.item_model.rowCount(parent),
+                [
+                    self.item_model.data(self._index(row))
+                    for row in range(first, last + 1)
+                ],
+            ))
+
+        expected = [self.item_model.data(self._index(row)) for row in (0, 1)]
+        self.item_model.rowsAboutToBeRemoved.connect(about_to_be_removed)
+        try:
+            self.model.remove_rows((), 0, 2)
+        finally:
+            self.item_model.rowsAboutToBeRemoved.disconnect(
+                about_to_be_removed
+            )
+
+        # the view can still look at the rows which are being removed
+        self.assertEqual(removed, [(6, expected)])
+        self.assertEqual(self.item_model.rowCount(), 4)
+
+    def test_rows_removed_proxy(self):
+        proxy = QSortFilterProxyModel()
+        proxy.setSourceModel(self.item_model)
+        proxy.sort(1, Qt.DescendingOrder)
+        expected = [
+            self.item_model.data(self._index(row)) for row in (5, 4, 3, 2)
+        ]
+
+        with self.assertRaises(AssertionError):
+            # nothing is logged by out of range requests of the proxy
+            with self.assertLogs(
+                    "pyface.ui.qt4.data_view.data_view_item_model"):
+                self.model.remove_rows((), 0, 2)
+
+        self.assertEqual(proxy.rowCount(), 4)
+        self.assertEqual(
+            [proxy.data(proxy.index(row, 1)) for row in range(4)],
+            expected,
+        )
+        proxy.setSourceModel(None)
+
+    def test_rows_removed_failed(self):
+        with self.assertRaises(IndexError):
+            with self.model.removing_rows((), 0, 2):
+                raise IndexError()
+
+        # the change is unknown, so the view is reset
+        self.assertEqual(self.resets, 1)
+        self.assertEqual(self.item_model.rowCount(), 6)
+
+    def test_rows_moved(self):
+        moved, moved_text = self._persistent(0, 1, 0)
+        shifted, shifted_text = self._persistent(3, 0)
+        unmoved, unmoved_text = self._persistent(5, 2, 1)
+
+        self.model.move_rows((), 0, 2, (), 5)
+
+        self.assertEqual(self.resets, 0)
+        self.assertEqual(self.item_model.rowCount(), 6)
+        self.assertTracks(moved, moved_text, (3, 1, 0))
+        self.assertTracks(shifted, shifted_text, (1, 0))
+        self.assertTracks(unmoved, unmoved_text, (5, 2, 1))
+
+    def test_rows_moved_between_parents(self):
+        moved, moved_text = self._persistent(0, 1, 0)
+        shifted, shifted_text = self._persistent(4, 2, 1)
+
+        self.model.move_rows((0,), 1, 2, (4,), 0)
+
+        self.assertEqual(self.resets, 0)
+        self.assertEqual(self.item_model.rowCount(self._index(0)), 1)
+        self.assertEqual(self.item_model.rowCount(self._index(4)), 5)
+        self.assertTracks(moved, moved_text, (4, 0, 0))
+        self.assertTracks(shifted, shifted_text, (4, 4, 1))
+
+    def test_rows_moved_invalid(self):
+        with self.assertLogs(
+                "pyface.ui.qt4.data_view.data_view_item_model", "WARNING"):
+            # moving a row into its own descendant is not possible
+            self.item_model.on_rows_moved(
+                Namespace(new=((), 0, 1, (0,), 0))
+            )
+
+        self.assertEqual(self.resets, 1)
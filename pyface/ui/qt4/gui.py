@@ -12,7 +12,11 @@
 # However, when used with the GPL version of PyQt the additional terms described in the PyQt GPL exception also apply
 
 
+import functools
 import logging
+import threading
+import time
+from collections import deque
 
 
 from pyface.qt import QtCore, QtGui
@@ -22,6 +26,7 @@ from traits.api import Bool, HasTraits, provides, Str
 from pyface.util.guisupport import start_event_loop_qt4
 
 
+from pyface.gui_monitor import get_profiler, profiled_call
 from pyface.i_gui import IGUI, MGUI
 
 
@@ -60,19 +65,29 @@ class GUI(MGUI, HasTraits):
 
     @classmethod
     def invoke_after(cls, millisecs, callable, *args, **kw):
-        _FutureCall(millisecs, callable, *args, **kw)
+        _CallQueue.instance().post(millisecs, callable, args, kw)
 
     @classmethod
     def invoke_later(cls, callable, *args, **kw):
-        _FutureCall(0, callable, *args, **kw)
+        _CallQueue.instance().post(0, callable, args, kw)
+
+    @classmethod
+    def invoke_later_coalesced(cls, key, callable, *args, **kw):
+        _CallQueue.instance().post(0, callable, args, kw, key)
 
     @classmethod
     def set_trait_after(cls, millisecs, obj, trait_name, new):
-        _FutureCall(millisecs, setattr, obj, trait_name, new)
+        _CallQueue.instance().post(
+            millisecs, setattr, (obj, trait_name, new), {}
+        )
 
     @classmethod
     def set_trait_later(cls, obj, trait_name, new):
-        _FutureCall(0, setattr, obj, trait_name, new)
+        _CallQueue.instance().post(0, setattr, (obj, trait_name, new), {})
+
+    @classmethod
+    def dispatch_statistics(cls, reset=False):
+        return _CallQueue.instance().statistics(reset)
 
     @staticmethod
     def process_events(allow_user_events=True):
@@ -129,76 +144,162 @@ class GUI(MGUI, HasTraits):
             QtGui.QApplication.restoreOverrideCursor()
 
 
-class _FutureCall(QtCore.QObject):
-    """ This is a helper class that is similar to the wx FutureCall class. """
-
-    # Keep a list of references so that they don't get garbage collected.
-    _calls = []
+class _CallQueue(QtCore.QObject):
+    """ A thread-safe queue of calls to be made on the main GUI thread.
 
-    # Manage access to the list of instances.
-    _calls_mutex = QtCore.QMutex()
+    Calls may be queued from any thread.  Rather than posting an event for
+    every call, a single event is posted when the queue becomes non-empty,
+    and all the calls queued by the time that it is handled are made as a
+    batch.  Calls which are queued with a key replace any pending call
+    with the same key, so that only the latest of them is made.
+    """
 
-    # A new Qt event type for _FutureCalls
+    # A new Qt event type for draining the queue
     _pyface_event = QtCore.QEvent.Type(QtCore.QEvent.registerEventType())
 
-    def __init__(self, ms, callable, *args, **kw):
-        super(_FutureCall, self).__init__()
+    # The shared instance.
+    _instance = None
 
-        # Save the arguments.
-        self._ms = ms
-        self._callable = callable
-        self._args = args
-        self._kw = kw
+    # Manage creation of the shared instance.
+    _instance_lock = threading.Lock()
 
-        # Save the instance.
-        self._calls_mutex.lock()
-        try:
-            self._calls.append(self)
-        finally:
-            self._calls_mutex.unlock()
+    @classmethod
+    def instance(cls):
+        """ Get the shared call queue, creating it if needed. """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+
+        # The queued calls, as lists of [callable, args, kw, delay, key,
+        # time queued].
+        self._queue = deque()
+
+        # The pending calls which have keys, by key.
+        self._keyed = {}
+
+        # Whether an event has been posted to drain the queue.
+        self._posted = False
+
+        # Manage access to the queue.
+        self._lock = threading.Lock()
+
+        # Statistics.
+        self._statistics = self._empty_statistics()
 
         # Move to the main GUI thread.
         self.moveToThread(QtGui.QApplication.instance().thread())
 
+    def post(self, millisecs, callable, args, kw, key=None):
+        """ Queue a call to be made on the main GUI thread. """
+        with self._lock:
+            if key is not None:
+                entry = self._keyed.get(key)
+                if entry is not None:
+                    # replace the pending call, keeping its place in line
+                    entry[:4] = [callable, args, kw, millisecs]
+                    self._statistics["coalesced"] += 1
+                    return
+            entry = [callable, args, kw, millisecs, key, time.perf_counter()]
+            self._queue.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+
+            depth = len(self._queue)
+            if depth > self._statistics["max_queue_depth"]:
+                self._statistics["max_queue_depth"] = depth
+
+            if self._posted:
+                return
+            self._posted = True
+
         # Post an event to be dispatched on the main GUI thread. Note that
-        # we do not call QTimer.singleShot here, which would be simpler, because
-        # that only works on QThreads. We want regular Python threads to work.
+        # we do not call QTimer.singleShot here, which would be simpler,
+        # because that only works on QThreads. We want regular Python threads
+        # to work.
         event = QtCore.QEvent(self._pyface_event)
         QtGui.QApplication.postEvent(self, event)
 
+    def statistics(self, reset=False):
+        """ Get a dictionary of statistics about the queue. """
+        with self._lock:
+            statistics = dict(self._statistics)
+            statistics["queue_depth"] = len(self._queue)
+            if reset:
+                self._statistics = self._empty_statistics()
+        return statistics
+
     def event(self, event):
         """ QObject event handler.
         """
         if event.type() == self._pyface_event:
-            if self._ms == 0:
-                # Invoke the callable now
-                try:
-                    self._callable(*self._args, **self._kw)
-                finally:
-                    # We cannot remove from self._calls here. QObjects don't like being
-                    # garbage collected during event handlers (there are tracebacks,
-                    # plus maybe a memory leak, I think).
-                    QtCore.QTimer.singleShot(0, self._finished)
-            else:
-                # Invoke the callable (puts it at the end of the event queue)
-                QtCore.QTimer.singleShot(self._ms, self._dispatch)
+            self._drain()
             return True
 
-        return super(_FutureCall, self).event(event)
+        return super().event(event)
 
-    def _dispatch(self):
-        """ Invoke the callable.
-        """
-        try:
-            self._callable(*self._args, **self._kw)
-        finally:
-            self._finished()
+    def _drain(self):
+        """ Make the calls which are currently queued.
 
-    def _finished(self):
-        """ Remove the call from the list, so it can be garbage collected.
+        Calls are taken from the front of the shared queue one at a time, so
+        that they are made in order even if a call processes events and so
+        drains the queue reentrantly.  Calls queued during the drain are
+        left for the next event, so that the drain always finishes.
         """
-        self._calls_mutex.lock()
+        start = time.perf_counter()
+        with self._lock:
+            self._posted = False
+            remaining = len(self._queue)
+            if remaining:
+                statistics = self._statistics
+                latency = start - self._queue[0][5]
+                statistics["batches"] += 1
+                statistics["last_drain_latency"] = latency
+                if latency > statistics["max_drain_latency"]:
+                    statistics["max_drain_latency"] = latency
+
+        profiler = get_profiler()
         try:
-            self._calls.remove(self)
+            while remaining > 0:
+                remaining -= 1
+                with self._lock:
+                    if not self._queue:
+                        break
+                    entry = self._queue.popleft()
+                    key = entry[4]
+                    if key is not None and self._keyed.get(key) is entry:
+                        del self._keyed[key]
+                    self._statistics["dispatched"] += 1
+                callable, args, kw, millisecs, key, queued = entry
+                if millisecs > 0:
+                    QtCore.QTimer.singleShot(
+                        millisecs,
+                        functools.partial(profiled_call, callable, *args, **kw),
+                    )
+                elif profiler is None:
+                    callable(*args, **kw)
+                else:
+                    profiler.call(callable, args, kw)
         finally:
-            self._calls_mutex.unlock()
+            with self._lock:
+                if self._queue and not self._posted:
+                    # Calls were queued during the drain, or a call raised
+                    # an exception: make sure that the rest are made.
+                    self._posted = True
+                    event = QtCore.QEvent(self._pyface_event)
+                    QtGui.QApplication.postEvent(self, event)
+
+    @staticmethod
+    def _empty_statistics():
+        return {
+            "max_queue_depth": 0,
+            "dispatched": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "last_drain_latency": 0.0,
+            "max_drain_latency": 0.0,
+        }
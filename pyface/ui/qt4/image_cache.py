@@ -11,20 +11,37 @@
 # This software is provided without warranty under the terms of the BSD license.
 # However, when used with the GPL version of PyQt the additional terms described in the PyQt GPL exception also apply
 
+import functools
 
-from pyface.qt import QtGui
+from pyface.qt import QtCore, QtGui
 
 
 from traits.api import HasTraits, provides
 
 
 from pyface.i_image_cache import IImageCache, MImageCache
+from pyface.resource.decoded_image_cache import DecodedImageCache
+from pyface.resource.scaled_image_cache import ScaledImageCache
+
+
+#: The pixmaps of all image caches, keyed by filename, width, height and
+#: device pixel ratio.  The unscaled pixmaps are kept with a width and height
+#: of None, so that scaling to a new size doesn't need to load the file again.
+pixmap_cache = DecodedImageCache(max_bytes=16 * 1024 * 1024)
+
+#: The scaled images of all image caches, kept on disk across runs.
+scaled_image_cache = ScaledImageCache()
 
 
 @provides(IImageCache)
 class ImageCache(MImageCache, HasTraits):
     """ The toolkit specific implementation of an ImageCache.  See the
     IImageCache interface for the API documentation.
+
+    The scaled pixmaps of all image caches are kept in a shared, memory
+    bounded cache, so caches for different sizes don't evict each other's
+    pixmaps, and in a persistent cache on disk, so they don't need to be
+    scaled again the next time the application is run.
     """
 
     # ------------------------------------------------------------------------
@@ -40,37 +57,137 @@ class ImageCache(MImageCache, HasTraits):
     # ------------------------------------------------------------------------
 
     def get_image(self, filename):
-        image = QtGui.QPixmapCache.find(filename)
+        ratio = device_pixel_ratio()
+        key = (filename, self._width, self._height, ratio)
+        scaled = pixmap_cache.get(key)
+
+        if scaled is None:
+            width = int(round(self._width * ratio))
+            height = int(round(self._height * ratio))
+            scaled = self._qt4_load_scaled(filename, width, height, ratio)
+
+            if scaled is None:
+                image = pixmap_cache.get((filename, None, None, 1.0))
+                if image is None:
+                    # Load the image from the file and add it to the cache.
+                    image = QtGui.QPixmap(filename)
+                    pixmap_cache.add(
+                        (filename, None, None, 1.0), image, pixmap_bytes(image)
+                    )
+                scaled = self._qt4_scale(image, ratio)
+                if not image.isNull() and image.size() != scaled.size():
+                    # the image is encoded and written in the background
+                    scaled_image_cache.add_later(
+                        filename,
+                        width,
+                        height,
+                        ratio,
+                        functools.partial(encode_png, scaled.toImage()),
+                    )
+
+            pixmap_cache.add(key, scaled, pixmap_bytes(scaled))
+
+        # pixmaps can be painted on in place, so hand out copies, which
+        # share the pixel data until they are modified
+        return QtGui.QPixmap(scaled)
 
-        if image is not None:
-            scaled = self._qt4_scale(image)
+    # Qt doesn't distinguish between bitmaps and images.
+    get_bitmap = get_image
 
-            if scaled is not image:
-                # The Qt cache is application wide so we only keep the last
-                # size asked for.
-                QtGui.QPixmapCache.remove(filename)
-                QtGui.QPixmapCache.insert(filename, scaled)
-        else:
-            # Load the image from the file and add it to the cache.
-            image = QtGui.QPixmap(filename)
-            scaled = self._qt4_scale(image)
-            QtGui.QPixmapCache.insert(filename, scaled)
+    def statistics(self, reset=False):
+        """ Get statistics about the shared cache of pixmaps.
 
-        return scaled
+        Parameters
+        ----------
+        reset : bool
+            Whether to reset the statistics after reading them.
 
-    # Qt doesn't distinguish between bitmaps and images.
-    get_bitmap = get_image
+        Returns
+        -------
+        statistics : dict
+            A dictionary holding the number of lookups which were ``hits``
+            and ``misses``, the number of pixmaps discarded to stay within
+            the budget (``evictions``), and the number of pixmaps
+            (``images``) and estimated ``bytes`` in the cache.
+        """
+        return pixmap_cache.statistics(reset=reset)
 
     # ------------------------------------------------------------------------
     # Private 'ImageCache' interface.
     # ------------------------------------------------------------------------
 
-    def _qt4_scale(self, image):
+    def _qt4_load_scaled(self, filename, width, height, ratio):
+        """ Loads a scaled image from the persistent cache, if it is there.
+        """
+
+        data = scaled_image_cache.get(filename, width, height, ratio)
+        if data is None:
+            return None
+
+        image = QtGui.QPixmap()
+        if not image.loadFromData(data, "PNG"):
+            return None
+        if ratio != 1.0:
+            image.setDevicePixelRatio(ratio)
+
+        return image
+
+    def _qt4_scale(self, image, ratio=1.0):
         """ Scales the given image if necessary. """
 
-        # Although Qt won't scale the image if it doesn't need to, it will make
-        # a deep copy which we don't need.
-        if image.width() != self._width or image.height() != self._height:
-            image = image.scaled(self._width, self._height)
+        width = int(round(self._width * ratio))
+        height = int(round(self._height * ratio))
 
+        image = scale_image(image, width, height)
+
+        if ratio != 1.0:
+            # Copying a pixmap is cheap as the pixel data is shared.
+            image = QtGui.QPixmap(image)
+            image.setDevicePixelRatio(ratio)
+
+        return image
+
+
+def device_pixel_ratio():
+    """ Returns the device pixel ratio of the application's screens. """
+
+    # Qt4 has no notion of the device pixel ratio.
+    app = QtGui.QApplication.instance()
+    if app is None or not hasattr(app, "devicePixelRatio"):
+        return 1.0
+
+    return float(app.devicePixelRatio())
+
+
+def pixmap_bytes(pixmap):
+    """ Estimate the memory used by a pixmap or image, in bytes. """
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+def scale_image(image, width, height):
+    """ Scale a pixmap or image to the given size in pixels.
+
+    Images are scaled the same way by image caches and image loaders, so
+    that the scaled images they share through the persistent cache look the
+    same whichever of them scaled it.
+    """
+    # Although Qt won't scale the image if it doesn't need to, it will make
+    # a deep copy which we don't need.
+    if image.width() == width and image.height() == height:
         return image
+    return image.scaled(
+        width,
+        height,
+        QtCore.Qt.IgnoreAspectRatio,
+        QtCore.Qt.SmoothTransformation,
+    )
+
+
+def encode_png(image):
+    """ Encode a pixmap or image as PNG data. """
+    data = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(data)
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
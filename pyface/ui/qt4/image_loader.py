@@ -0,0 +1,344 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Load images without blocking the GUI thread.
+
+Decoding an image file on the GUI thread blocks the user interface, so
+views which show many images, such as thumbnails, are slow to open.  The
+``ImageLoader`` decodes images into ``QImage`` objects on worker threads,
+hands out a placeholder pixmap immediately, and swaps in the real pixmap on
+the GUI thread when it is ready::
+
+    loader = ImageLoader.default()
+    loader.load(filename, label.setPixmap, size=(64, 64), owner=widget)
+
+The callback is called with the placeholder straight away, and then with
+the image when it has been decoded, unless the image was already cached, in
+which case it is only called once, with the image.  Requests for the same
+image are decoded only once, and requests whose owner is destroyed before
+the image is ready are dropped, cancelling the decoding if no one else is
+waiting for it.
+
+Images loaded from files are scaled to the requested size and shared with
+``ImageCache``.  Images loaded from an ``ImageResource`` are the same as
+those created by its ``create_image`` method, and are shared with it.  Each
+callback is given its own copy of the shared pixmap, so it can be modified
+without affecting the other users of the image.
+"""
+
+import functools
+
+from pyface.qt import QtCore, QtGui
+
+from traits.api import Any, Dict, HasStrictTraits, Instance, Int
+
+from pyface.background_executor import BackgroundExecutor
+from pyface.resource.resource_reference import ImageReference
+from pyface.resource_manager import decoded_image_cache
+from pyface.ui.qt4.image_cache import (
+    device_pixel_ratio, encode_png, pixmap_bytes, pixmap_cache,
+    scale_image, scaled_image_cache
+)
+
+
+class _PendingImage(object):
+    """ An image which is being decoded, and the requests waiting for it. """
+
+    __slots__ = ("future", "requests")
+
+    def __init__(self, future):
+        #: The future of the decoded QImage.
+        self.future = future
+
+        #: The (callback, owner) pairs of the requests for the image.
+        self.requests = []
+
+
+class ImageLoader(HasStrictTraits):
+    """ Decodes images on worker threads and delivers them on the GUI thread.
+    """
+
+    #: The executor which decodes the images.
+    executor = Instance(BackgroundExecutor)
+
+    #: The number of worker threads used by the default executor.
+    max_workers = Int(2)
+
+    #: The pixmap to show while an image is loading, or None to show a
+    #: transparent pixmap of the requested size.
+    placeholder = Any()
+
+    # Private traits ---------------------------------------------------------
+
+    #: The images which are being decoded, keyed by their cache key.
+    _pending = Dict()
+
+    #: The keys of the pending images requested by each owner.
+    _owned = Dict()
+
+    #: The slots connected to the destroyed signals of QObject owners.
+    _qt_slots = Dict()
+
+    #: The transparent placeholders, keyed by size.
+    _placeholders = Dict()
+
+    #: The shared loader.
+    _default = None
+
+    @classmethod
+    def default(cls):
+        """ Get the shared image loader. """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def load(self, source, callback, size=None, owner=None):
+        """ Load an image, calling back with a placeholder until it is ready.
+
+        This must be called from the GUI thread.
+
+        Parameters
+        ----------
+        source : str or ImageResource
+            The name of the image file, or an image resource.
+        callback : callable
+            A callable which is called on the GUI thread with a QPixmap: the
+            placeholder and then the image, or only the image if it has
+            already been loaded.
+        size : (int, int) or None
+            The size of the image.  Images from files are scaled to the
+            size, while image resources choose the image for the size, as
+            for ``create_image``.
+        owner : IWidget, Task, QObject or None
+            The owner of the request.  If the owner is destroyed before the
+            image is ready then the callback is not called.  Widgets and
+            tasks are destroyed when their ``control`` or ``window`` is set
+            to None.
+        """
+        if size is not None:
+            size = tuple(size)
+
+        if isinstance(source, str):
+            ratio = device_pixel_ratio()
+            if size is None:
+                key = (source, None, None, 1.0)
+                decode_size = None
+            else:
+                key = (source, size[0], size[1], ratio)
+                decode_size = (
+                    int(round(size[0] * ratio)), int(round(size[1] * ratio))
+                )
+            cache = pixmap_cache
+            filename, data = source, None
+        else:
+            ref = source._get_ref(size)
+            if not _can_decode(ref):
+                # Image resources which can't be decoded from a file or data
+                # (including missing images) are loaded as usual.
+                callback(source.create_image(size))
+                return
+            ratio = 1.0
+            key = source._get_cache_key(ref)
+            decode_size = None
+            cache = decoded_image_cache
+            filename, data = ref.filename, ref.data
+
+        pixmap = cache.get(key)
+        if pixmap is not None:
+            callback(QtGui.QPixmap(pixmap))
+            return
+
+        callback(self._get_placeholder(size))
+
+        pending = self._pending.get(key)
+        if pending is None:
+            future = self._get_executor().submit(
+                _decode_image, filename, data, decode_size, ratio
+            )
+            pending = self._pending[key] = _PendingImage(future)
+            future.add_done_callback(
+                functools.partial(self._decoded, key, pending, cache, ratio)
+            )
+        pending.requests.append((callback, owner))
+
+        if owner is not None:
+            keys = self._owned.get(owner)
+            if keys is None:
+                keys = self._owned[owner] = set()
+                self._watch_owner(owner)
+            keys.add(key)
+
+    def cancel_all(self):
+        """ Drop all pending requests and cancel their decoding. """
+        for pending in list(self._pending.values()):
+            pending.future.cancel()
+        self._pending = {}
+        for owner in list(self._owned):
+            self._forget_owner(owner)
+
+    def shutdown(self):
+        """ Drop all pending requests and shut down the executor. """
+        self.cancel_all()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    # Private methods --------------------------------------------------------
+
+    def _get_executor(self):
+        """ Get the executor, creating it if needed. """
+        if self.executor is None:
+            self.executor = BackgroundExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def _get_placeholder(self, size):
+        """ Get the pixmap to show while an image of a size is loading. """
+        if self.placeholder is not None:
+            return self.placeholder
+
+        placeholder = self._placeholders.get(size)
+        if placeholder is None:
+            width, height = size if size is not None else (1, 1)
+            placeholder = QtGui.QPixmap(width, height)
+            placeholder.fill(QtCore.Qt.transparent)
+            self._placeholders[size] = placeholder
+        return placeholder
+
+    def _decoded(self, key, pending, cache, ratio, future):
+        """ Deliver a decoded image, on the GUI thread. """
+        requested = self._pending.get(key) is pending
+        if requested:
+            del self._pending[key]
+        if future.cancelled():
+            return
+
+        if future.exception() is None:
+            pixmap = QtGui.QPixmap.fromImage(future.result())
+            if ratio != 1.0:
+                pixmap.setDevicePixelRatio(ratio)
+            cache.add(key, pixmap, pixmap_bytes(pixmap))
+        else:
+            # the image couldn't be decoded: don't cache the failure, in
+            # case the file is being written
+            pixmap = QtGui.QPixmap()
+
+        if not requested:
+            # the requests were dropped while the image was being decoded
+            return
+        for callback, owner in pending.requests:
+            if owner is not None:
+                keys = self._owned.get(owner, set())
+                keys.discard(key)
+                if not keys:
+                    self._forget_owner(owner)
+            # each request gets its own copy of the cached pixmap
+            callback(QtGui.QPixmap(pixmap))
+
+    def _watch_owner(self, owner):
+        """ Start watching for the destruction of an owner. """
+        if isinstance(owner, QtCore.QObject):
+            # Qt passes a new wrapper of the destroyed object to the slot,
+            # so the owner is bound to the slot.
+            slot = functools.partial(self._qt_owner_destroyed, owner)
+            self._qt_slots[owner] = slot
+            owner.destroyed.connect(slot)
+        else:
+            owner.observe(self._owner_destroyed, _owner_trait(owner))
+
+    def _forget_owner(self, owner):
+        """ Stop watching an owner which has no pending requests. """
+        self._owned.pop(owner, None)
+        if isinstance(owner, QtCore.QObject):
+            slot = self._qt_slots.pop(owner, None)
+            try:
+                owner.destroyed.disconnect(slot)
+            except (RuntimeError, TypeError):
+                # the underlying object has already been deleted
+                pass
+        else:
+            owner.observe(
+                self._owner_destroyed, _owner_trait(owner), remove=True
+            )
+
+    def _drop_requests(self, owner):
+        """ Drop the pending requests of an owner which has been destroyed.
+        """
+        for key in self._owned.pop(owner, ()):
+            pending = self._pending.get(key)
+            if pending is None:
+                continue
+            pending.requests = [
+                request for request in pending.requests
+                if request[1] is not owner
+            ]
+            if not pending.requests:
+                # no one else wants the image
+                del self._pending[key]
+                pending.future.cancel()
+
+    def _owner_destroyed(self, event):
+        """ Drop the requests of an owner whose control or window has gone.
+        """
+        if event.new is None:
+            owner = event.object
+            self._drop_requests(owner)
+            owner.observe(
+                self._owner_destroyed, _owner_trait(owner), remove=True
+            )
+
+    def _qt_owner_destroyed(self, owner, obj=None):
+        """ Drop the requests of a QObject owner which has been destroyed.
+        """
+        self._qt_slots.pop(owner, None)
+        self._drop_requests(owner)
+
+
+def _can_decode(ref):
+    """ Whether an image resource reference can be decoded into a QImage. """
+    if not isinstance(ref, ImageReference):
+        return False
+    if ref.filename is not None:
+        # SVG files are rendered by the resource factory
+        return not ref.filename.lower().endswith(".svg")
+    return ref.data is not None
+
+
+def _decode_image(filename, data, size, ratio):
+    """ Decode an image into a QImage, scaling it if a size is given.
+
+    Scaled images are shared with ``ImageCache`` through the persistent
+    scaled image cache.  This runs on a worker thread, so it must not create
+    any pixmaps.
+    """
+    if data is None and size is not None:
+        scaled_data = scaled_image_cache.get(filename, size[0], size[1], ratio)
+        if scaled_data is not None:
+            image = QtGui.QImage.fromData(scaled_data, "PNG")
+            if not image.isNull():
+                return image
+
+    if data is not None:
+        image = QtGui.QImage.fromData(data)
+    else:
+        image = QtGui.QImage(filename)
+
+    if image.isNull():
+        raise ValueError("Unable to decode image {!r}".format(filename))
+
+    if size is not None and (image.width(), image.height()) != size:
+        image = scale_image(image, size[0], size[1])
+        if data is None:
+            scaled_image_cache.add(
+                filename, size[0], size[1], ratio, encode_png(image)
+            )
+    return image
+
+
+def _owner_trait(owner):
+    """ The trait which is set to None when an owner is destroyed. """
+    return "window" if owner.trait("control") is None else "control"
@@ -18,7 +18,7 @@ import os
 from pyface.qt import QtGui
 
 
-from traits.api import Any, HasTraits, List, Property, provides
+from traits.api import Any, Dict, HasTraits, List, Property, provides
 from traits.api import Str
 
 
@@ -36,6 +36,9 @@ class ImageResource(MImageResource, HasTraits):
     # The resource manager reference for the image.
     _ref = Any()
 
+    # The resource manager references for the image at specific sizes.
+    _sized_refs = Dict()
+
     # 'ImageResource' interface --------------------------------------------
 
     absolute_path = Property(Str)
@@ -55,7 +58,7 @@ class ImageResource(MImageResource, HasTraits):
         ref = self._get_ref(size)
 
         if ref is not None:
-            image = ref.load()
+            image = self._load_image(ref)
         else:
             image = self._get_image_not_found_image()
 
@@ -81,6 +84,14 @@ class ImageResource(MImageResource, HasTraits):
     # Private interface.
     # ------------------------------------------------------------------------
 
+    def _get_image_bytes(self, image):
+        return image.width() * image.height() * max(image.depth(), 8) // 8
+
+    def _share_image(self, image):
+        # pixmaps can be painted on in place, so hand out copies, which
+        # share the pixel data until they are modified
+        return QtGui.QPixmap(image)
+
     def _get_absolute_path(self):
         # FIXME: This doesn't quite work the new notion of image size. We
         # should find out who is actually using this trait, and for what!
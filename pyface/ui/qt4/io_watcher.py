@@ -0,0 +1,77 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+""" Watch file descriptors for I/O readiness from the Qt event loop. """
+
+from pyface.qt import QtCore
+
+#: Closed notifiers, which are kept until control returns to the event loop,
+#: since they may be closed by a callback of their own activated signal.
+_closed_notifiers = []
+
+
+class IOWatcher(object):
+    """ Calls a callback on the GUI thread when a file descriptor is ready.
+
+    Parameters
+    ----------
+    fd : int
+        The file descriptor to watch.
+    callback : callable
+        A callable taking no arguments which is called when the file
+        descriptor is ready for the kinds of I/O being watched for.
+    """
+
+    def __init__(self, fd, callback):
+        self.fd = fd
+        self.callback = callback
+        self._notifiers = {}
+
+    def watch(self, read=False, write=False):
+        """ Set the kinds of I/O readiness to watch for.
+
+        Parameters
+        ----------
+        read : bool
+            Whether to watch for the file descriptor being readable.
+        write : bool
+            Whether to watch for the file descriptor being writable.
+        """
+        for kind, wanted in [
+            (QtCore.QSocketNotifier.Read, read),
+            (QtCore.QSocketNotifier.Write, write),
+        ]:
+            notifier = self._notifiers.get(kind)
+            if wanted and notifier is None:
+                notifier = QtCore.QSocketNotifier(self.fd, kind)
+                notifier.activated.connect(self._activated)
+                self._notifiers[kind] = notifier
+            elif not wanted and notifier is not None:
+                self._close_notifier(self._notifiers.pop(kind))
+
+    def set_enabled(self, enabled):
+        """ Enable or disable the watching without forgetting its kinds. """
+        for notifier in self._notifiers.values():
+            notifier.setEnabled(enabled)
+
+    def close(self):
+        """ Stop watching the file descriptor. """
+        self.watch(read=False, write=False)
+
+    # Private methods --------------------------------------------------------
+
+    def _activated(self, *args):
+        self.callback()
+
+    def _close_notifier(self, notifier):
+        notifier.setEnabled(False)
+        notifier.activated.disconnect(self._activated)
+        if not _closed_notifiers:
+            QtCore.QTimer.singleShot(0, _closed_notifiers.clear)
+        _closed_notifiers.append(notifier)
@@ -10,18 +10,39 @@
 
 """ A simple progress bar intended to run in the UI thread """
 
-import time
+import math
 
 from pyface.qt import QtGui, QtCore
 
 from traits.api import (
-    Any, Bool, Callable, Instance, Int, List, Str, provides, Tuple
+    Any, Bool, Callable, Float, Instance, Int, List, Range, Str, provides,
+    Tuple
 )
 
 from pyface.i_progress_dialog import IProgressDialog, MProgressDialog
+from pyface.timer.i_timer import perf_counter
+from pyface.timer.timer import CallbackTimer
 from .window import Window
 
 
+class _ProgressFeed(object):
+    """ The latest progress reported by worker threads.
+
+    Worker threads replace the reported value with a single attribute
+    assignment, which is atomic, so no lock is needed.  The GUI thread
+    samples the latest value from a timer.
+    """
+
+    __slots__ = ("value", "cancelled")
+
+    def __init__(self):
+        #: The most recently reported value, or None.
+        self.value = None
+
+        #: Whether the user has cancelled the dialog.
+        self.cancelled = False
+
+
 @provides(IProgressDialog)
 class ProgressDialog(MProgressDialog, Window):
     """ A simple progress dialog window which allows itself to be updated
@@ -68,6 +89,15 @@ class ProgressDialog(MProgressDialog, Window):
     #: Label for the 'cancel' button
     cancel_button_label = Str("Cancel")
 
+    #: The interval in seconds at which the display is refreshed.  Values
+    #: reported from worker threads are sampled at this interval, and
+    #: ``update`` only processes events at this interval.
+    update_interval = Range(low=0.0, value=0.1)
+
+    #: The time constant in seconds of the exponential smoothing of the
+    #: rate of progress used to estimate the time remaining.
+    rate_smoothing = Range(low=0.0, value=2.0)
+
     #: Whether or not the dialog was cancelled by the user
     _user_cancelled = Bool(False)
 
@@ -90,6 +120,27 @@ class ProgressDialog(MProgressDialog, Window):
     #: handler.
     _connections_to_remove = List(Tuple(Any, Callable))
 
+    #: The progress reported by worker threads.
+    _feed = Instance(_ProgressFeed, ())
+
+    #: The last reported value which was displayed.
+    _sampled_value = Any()
+
+    #: The timer which samples the reported progress.
+    _sample_timer = Instance(CallbackTimer)
+
+    #: The time at which the dialog was opened.
+    _start_time = Float()
+
+    #: The time at which the display was last refreshed, or None.
+    _refresh_time = Any()
+
+    #: The value displayed at the last refresh.
+    _refresh_value = Float()
+
+    #: The smoothed rate of progress in units per second, or None.
+    _rate = Any()
+
     # -------------------------------------------------------------------------
     # IWindow Interface
     # -------------------------------------------------------------------------
@@ -97,10 +148,19 @@ class ProgressDialog(MProgressDialog, Window):
     def open(self):
         """ Opens the window. """
         super(ProgressDialog, self).open()
-        self._start_time = time.time()
+        self._start_time = perf_counter()
+        self._refresh_time = None
+        self._rate = None
+        self._sample_timer = CallbackTimer(
+            callback=self._sample, interval=self.update_interval
+        )
+        self._sample_timer.start()
 
     def close(self):
         """ Closes the window. """
+        if self._sample_timer is not None:
+            self._sample_timer.stop()
+            self._sample_timer = None
         self.progress_bar.destroy()
         self.progress_bar = None
 
@@ -127,6 +187,10 @@ class ProgressDialog(MProgressDialog, Window):
         If the value is >= the maximum and the progress bar is not contained
         in another panel the parent window will be closed.
 
+        This must be called from the GUI thread.  To keep the GUI responsive
+        while the caller is busy, pending events are processed, but no more
+        often than every ``update_interval`` seconds.
+
         Parameters
         ----------
         value :
@@ -136,44 +200,131 @@ class ProgressDialog(MProgressDialog, Window):
         if self.progress_bar is None:
             return None, None
 
+        now = perf_counter()
+        refresh = (
+            self._refresh_time is None
+            or now - self._refresh_time >= self.update_interval
+        )
+
         if self.max > 0:
             self.progress_bar.setValue(value)
-
-            if self.max != self.min:
-                percent = (float(value) - self.min) / (self.max - self.min)
-            else:
-                percent = 1.0
-
-            if self.show_time and (percent != 0):
-                current_time = time.time()
-                elapsed = current_time - self._start_time
-                estimated = elapsed / percent
-                remaining = estimated - elapsed
-
-                self._set_time_label(elapsed, self._elapsed_control)
-                self._set_time_label(estimated, self._estimated_control)
-                self._set_time_label(remaining, self._remaining_control)
-
-            if value >= self.max or self._user_cancelled:
-                self.close()
+            self._show_progress(value, now, refresh)
         else:
             self.progress_bar.setValue(self.progress_bar.value() + value)
 
             if self._user_cancelled:
                 self.close()
 
-        QtGui.QApplication.processEvents()
+        if refresh or self.progress_bar is None:
+            QtGui.QApplication.processEvents()
 
         return (not self._user_cancelled, False)
 
+    def report(self, value):
+        """ Report the progress value from any thread.
+
+        The value is stored without locking or waiting for the GUI, and the
+        most recently reported value is displayed every
+        ``update_interval`` seconds while the dialog is open.  Unlike
+        ``update``, this never processes events, so it is cheap enough to
+        call from a worker's inner loop.  When a value >= the maximum is
+        displayed, the dialog is closed.
+
+        Parameters
+        ----------
+        value :
+            The progress value to set.  For dialogs without a maximum, this
+            is the absolute value rather than an increment.
+
+        Returns
+        -------
+        continue : bool
+            False if the user has cancelled the dialog, True otherwise.
+        """
+        feed = self._feed
+        feed.value = value
+        return not feed.cancelled
+
     # -------------------------------------------------------------------------
     # Private Interface
     # -------------------------------------------------------------------------
 
     def reject(self, event):
         self._user_cancelled = True
+        self._feed.cancelled = True
         self.close()
 
+    def _rejected(self):
+        """ Record that the user cancelled the dialog. """
+        self._user_cancelled = True
+        self._feed.cancelled = True
+
+    def _sample(self):
+        """ Display the most recently reported value, if it has changed. """
+        if self.progress_bar is None:
+            return
+        if self._user_cancelled:
+            self.close()
+            return
+        value = self._feed.value
+        if value is None or value == self._sampled_value:
+            return
+        self._sampled_value = value
+        self.progress_bar.setValue(value)
+        if self.max > 0:
+            self._show_progress(value, perf_counter(), True)
+
+    def _show_progress(self, value, now, refresh):
+        """ Show the time estimates, and close the dialog when done. """
+        if refresh:
+            self._update_rate(value, now)
+            if self.show_time:
+                elapsed = now - self._start_time
+                remaining = self._estimate_remaining(value, elapsed)
+                if remaining is not None:
+                    self._set_time_label(elapsed, self._elapsed_control)
+                    self._set_time_label(
+                        elapsed + remaining, self._estimated_control
+                    )
+                    self._set_time_label(remaining, self._remaining_control)
+
+        if value >= self.max or self._user_cancelled:
+            self.close()
+
+    def _update_rate(self, value, now):
+        """ Update the smoothed rate of progress at a refresh. """
+        if self._refresh_time is None:
+            # measure the first rate from when the dialog was opened
+            last_time, last_value = self._start_time, self.min
+        else:
+            last_time, last_value = self._refresh_time, self._refresh_value
+        self._refresh_time = now
+        self._refresh_value = value
+
+        interval = now - last_time
+        if interval <= 0:
+            return
+        rate = (value - last_value) / interval
+        if self._rate is None or self.rate_smoothing == 0:
+            self._rate = rate
+        else:
+            weight = 1.0 - math.exp(-interval / self.rate_smoothing)
+            self._rate += weight * (rate - self._rate)
+
+    def _estimate_remaining(self, value, elapsed):
+        """ Estimate the time remaining in seconds, or None if unknown. """
+        if self._rate is not None and self._rate > 0:
+            return max(self.max - value, 0) / self._rate
+
+        # fall back to the average rate since the dialog was opened
+        if self.max != self.min:
+            percent = (float(value) - self.min) / (self.max - self.min)
+        else:
+            percent = 1.0
+        if percent <= 0:
+            return None
+        return elapsed / percent - elapsed
+
     def _set_time_label(self, value, control):
         hours = value / 3600
         minutes = (value % 3600) / 60
@@ -289,6 +440,9 @@ class ProgressDialog(MProgressDialog, Window):
         self._create_timer(dialog, layout)
         self._create_buttons(dialog, layout)
 
+        dialog.rejected.connect(self._rejected)
+        self._connections_to_remove.append((dialog.rejected, self._rejected))
+
         dialog.setWindowTitle(self.title)
 
         parent.setLayout(layout)
@@ -297,6 +451,10 @@ class ProgressDialog(MProgressDialog, Window):
     # Trait change handlers
     # -------------------------------------------------------------------------
 
+    def _update_interval_changed(self, new):
+        if self._sample_timer is not None:
+            self._sample_timer.interval = new
+
     def _max_changed(self, new):
         if self.progress_bar is not None:
             self.progress_bar.setMaximum(new)
@@ -12,13 +12,19 @@ Qt-specific tests for the Qt GUI implementation.
 """
 
 
+import threading
+import time
 import unittest
 
-from traits.api import Event, HasStrictTraits, Instance
+from traits.api import (
+    Event, HasStrictTraits, Instance, Int, Str, TraitError
+)
 
 from pyface.api import GUI
-from pyface.i_gui import IGUI
+from pyface.i_gui import IGUI, _CoalescedTraitSetter
 from pyface.qt import QtCore
+from pyface.ui.qt4.gui import _CallQueue
+from pyface.ui.qt4.util.gui_test_assistant import GuiTestAssistant
 from pyface.util.guisupport import get_app_qt4, is_event_loop_running_qt4
 
 
@@ -82,3 +88,248 @@ class TestGui(unittest.TestCase):
             qt_app.flush()
 
         self.assertTrue(application_running[0])
+
+
+class TestInvokeLater(GuiTestAssistant, unittest.TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        GUI.dispatch_statistics(reset=True)
+
+    def test_invoke_later_order(self):
+        calls = []
+        for i in range(100):
+            GUI.invoke_later(calls.append, i)
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 100)
+
+        self.assertEqual(calls, list(range(100)))
+
+    def test_invoke_later_batched(self):
+        calls = []
+        for i in range(100):
+            GUI.invoke_later(calls.append, i)
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 100)
+
+        statistics = GUI.dispatch_statistics()
+        self.assertEqual(statistics["dispatched"], 100)
+        self.assertEqual(statistics["batches"], 1)
+        self.assertEqual(statistics["queue_depth"], 0)
+        self.assertEqual(statistics["max_queue_depth"], 100)
+        self.assertGreater(statistics["max_drain_latency"], 0.0)
+
+    def test_invoke_later_keywords(self):
+        calls = []
+        GUI.invoke_later(lambda *args, **kw: calls.append((args, kw)), 1, a=2)
+
+        self.assertEventuallyTrueInGui(lambda: calls)
+
+        self.assertEqual(calls, [((1,), {"a": 2})])
+
+    def test_invoke_later_from_threads(self):
+        calls = []
+
+        def worker(n):
+            for i in range(1000):
+                GUI.invoke_later(calls.append, (n, i))
+
+        threads = [
+            threading.Thread(target=worker, args=(n,)) for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 4000)
+
+        for n in range(4):
+            self.assertEqual(
+                [i for m, i in calls if m == n], list(range(1000))
+            )
+
+    def test_invoke_later_during_drain(self):
+        calls = []
+
+        def reinvoke():
+            calls.append("first")
+            GUI.invoke_later(calls.append, "second")
+
+        GUI.invoke_later(reinvoke)
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 2)
+
+        self.assertEqual(GUI.dispatch_statistics()["batches"], 2)
+
+    def test_invoke_later_order_with_process_events(self):
+        calls = []
+
+        def process():
+            calls.append("a")
+            GUI.invoke_later(calls.append, "c")
+            GUI.process_events()
+
+        GUI.invoke_later(process)
+        GUI.invoke_later(calls.append, "b")
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 3)
+
+        # the call queued while "a" ran is still made after "b"
+        self.assertEqual(calls, ["a", "b", "c"])
+
+    def test_invoke_later_coalesced(self):
+        calls = []
+        GUI.invoke_later(calls.append, "start")
+        for i in range(10):
+            GUI.invoke_later_coalesced("key", calls.append, i)
+        GUI.invoke_later_coalesced("other", calls.append, "other")
+        GUI.invoke_later(calls.append, "end")
+
+        self.assertEventuallyTrueInGui(lambda: "end" in calls)
+
+        # the latest call takes the place of the first
+        self.assertEqual(calls, ["start", 9, "other", "end"])
+        self.assertEqual(GUI.dispatch_statistics()["coalesced"], 9)
+
+    def test_invoke_later_exception(self):
+        calls = []
+
+        def fail():
+            raise ZeroDivisionError()
+
+        queue = _CallQueue.instance()
+        GUI.invoke_later(calls.append, 1)
+        GUI.invoke_later(fail)
+        GUI.invoke_later(calls.append, 2)
+
+        with self.assertRaises(ZeroDivisionError):
+            queue._drain()
+
+        # the remaining call is still made
+        self.assertEqual(calls, [1])
+        self.assertEventuallyTrueInGui(lambda: calls == [1, 2])
+
+    def test_invoke_after(self):
+        calls = []
+        GUI.invoke_after(50, calls.append, "after")
+        GUI.invoke_later(calls.append, "later")
+
+        self.assertEventuallyTrueInGui(lambda: len(calls) == 2)
+
+        self.assertEqual(calls, ["later", "after"])
+
+    def test_set_trait_later(self):
+        application = SimpleApplication()
+        events = []
+        application.observe(events.append, "application_running")
+
+        GUI.set_trait_later(application, "application_running", True)
+
+        self.assertEventuallyTrueInGui(lambda: events)
+
+
+class Progress(HasStrictTraits):
+    """ An object with a trait that workers report to. """
+
+    value = Int()
+
+    status = Str()
+
+
+class TestSetTraitLaterCoalesced(GuiTestAssistant, unittest.TestCase):
+
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        GUI.coalesced_trait_statistics(reset=True)
+
+    def test_last_value_wins(self):
+        progress = Progress()
+        events = []
+        progress.observe(events.append, "value")
+
+        for i in range(1, 1001):
+            GUI.set_trait_later_coalesced(progress, "value", i)
+
+        self.assertEventuallyTrueInGui(lambda: progress.value == 1000)
+
+        self.assertEqual(len(events), 1)
+        statistics = GUI.coalesced_trait_statistics()
+        self.assertEqual(statistics["applied"], 1)
+        self.assertEqual(statistics["dropped"], 999)
+        self.assertEqual(statistics["pending"], 0)
+
+    def test_separate_traits(self):
+        progress = Progress()
+        other = Progress()
+
+        GUI.set_trait_later_coalesced(progress, "value", 1)
+        GUI.set_trait_later_coalesced(progress, "status", "working")
+        GUI.set_trait_later_coalesced(other, "value", 2)
+
+        self.assertEventuallyTrueInGui(lambda: other.value == 2)
+
+        self.assertEqual(progress.value, 1)
+        self.assertEqual(progress.status, "working")
+        self.assertEqual(GUI.coalesced_trait_statistics()["dropped"], 0)
+
+    def test_from_threads(self):
+        progress = Progress()
+        events = []
+        progress.observe(events.append, "value")
+
+        def worker():
+            for i in range(1, 10001):
+                GUI.set_trait_later_coalesced(progress, "value", i)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertEventuallyTrueInGui(lambda: progress.value == 10000)
+
+        statistics = GUI.coalesced_trait_statistics()
+        self.assertEqual(
+            statistics["applied"] + statistics["dropped"], 10000
+        )
+        self.assertLess(len(events), 100)
+
+    def test_errors_logged(self):
+        setter = _CoalescedTraitSetter()
+        progress = Progress()
+        other = Progress()
+        setter._pending = {
+            (id(progress), "value"): (progress, "value", "bad"),
+            (id(other), "value"): (other, "value", "bad"),
+            (id(other), "status"): (other, "status", "working"),
+        }
+
+        # the first error is raised, and the others are logged
+        with self.assertLogs("pyface.i_gui", "ERROR") as logs:
+            with self.assertRaises(TraitError):
+                setter._flush()
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(other.status, "working")
+
+    def test_at_most_once_per_frame(self):
+        progress = Progress()
+        times = []
+        progress.observe(
+            lambda event: times.append(time.perf_counter()), "value"
+        )
+
+        def update():
+            if progress.value < 5:
+                GUI.set_trait_later_coalesced(
+                    progress, "value", progress.value + 1
+                )
+
+        progress.observe(lambda event: update(), "value")
+        update()
+
+        self.assertEventuallyTrueInGui(lambda: progress.value == 5)
+
+        frame = _CoalescedTraitSetter.frame_interval
+        for earlier, later in zip(times, times[1:]):
+            self.assertGreaterEqual(later - earlier, frame * 0.9)
@@ -0,0 +1,128 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyface.qt import QtCore, QtGui
+from pyface.ui.qt4.image_cache import (
+    ImageCache, pixmap_cache, scaled_image_cache
+)
+
+IMAGE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "tests", "images", "core.png"
+)
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        if QtGui.QApplication.instance() is None:
+            self.app = QtGui.QApplication([])
+        pixmap_cache.clear()
+        pixmap_cache.statistics(reset=True)
+        self.addCleanup(pixmap_cache.clear)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.addCleanup(scaled_image_cache.reset_traits, ["path"])
+        # images are written in the background, before the path is reset
+        self.addCleanup(scaled_image_cache.flush)
+        scaled_image_cache.path = os.path.join(tmpdir, "scaled.cache")
+        scaled_image_cache.statistics(reset=True)
+
+    def test_mixed_sizes(self):
+        caches = [ImageCache(size, size) for size in (16, 24, 32)]
+
+        for i in range(3):
+            for cache in caches:
+                image = cache.get_image(IMAGE_PATH)
+                self.assertEqual(image.width(), cache._width)
+
+        statistics = caches[0].statistics()
+        # the file is loaded once, and each size is scaled once
+        self.assertEqual(statistics["images"], 4)
+        self.assertEqual(statistics["hits"], 6 + 2)
+        self.assertEqual(statistics["misses"], 3 + 1)
+
+    def test_unscaled(self):
+        cache = ImageCache(64, 64)
+
+        image = cache.get_image(IMAGE_PATH)
+
+        cached = pixmap_cache.get((IMAGE_PATH, None, None, 1.0))
+        self.assertIsNot(image, cached)
+        self.assertEqual(image.cacheKey(), cached.cacheKey())
+
+    def test_copies(self):
+        cache = ImageCache(16, 16)
+
+        image = cache.get_image(IMAGE_PATH)
+        image.fill(QtCore.Qt.transparent)
+
+        # painting on an image doesn't change the cached image
+        other = cache.get_image(IMAGE_PATH)
+        self.assertIsNot(other, image)
+        self.assertNotEqual(other.cacheKey(), image.cacheKey())
+
+    def test_device_pixel_ratio(self):
+        cache = ImageCache(16, 16)
+
+        image = cache._qt4_scale(QtGui.QPixmap(IMAGE_PATH), 2.0)
+
+        self.assertEqual(image.width(), 32)
+        self.assertEqual(image.devicePixelRatio(), 2.0)
+
+    def test_smooth_scaling(self):
+        # image caches scale images the same way as image loaders
+        expected = QtGui.QImage(IMAGE_PATH).scaled(
+            16, 16, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation
+        )
+
+        image = ImageCache(16, 16).get_image(IMAGE_PATH).toImage()
+
+        format = QtGui.QImage.Format_ARGB32
+        self.assertEqual(
+            image.convertToFormat(format), expected.convertToFormat(format)
+        )
+
+    def test_budget(self):
+        pixmap_cache.max_bytes = 64 * 64 * 4
+        self.addCleanup(setattr, pixmap_cache, "max_bytes", 16 * 1024 * 1024)
+
+        for size in (16, 24, 32):
+            ImageCache(size, size).get_image(IMAGE_PATH)
+
+        statistics = pixmap_cache.statistics()
+        self.assertLessEqual(statistics["bytes"], 64 * 64 * 4)
+        self.assertGreater(statistics["evictions"], 0)
+
+    def test_persistent(self):
+        ImageCache(16, 16).get_image(IMAGE_PATH)
+        scaled_image_cache.flush()
+        self.assertEqual(scaled_image_cache.statistics()["entries"], 1)
+        # simulate a new run of the application
+        pixmap_cache.clear()
+        path = scaled_image_cache.path + ".copy"
+        shutil.copy(scaled_image_cache.path, path)
+        scaled_image_cache.path = path
+
+        image = ImageCache(16, 16).get_image(IMAGE_PATH)
+
+        self.assertEqual(image.width(), 16)
+        self.assertEqual(scaled_image_cache.statistics()["hits"], 1)
+        # the unscaled image was not loaded
+        self.assertIsNone(pixmap_cache.get((IMAGE_PATH, None, None, 1.0)))
+
+    def test_unscaled_not_persistent(self):
+        ImageCache(64, 64).get_image(IMAGE_PATH)
+        scaled_image_cache.flush()
+
+        self.assertEqual(scaled_image_cache.statistics()["entries"], 0)
@@ -0,0 +1,245 @@
+# (C) Copyright 2005-2020 Enthought, Inc., Austin, TX
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in LICENSE.txt and may be redistributed only under
+# the conditions described in the aforementioned license. The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+#
+# Thanks for using Enthought open source!
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from traits.api import Any, HasTraits
+
+from pyface.background_executor import BackgroundExecutor
+from pyface.image_resource import ImageResource
+from pyface.qt import QtGui
+from pyface.resource_manager import decoded_image_cache
+from pyface.toolkit import toolkit_object
+from pyface.ui.qt4.image_cache import pixmap_cache, scaled_image_cache
+from pyface.ui.qt4.image_loader import ImageLoader, _decode_image
+
+GuiTestAssistant = toolkit_object("util.gui_test_assistant:GuiTestAssistant")
+
+IMAGE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "tests", "images"
+)
+IMAGE_PATH = os.path.join(IMAGE_DIR, "core.png")
+
+
+class Owner(HasTraits):
+    """ A stand-in for a widget. """
+
+    control = Any()
+
+
+class TestImageLoader(GuiTestAssistant, unittest.TestCase):
+    def setUp(self):
+        GuiTestAssistant.setUp(self)
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "image.png")
+        shutil.copy(IMAGE_PATH, self.filename)
+        self.addCleanup(scaled_image_cache.reset_traits, ["path"])
+        scaled_image_cache.path = os.path.join(self.tmpdir, "scaled.cache")
+        scaled_image_cache.statistics(reset=True)
+        self.executor = BackgroundExecutor(max_workers=1)
+        self.loader = ImageLoader(executor=self.executor)
+        self.gate = threading.Event()
+        self.pixmaps = []
+
+    def tearDown(self):
+        self.gate.set()
+        self.loader.shutdown()
+        pixmap_cache.clear()
+        decoded_image_cache.clear()
+        shutil.rmtree(self.tmpdir)
+        GuiTestAssistant.tearDown(self)
+
+    def block_executor(self):
+        """ Keep the executor's only worker busy until the gate is set. """
+        started = threading.Event()
+
+        def blocked():
+            started.set()
+            self.gate.wait(10.0)
+
+        self.executor.submit(blocked)
+        started.wait(10.0)
+
+    def test_load_file(self):
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+
+        self.assertEqual(len(self.pixmaps), 1)
+        self.assertEqual(self.pixmaps[0].width(), 32)
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+        self.assertIsNot(self.pixmaps[1], self.pixmaps[0])
+        self.assertEqual(self.pixmaps[1].width(), 32)
+        self.assertFalse(self.pixmaps[1].isNull())
+        self.assertEqual(self.loader._pending, {})
+
+    def test_load_cached(self):
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+
+        # the cached image is delivered immediately, without a placeholder
+        self.assertEqual(len(self.pixmaps), 3)
+        self.assertIsNot(self.pixmaps[2], self.pixmaps[1])
+        self.assertEqual(
+            self.pixmaps[2].cacheKey(), self.pixmaps[1].cacheKey()
+        )
+
+    def test_deduplicate(self):
+        other = []
+        self.block_executor()
+
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+        self.loader.load(self.filename, other.append, size=(32, 32))
+
+        self.assertEqual(len(self.loader._pending), 1)
+        self.gate.set()
+        self.assertEventuallyTrueInGui(
+            lambda: len(self.pixmaps) == 2 and len(other) == 2
+        )
+        # the requests share the pixel data, but not the pixmap
+        self.assertIsNot(self.pixmaps[1], other[1])
+        self.assertEqual(self.pixmaps[1].cacheKey(), other[1].cacheKey())
+
+    def test_owner_destroyed(self):
+        owner = Owner(control=object())
+        self.block_executor()
+        self.loader.load(
+            self.filename, self.pixmaps.append, size=(32, 32), owner=owner
+        )
+        future = self.loader._pending[
+            (self.filename, 32, 32, 1.0)
+        ].future
+
+        owner.control = None
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.loader._pending, {})
+        self.assertEqual(self.loader._owned, {})
+        self.gate.set()
+        self.event_loop_helper.event_loop(5)
+        self.assertEqual(len(self.pixmaps), 1)
+
+    def test_cancel_all_while_decoding(self):
+        started = threading.Event()
+
+        def decode(*args):
+            started.set()
+            self.gate.wait(10.0)
+            return _decode_image(*args)
+
+        with mock.patch(
+                "pyface.ui.qt4.image_loader._decode_image", decode):
+            self.loader.load(
+                self.filename, self.pixmaps.append, size=(32, 32)
+            )
+            future = self.loader._pending[(self.filename, 32, 32, 1.0)].future
+            started.wait(10.0)
+
+            self.loader.cancel_all()
+            self.gate.set()
+            self.assertEventuallyTrueInGui(future.done)
+
+        self.event_loop_helper.event_loop(5)
+        # the dropped request doesn't get the decoded image
+        self.assertEqual(len(self.pixmaps), 1)
+
+    def test_shared_request_not_cancelled(self):
+        owner = Owner(control=object())
+        other = []
+        self.block_executor()
+        self.loader.load(
+            self.filename, self.pixmaps.append, size=(32, 32), owner=owner
+        )
+        self.loader.load(self.filename, other.append, size=(32, 32))
+
+        owner.control = None
+        self.gate.set()
+
+        self.assertEventuallyTrueInGui(lambda: len(other) == 2)
+        self.assertEqual(len(self.pixmaps), 1)
+
+    def test_qobject_owner_destroyed(self):
+        widget = QtGui.QWidget()
+        self.block_executor()
+        self.loader.load(
+            self.filename, self.pixmaps.append, size=(32, 32), owner=widget
+        )
+
+        widget.deleteLater()
+        self.assertEventuallyTrueInGui(lambda: not self.loader._owned)
+
+        self.assertEqual(self.loader._pending, {})
+        self.assertEqual(self.loader._qt_slots, {})
+        self.gate.set()
+        self.event_loop_helper.event_loop(5)
+        self.assertEqual(len(self.pixmaps), 1)
+
+    def test_qobject_owner_released(self):
+        widget = QtGui.QWidget()
+        self.addCleanup(widget.deleteLater)
+
+        self.loader.load(
+            self.filename, self.pixmaps.append, size=(32, 32), owner=widget
+        )
+
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+        self.assertEqual(self.loader._owned, {})
+        self.assertEqual(self.loader._qt_slots, {})
+
+    def test_load_image_resource(self):
+        resource = ImageResource("core", [IMAGE_DIR])
+
+        self.loader.load(resource, self.pixmaps.append)
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+
+        self.assertEqual(self.pixmaps[1].width(), 64)
+        # the image is shared with the image resource
+        decoded_image_cache.statistics(reset=True)
+        resource.create_image()
+        self.assertEqual(decoded_image_cache.statistics()["hits"], 1)
+
+    def test_load_missing_image_resource(self):
+        resource = ImageResource("doesnt_exist")
+
+        self.loader.load(resource, self.pixmaps.append)
+
+        self.assertEqual(len(self.pixmaps), 1)
+        self.assertFalse(self.pixmaps[0].isNull())
+
+    def test_load_invalid_file(self):
+        filename = os.path.join(self.tmpdir, "invalid.png")
+        with open(filename, "wb") as fp:
+            fp.write(b"not an image")
+
+        self.loader.load(filename, self.pixmaps.append)
+
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+        self.assertTrue(self.pixmaps[1].isNull())
+        self.assertIsNone(pixmap_cache.get((filename, None, None, 1.0)))
+
+    def test_load_persistent(self):
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 2)
+        # simulate a new run of the application
+        pixmap_cache.clear()
+        path = scaled_image_cache.path + ".copy"
+        shutil.copy(scaled_image_cache.path, path)
+        scaled_image_cache.path = path
+
+        self.loader.load(self.filename, self.pixmaps.append, size=(32, 32))
+
+        self.assertEventuallyTrueInGui(lambda: len(self.pixmaps) == 4)
+        self.assertEqual(self.pixmaps[3].width(), 32)
+        self.assertEqual(scaled_image_cache.statistics()["hits"], 1)
@@ -9,7 +9,9 @@
 # Thanks for using Enthought open source!
 
 
+import threading
 import unittest
+from unittest import mock
 
 from ..progress_dialog import ProgressDialog
 from ..util.gui_test_assistant import GuiTestAssistant
@@ -126,3 +128,80 @@ class TestProgressDialog(unittest.TestCase, GuiTestAssistant):
             self.assertNotEqual(self.dialog._remaining_control.text(), "")
         self.assertIsNone(self.dialog.control)
         self.gui.process_events()
+
+    def test_update_rate_limits_process_events(self):
+        self.dialog.min = 0
+        self.dialog.max = 1000
+        self.dialog.update_interval = 10.0
+        self.dialog.open()
+        with mock.patch(
+            "pyface.qt.QtGui.QApplication.processEvents"
+        ) as process_events:
+            for i in range(1000):
+                self.dialog.update(i)
+        self.assertEqual(process_events.call_count, 1)
+        self.assertEqual(self.dialog.progress_bar.value(), 999)
+        with self.event_loop():
+            self.dialog.close()
+
+    def test_report_from_thread(self):
+        self.dialog.min = 0
+        self.dialog.max = 100000
+        self.dialog.show_time = True
+        self.dialog.update_interval = 0.01
+        self.dialog.open()
+        results = []
+
+        def worker():
+            for i in range(100000):
+                results.append(self.dialog.report(i))
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.event_loop_helper.event_loop_until_condition(
+            lambda: self.dialog._sampled_value == 99999
+        )
+
+        self.assertTrue(all(results))
+        self.assertEqual(self.dialog.progress_bar.value(), 99999)
+        self.assertNotEqual(self.dialog._remaining_control.text(), "unknown")
+        self.assertIsNotNone(self.dialog.control)
+
+        # reporting the maximum closes the dialog
+        self.dialog.report(100000)
+        self.event_loop_helper.event_loop_until_condition(
+            lambda: self.dialog.control is None
+        )
+
+    def test_report_cancelled(self):
+        self.dialog.min = 0
+        self.dialog.max = 10
+        self.dialog.can_cancel = True
+        self.dialog.open()
+        self.assertTrue(self.dialog.report(1))
+
+        self.dialog.control.reject()
+
+        self.assertFalse(self.dialog.report(2))
+        self.event_loop_helper.event_loop_until_condition(
+            lambda: self.dialog.control is None
+        )
+
+    def test_smoothed_remaining_time(self):
+        self.dialog.min = 0
+        self.dialog.max = 100
+        self.dialog.open()
+        start = self.dialog._start_time
+
+        # progress at 10 units per second, then at 1 unit per second
+        self.dialog._update_rate(10, start + 1.0)
+        self.assertAlmostEqual(self.dialog._rate, 10.0)
+        self.dialog._update_rate(11, start + 2.0)
+
+        self.assertLess(self.dialog._rate, 10.0)
+        self.assertGreater(self.dialog._rate, 1.0)
+        remaining = self.dialog._estimate_remaining(11, 2.0)
+        self.assertAlmostEqual(remaining, 89 / self.dialog._rate)
+        with self.event_loop():
+            self.dialog.close()
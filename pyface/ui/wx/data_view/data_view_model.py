@@ -58,6 +58,12 @@ class DataViewModel(wxDataViewModel):
                 dispatch='ui',
                 remove=True,
             )
+            self._model.observe(
+                self.on_rows_changed,
+                '[rows_inserted,rows_removed,rows_moved]',
+                dispatch='ui',
+                remove=True,
+            )
             self._model = model
         else:
             # model is being initialized
@@ -74,10 +80,20 @@ class DataViewModel(wxDataViewModel):
             'values_changed',
             dispatch='ui',
         )
+        self._model.observe(
+            self.on_rows_changed,
+            '[rows_inserted,rows_removed,rows_moved]',
+            dispatch='ui',
+        )
 
     def on_structure_changed(self, event):
         self.Cleared()
 
+    def on_rows_changed(self, event):
+        # XXX wx could be told about these changes via ItemsAdded and
+        # ItemsDeleted, but the item ids of later rows would also change
+        self.Cleared()
+
     def on_values_changed(self, event):
         top, left, bottom, right = event.new
         if top == () and bottom == ():
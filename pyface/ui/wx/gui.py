@@ -24,6 +24,7 @@ from traits.api import Bool, HasTraits, provides, Str
 from pyface.util.guisupport import start_event_loop_wx
 
 
+from pyface.gui_monitor import profiled_call
 from pyface.i_gui import IGUI, MGUI
 
 
@@ -59,19 +60,19 @@ class GUI(MGUI, HasTraits):
 
     @classmethod
     def invoke_after(cls, millisecs, callable, *args, **kw):
-        wx.CallLater(millisecs, callable, *args, **kw)
+        wx.CallLater(millisecs, profiled_call, callable, *args, **kw)
 
     @classmethod
     def invoke_later(cls, callable, *args, **kw):
-        wx.CallAfter(callable, *args, **kw)
+        wx.CallAfter(profiled_call, callable, *args, **kw)
 
     @classmethod
     def set_trait_after(cls, millisecs, obj, trait_name, new):
-        wx.CallLater(millisecs, setattr, obj, trait_name, new)
+        wx.CallLater(millisecs, profiled_call, setattr, obj, trait_name, new)
 
     @classmethod
     def set_trait_later(cls, obj, trait_name, new):
-        wx.CallAfter(setattr, obj, trait_name, new)
+        wx.CallAfter(profiled_call, setattr, obj, trait_name, new)
 
     @staticmethod
     def process_events(allow_user_events=True):
@@ -19,7 +19,7 @@ import os
 import wx
 
 
-from traits.api import Any, HasTraits, List, Property, provides
+from traits.api import Any, Dict, HasTraits, List, Property, provides
 from traits.api import Str
 
 
@@ -37,6 +37,9 @@ class ImageResource(MImageResource, HasTraits):
     # The resource manager reference for the image.
     _ref = Any()
 
+    # The resource manager references for the image at specific sizes.
+    _sized_refs = Dict()
+
     # 'ImageResource' interface --------------------------------------------
 
     absolute_path = Property(Str)
@@ -88,6 +91,10 @@ class ImageResource(MImageResource, HasTraits):
     # Private interface.
     # ------------------------------------------------------------------------
 
+    def _share_image(self, image):
+        # wx images can be modified in place, so hand out copies
+        return image.Copy()
+
     def _get_absolute_path(self):
         # FIXME: This doesn't quite wotk the new notion of image size. We
         # should find out who is actually using this trait, and for what!